@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark audio-first downloads: time until transcription can start and
+until the video is ready to burn, vs. downloading and merging first.
+
+Generates a video-only and an audio-only stream with ffmpeg's lavfi
+sources and serves them from a local server throttled to --mbps, as a
+Bilibili DASH video. The extractor is patched to point at them, and
+transcription is simulated as --rtf seconds per second of audio. The
+overlap measured here is what a caller of download_audio_first() gets;
+src/main.py does not download from Bilibili and is not affected.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_bilibili_audio_first
+    python -m benchmarks.bench_bilibili_audio_first --duration 600 --mbps 20 --rtf 0.3
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from yt_dlp.extractor.bilibili import BiliBiliIE
+
+from src.bilibili_downloader import BilibiliDownloader
+
+
+def make_streams(work_dir, duration, size):
+    video = os.path.join(work_dir, "video.mp4")
+    audio = os.path.join(work_dir, "audio.m4a")
+    subprocess.run(['ffmpeg', '-y', '-v', 'error', '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate=30:duration={duration}',
+                    '-c:v', 'libx264', '-preset', 'ultrafast', '-b:v', '3M', '-pix_fmt', 'yuv420p', '-an', video], check=True)
+    subprocess.run(['ffmpeg', '-y', '-v', 'error', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+                    '-c:a', 'aac', '-b:a', '128k', audio], check=True)
+    return video, audio
+
+
+def serve(directory, mbps):
+    """Static file server sending at most `mbps` Mbit/s per connection"""
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def copyfile(self, source, outputfile):
+            block = 64 * 1024
+            while chunk := source.read(block):
+                outputfile.write(chunk)
+                time.sleep(len(chunk) * 8 / (mbps * 1e6))
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def fake_extract(base_url, duration, video_size, audio_size):
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        return {"id": video_id, "title": f"Video {video_id}", "duration": duration, "formats": [
+            {"format_id": "100026", "url": f"{base_url}/video.mp4", "ext": "mp4", "vcodec": "avc1.640032",
+             "acodec": "none", "height": 1080, "width": 1920, "fps": 30, "filesize": video_size},
+            {"format_id": "30280", "url": f"{base_url}/audio.m4a", "ext": "m4a", "vcodec": "none",
+             "acodec": "mp4a.40.2", "abr": 128, "filesize": audio_size},
+        ]}
+    return _real_extract
+
+
+def transcribe(audio_seconds, rtf):
+    time.sleep(audio_seconds * rtf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=int, default=120, help='Clip length in seconds')
+    parser.add_argument('--size', default='1280x720', help='Frame size of the generated clip')
+    parser.add_argument('--mbps', type=float, default=40, help='Download bandwidth per connection in Mbit/s')
+    parser.add_argument('--rtf', type=float, default=0.25, help='Simulated transcription seconds per audio second')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_audio_first_") as work_dir:
+        media_dir = os.path.join(work_dir, "media")
+        os.makedirs(media_dir)
+        video, audio = make_streams(media_dir, args.duration, args.size)
+        httpd = serve(media_dir, args.mbps)
+        base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+        BiliBiliIE._real_extract = fake_extract(base_url, args.duration, os.path.getsize(video), os.path.getsize(audio))
+
+        os.chdir(work_dir)
+        print("=" * 70)
+        print(f"{args.duration}s clip: video {os.path.getsize(video) / 1e6:.1f} MB, audio {os.path.getsize(audio) / 1e6:.1f} MB, "
+              f"{args.mbps:g} Mbit/s, transcription {args.duration * args.rtf:.0f}s")
+        print("=" * 70)
+
+        with BilibiliDownloader("0", requests_per_second=None, fragment_concurrency=1) as downloader:
+            start = time.perf_counter()
+            path = downloader.download_video("BV1sequential", "bench")
+            ready = time.perf_counter() - start
+            transcribe(args.duration, args.rtf)
+            total = time.perf_counter() - start
+            print(f"download, then transcribe: transcription starts {ready:6.1f}s, burn starts {total:6.1f}s"
+                  f"{'' if path else '  (download failed)'}")
+
+            start = time.perf_counter()
+            job = downloader.download_audio_first("BV1audiofirst", "bench")
+            ready = time.perf_counter() - start
+            transcribe(args.duration, args.rtf)
+            path = job.video_path()
+            total = time.perf_counter() - start
+            print(f"audio first:               transcription starts {ready:6.1f}s, burn starts {total:6.1f}s"
+                  f"{'' if path else '  (download failed)'}")
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
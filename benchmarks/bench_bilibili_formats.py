@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Format selection benchmark for BilibiliDownloader.
+
+Runs yt-dlp's real format selector over a synthetic Bilibili DASH format
+list (AVC/HEVC/AV1 from 360p to 4K plus three audio tracks) and reports the
+bytes each policy downloads, and the transfer time that implies at a given
+bandwidth. No network access is needed.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_bilibili_formats
+    python -m benchmarks.bench_bilibili_formats --duration 900 --mbps 50
+"""
+import argparse
+
+import yt_dlp
+
+from src.bilibili_downloader import download_format, download_report
+
+# (height, fps, {codec: kbit/s}) roughly as Bilibili serves them
+LADDER = [
+    (2160, 60, {"avc1.640034": 16000, "hev1.1.6.L153.90": 11000, "av01.0.13M.08": 9000}),
+    (1080, 60, {"avc1.640032": 6000, "hev1.1.6.L150.90": 3800, "av01.0.09M.08": 3200}),
+    (1080, 30, {"avc1.640032": 3000, "hev1.1.6.L150.90": 1900, "av01.0.08M.08": 1600}),
+    (720, 30, {"avc1.640028": 1500, "hev1.1.6.L120.90": 950, "av01.0.05M.08": 800}),
+    (480, 30, {"avc1.64001F": 800, "hev1.1.6.L120.90": 500, "av01.0.04M.08": 420}),
+    (360, 30, {"avc1.64001E": 400, "hev1.1.6.L120.90": 260, "av01.0.01M.08": 220}),
+]
+AUDIO = [("30280", 320), ("30232", 128), ("30216", 64)]
+
+
+def synthetic_info(duration):
+    formats = []
+    for height, fps, codecs in LADDER:
+        for codec, kbps in codecs.items():
+            formats.append({
+                "format_id": f"{height}p{fps}-{codec.split('.')[0]}", "url": "https://example.invalid/v.m4s",
+                "ext": "mp4", "vcodec": codec, "acodec": "none", "height": height, "width": height * 16 // 9,
+                "fps": fps, "tbr": kbps, "vbr": kbps, "filesize": int(kbps * 1000 / 8 * duration),
+                "protocol": "https",
+            })
+    for format_id, kbps in AUDIO:
+        formats.append({
+            "format_id": format_id, "url": "https://example.invalid/a.m4s", "ext": "m4a", "vcodec": "none",
+            "acodec": "mp4a.40.2", "abr": kbps, "tbr": kbps, "filesize": int(kbps * 1000 / 8 * duration),
+            "protocol": "https",
+        })
+    return {"id": "BV1bench", "title": "bench", "duration": duration, "formats": formats,
+            "extractor": "BiliBili", "extractor_key": "BiliBili", "webpage_url": "https://www.bilibili.com/video/BV1bench"}
+
+
+def select(info, ydl_opts):
+    with yt_dlp.YoutubeDL(dict(ydl_opts, quiet=True, no_warnings=True, simulate=True)) as ydl:
+        return ydl.process_ie_result(dict(info), download=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=int, default=600, help='Video length in seconds')
+    parser.add_argument('--mbps', type=float, default=100, help='Download bandwidth in Mbit/s')
+    args = parser.parse_args()
+
+    info = synthetic_info(args.duration)
+    policies = [("old: bestvideo[ext=mp4]+bestaudio", {'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'})]
+    for height, bitrate in ((1080, None), (720, None), (720, 1200)):
+        video_format, format_sort = download_format(height, bitrate)
+        label = f"target {height}p" + (f" <= {bitrate} kbit/s" if bitrate else "")
+        policies.append((label, {'format': video_format, 'format_sort': format_sort}))
+    video_format, format_sort = download_format(1080, None, prefer_avc=True)
+    policies.append(("target 1080p, AVC (smart/parallel)", {'format': video_format, 'format_sort': format_sort}))
+
+    print("=" * 78)
+    print(f"{args.duration}s video, {args.mbps:g} Mbit/s link")
+    print("=" * 78)
+    for label, opts in policies:
+        result = select(info, opts)
+        report = download_report(result)
+        seconds = report['chosen_bytes'] * 8 / (args.mbps * 1e6)
+        print(f"{label:36s} {result['format_id']:28s} {report['chosen_bytes'] / 1e6:8.1f} MB "
+              f"{seconds:6.1f}s  saved {report['saved_bytes'] / max(report['best_bytes'], 1) * 100:3.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark __INITIAL_STATE__ extraction and the BV-link fallback.
+
+Compares the scrapers' former parsing (lazy DOTALL regex + json.loads,
+BeautifulSoup tree on failure) with src.bilibili_page (str.find +
+raw_decode, single-pass anchor regex) on page fixtures shaped like
+captured upload pages: a multi-megabyte document with inline script
+bundles, the state object, and the anchors the page renders.
+
+Fixtures:
+  plain       titles without JSON punctuation
+  tricky      a title containing "};" (the old regex stops there)
+  no-state    no __INITIAL_STATE__, links only (fallback path)
+
+Pass captured pages with --html to time those as well.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_bilibili_page
+    python -m benchmarks.bench_bilibili_page --videos 300 --bundle-kb 4096 --html page1.html page2.html
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from src.bilibili_page import extract_initial_state, bv_links
+
+# Stand-in for the minified bundles the page inlines before and after the state
+_BUNDLE_LINE = "!function(e){var t={};function n(r){if(t[r])return t[r].exports;};n.m=e;}({});\n"
+
+
+def old_parse(html):
+    """scrape_all_bilibili.py's former parsing"""
+    videos = []
+    match = re.search(r'window\.__INITIAL_STATE__\s*=\s*({.*?});', html, re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group(1))
+            for video in data['archive']['item']:
+                videos.append(video['bvid'])
+        except Exception:
+            pass
+    if not videos:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        seen = set()
+        for link in soup.find_all('a', href=True):
+            bv_match = re.search(r'(BV[a-zA-Z0-9]+)', link['href'])
+            if '/video/BV' in link['href'] and bv_match and bv_match.group(1) not in seen:
+                seen.add(bv_match.group(1))
+                videos.append(bv_match.group(1))
+    return videos
+
+
+def new_parse(html):
+    data = extract_initial_state(html)
+    videos = [v['bvid'] for v in (data or {}).get('archive', {}).get('item', []) if v.get('bvid')]
+    return videos or [v['bvid'] for v in bv_links(html)]
+
+
+def make_page(videos, bundle_kb, state=True, tricky=False):
+    items = [{"bvid": f"BV1xx4y1{i:04d}", "title": f"视频 {i} {{第{i}期}}", "created": 1700000000 - i,
+              "pic": f"//i0.hdslb.com/bfs/archive/{i:040x}.jpg", "stat": {"view": i * 13, "danmaku": i}}
+             for i in range(videos)]
+    if tricky:
+        items[videos // 2]["title"] = "合集};完结"
+    bundle = _BUNDLE_LINE * (bundle_kb * 1024 // len(_BUNDLE_LINE))
+    parts = ["<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>空间</title>",
+             f"<script>{bundle}</script>"]
+    if state:
+        payload = {"mid": 1966850363, "archive": {"item": items, "page": {"pn": 1, "ps": videos}},
+                   "config": {"theme": "light"}}
+        parts.append("<script>window.__INITIAL_STATE__=" + json.dumps(payload, ensure_ascii=False)
+                     + ";(function(){var s;(s=document.currentScript||document.scripts[document.scripts.length-1])"
+                       ".parentNode.removeChild(s);}());</script>")
+    parts.append("</head><body><div id=\"app\"><ul class=\"list\">")
+    for item in items:
+        parts.append(f"<li class=\"small-item\"><a href=\"//www.bilibili.com/video/{item['bvid']}/\" "
+                     f"target=\"_blank\" class=\"cover\"><img src=\"{item['pic']}\"></a>"
+                     f"<a href=\"//www.bilibili.com/video/{item['bvid']}/\" title=\"{item['title']}\" "
+                     f"class=\"title\">{item['title']}</a></li>")
+    parts.append(f"</ul></div><script>{bundle}</script></body></html>")
+    return "".join(parts)
+
+
+def timed(fn, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(html)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=30, help='Videos per fixture page')
+    parser.add_argument('--bundle-kb', type=int, default=1024, help='Inline script size before and after the state')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--html', nargs='*', default=[], help='Captured pages to include')
+    args = parser.parse_args()
+
+    fixtures = {
+        "plain": make_page(args.videos, args.bundle_kb),
+        "tricky": make_page(args.videos, args.bundle_kb, tricky=True),
+        "no-state": make_page(args.videos, args.bundle_kb, state=False),
+    }
+    for path in args.html:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            fixtures[os.path.basename(path)] = f.read()
+
+    print("=" * 78)
+    print(f"{'fixture':14s} {'size':>8s} {'old':>10s} {'new':>10s} {'speed-up':>9s}  videos old/new")
+    print("=" * 78)
+    for name, html in fixtures.items():
+        old_seconds, old_videos = timed(old_parse, html, args.repeat)
+        new_seconds, new_videos = timed(new_parse, html, args.repeat)
+        print(f"{name:14s} {len(html) / 1e6:6.1f}MB {old_seconds * 1000:8.1f}ms {new_seconds * 1000:8.1f}ms "
+              f"{old_seconds / new_seconds:8.1f}x  {len(old_videos)}/{len(new_videos)}")
+
+
+if __name__ == "__main__":
+    main()
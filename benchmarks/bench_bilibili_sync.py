@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Request count of a full channel walk vs. an incremental sync with ChannelCursor.
+
+The user-space API yt-dlp pages through is replaced by a synthetic channel
+(30 videos per page, newest first), so no network access is needed. Each run
+publishes a few new uploads and reports how many pages each strategy fetched.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_bilibili_sync
+    python -m benchmarks.bench_bilibili_sync --videos 840 --new 3 --runs 5
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from yt_dlp.extractor.bilibili import BilibiliSpaceVideoIE
+
+from src.bilibili_downloader import BilibiliDownloader
+from src.channel_cursor import ChannelCursor
+
+PAGE_SIZE = 30
+
+
+class FakeSpace:
+    """Serves /x/space/wbi/arc/search for one channel and counts the page requests"""
+
+    def __init__(self, videos, latency):
+        self.videos = [f"BV1{i:09d}" for i in range(videos)]  # oldest first
+        self.latency = latency
+        self.pages = 0
+
+    def upload(self, count):
+        start = len(self.videos)
+        self.videos += [f"BV1{i:09d}" for i in range(start, start + count)]
+
+    def download_json(self, ie, url, video_id, *args, query=None, **kwargs):
+        if 'nav' in url:
+            return {"data": {"wbi_img": {"img_url": "https://i0.hdslb.com/bfs/wbi/" + "a" * 32 + ".png",
+                                         "sub_url": "https://i0.hdslb.com/bfs/wbi/" + "b" * 32 + ".png"}}}
+        self.pages += 1
+        time.sleep(self.latency)
+        newest_first = self.videos[::-1]
+        page = int(query['pn'])
+        items = newest_first[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        return {"code": 0, "data": {
+            "page": {"pn": page, "ps": PAGE_SIZE, "count": len(self.videos)},
+            "list": {"vlist": [{"bvid": bvid, "mid": int(video_id), "title": bvid} for bvid in items]},
+        }}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=630, help='Videos already on the channel')
+    parser.add_argument('--new', type=int, default=3, help='New uploads before each run')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated time per page request (s)')
+    args = parser.parse_args()
+
+    space = FakeSpace(args.videos, args.latency)
+    BilibiliSpaceVideoIE._download_json = lambda ie, *a, **kw: space.download_json(ie, *a, **kw)
+
+    with tempfile.TemporaryDirectory(prefix="bench_bili_sync_") as work_dir:
+        os.chdir(work_dir)
+        cursor = ChannelCursor(os.path.join(work_dir, "bilibili_cursor.json"))
+        with BilibiliDownloader("1966850363", requests_per_second=None) as downloader:
+            print("=" * 60)
+            print(f"Channel with {args.videos} videos, {args.new} new uploads per run")
+            print("=" * 60)
+            space.pages = 0
+            start = time.perf_counter()
+            first = sum(1 for _ in downloader.iter_new_videos(cursor))
+            print(f"first sync:         {space.pages:3d} pages {time.perf_counter() - start:6.2f}s  {first} videos")
+
+            for run in range(1, args.runs + 1):
+                space.upload(args.new)
+
+                space.pages = 0
+                start = time.perf_counter()
+                full = downloader.get_latest_videos(limit=len(space.videos))
+                full_pages, full_time = space.pages, time.perf_counter() - start
+
+                space.pages = 0
+                start = time.perf_counter()
+                new = [video['id'] for video in downloader.iter_new_videos(cursor)]
+                sync_pages, sync_time = space.pages, time.perf_counter() - start
+
+                expected = space.videos[:-args.new - 1:-1]
+                print(f"run {run}: full walk {full_pages:3d} pages {full_time:6.2f}s ({len(full)} videos) | "
+                      f"incremental {sync_pages} pages {sync_time:5.2f}s ({len(new)} new, "
+                      f"{'correct' if new == expected else 'WRONG'})")
+
+
+if __name__ == "__main__":
+    main()
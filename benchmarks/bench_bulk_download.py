@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark BulkDownloader against a fake BBDown and the fake CDN.
+
+The fake BBDown is a small script with BBDown's command line
+(`--work-dir DIR URL`): it waits `--api-latency` seconds (BBDown resolves
+the video through several API calls first), then streams
+<bvid>.mp4 from the fake CDN, whose per-connection bandwidth cap mirrors
+Bilibili's. Every `--fail-every`-th invocation exits with an error.
+
+1. One download at a time (the generated download_*.sh scripts)
+2. BulkDownloader with --workers downloads in flight
+3. A run interrupted half-way, then resumed from the manifest
+4. A run with everything already downloaded (skip path)
+
+Usage (from the repo root):
+    python -m benchmarks.bench_bulk_download
+    python -m benchmarks.bench_bulk_download --videos 60 --size-mb 8 --mbps 40 --workers 8
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import textwrap
+import time
+
+from benchmarks.fake_cdn import FakeCDN
+from src.bulk_download import BBDownBackend, BulkDownloader, DownloadManifest, known_video_keys
+
+FAKE_BBDOWN = textwrap.dedent('''\
+    import os, re, sys, time, urllib.request
+    args = sys.argv[1:]
+    work_dir = args[args.index("--work-dir") + 1]
+    url = args[-1]
+    bvid = re.search(r"BV[0-9A-Za-z]{10}", url).group(0)
+    counter = os.environ["FAKE_BBDOWN_COUNTER"]
+    with open(counter, "a") as f:
+        f.write("x")
+    calls = os.path.getsize(counter)
+    time.sleep(float(os.environ["FAKE_BBDOWN_LATENCY"]))
+    fail_every = int(os.environ["FAKE_BBDOWN_FAIL_EVERY"] or 0)
+    if fail_every and calls % fail_every == 0:
+        print("[ERROR] API returned -412", file=sys.stderr)
+        sys.exit(1)
+    with urllib.request.urlopen(os.environ["FAKE_CDN"] + f"/{bvid}.mp4") as r, \\
+            open(os.path.join(work_dir, f"[{bvid}] 视频.mp4"), "wb") as f:
+        while block := r.read(1024 * 1024):
+            f.write(block)
+''')
+
+
+class Interrupt:
+    """progress() that presses Ctrl-C after `after` finished downloads"""
+
+    def __init__(self, after):
+        self.after = after
+        self.finished = 0
+
+    def __call__(self, message):
+        if message.startswith("["):
+            self.finished += 1
+            if self.finished >= self.after:
+                raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=24)
+    parser.add_argument('--size-mb', type=int, default=4)
+    parser.add_argument('--mbps', type=float, default=50, help='Per-connection bandwidth cap')
+    parser.add_argument('--api-latency', type=float, default=0.5, help="Fake BBDown's time before downloading")
+    parser.add_argument('--fail-every', type=int, default=7, help='Every n-th BBDown invocation fails (0 = never)')
+    parser.add_argument('--workers', type=int, default=6)
+    args = parser.parse_args()
+    logging.getLogger("LRBAuto").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory(prefix="bench_bulk_") as tmp:
+        cdn_dir = os.path.join(tmp, "cdn")
+        os.makedirs(cdn_dir)
+        bvids = [f"BV1bench{i:04d}" for i in range(args.videos)]
+        payload = os.urandom(args.size_mb * 1024 * 1024)
+        for bvid in bvids:
+            with open(os.path.join(cdn_dir, f"{bvid}.mp4"), 'wb') as f:
+                f.write(payload)
+        urls = [f"https://www.bilibili.com/video/{bvid}" for bvid in bvids]
+        script = os.path.join(tmp, "fake_bbdown.py")
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(FAKE_BBDOWN)
+
+        with FakeCDN(cdn_dir, mbps=args.mbps) as cdn:
+            os.environ.update(FAKE_CDN=cdn.base_url, FAKE_BBDOWN_LATENCY=str(args.api_latency),
+                              FAKE_BBDOWN_FAIL_EVERY=str(args.fail_every))
+            backend = BBDownBackend(sys.executable, [script])
+
+            def run(name, workers, progress=None):
+                work_dir = os.path.join(tmp, name)
+                os.environ["FAKE_BBDOWN_COUNTER"] = os.path.join(tmp, f"{name}.calls")
+                manifest = DownloadManifest(os.path.join(tmp, f"{name}.jsonl"))
+                bulk = BulkDownloader(backend, work_dir, manifest, workers=workers, backoff=0.05,
+                                      skip_keys=known_video_keys(work_dir=work_dir))
+                try:
+                    bulk.run(urls, progress=progress or (lambda message: None))
+                except KeyboardInterrupt:
+                    pass
+                return bulk
+
+            print("=" * 78)
+            print(f"{args.videos} videos x {args.size_mb} MB, {args.mbps:g} Mbit/s per connection, "
+                  f"{args.api_latency:g}s API latency, every {args.fail_every}th call fails")
+            print("=" * 78)
+            sequential = run("sequential", 1)
+            print(f"one at a time:       {sequential.summary()}")
+            parallel = run("parallel", args.workers)
+            print(f"{args.workers} workers:           {parallel.summary()}")
+            print(f"speed-up:            {sequential.stats['wall_seconds'] / parallel.stats['wall_seconds']:.1f}x")
+
+            first = run("resume", args.workers, progress=Interrupt(args.videos // 2))
+            second = run("resume", args.workers)
+            print(f"interrupted:         {first.stats['done']} finished before Ctrl-C")
+            print(f"resumed:             {second.summary()}")
+            files = [name for name in os.listdir(os.path.join(tmp, "resume")) if name.endswith(".mp4")]
+            print(f"files in work dir:   {len(files)} (expected {args.videos})")
+
+            started = time.perf_counter()
+            again = run("parallel", args.workers)
+            print(f"everything present:  {again.stats['skipped']} skipped in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Report encode time and output size for every encoding profile.
+
+Burns a subtitle track into a clip with each profile from
+src/encoding_profiles.py and prints encode time, output bytes and the
+estimated upload time at the given uplink speed, so the profile with the
+lowest encode + upload cost for a runner can be picked.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_encoding_profiles
+    python -m benchmarks.bench_encoding_profiles --input downloads/x/video.mp4 --uplink-mbps 40
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from src.encoding_profiles import ENCODING_PROFILES
+from src.subtitle_gen import SubtitleGenerator
+from benchmarks.bench_parallel_burn import make_test_video, make_test_srt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', help='Video to encode (default: a generated 1080p test clip)')
+    parser.add_argument('--srt', help='Subtitles to burn (default: generated cues)')
+    parser.add_argument('--duration', type=int, default=60, help='Length of the generated clip in seconds')
+    parser.add_argument('--uplink-mbps', type=float, default=20.0, help='Upload bandwidth used for the estimate')
+    parser.add_argument('--profiles', nargs='+', default=list(ENCODING_PROFILES), help='Profiles to compare')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_profiles_") as work_dir:
+        video_path = os.path.join(work_dir, "clip.mp4")
+        srt_path = os.path.join(work_dir, "clip.srt")
+        if args.input:
+            shutil.copyfile(args.input, video_path)
+        else:
+            make_test_video(video_path, '1920x1080', args.duration, 60)
+        if args.srt:
+            shutil.copyfile(args.srt, srt_path)
+        else:
+            make_test_srt(srt_path, args.duration)
+
+        source_bytes = os.path.getsize(video_path)
+        uplink_bytes_per_s = args.uplink_mbps * 1_000_000 / 8
+
+        print("=" * 78)
+        print(f"Source: {source_bytes / 1e6:.1f} MB, uplink {args.uplink_mbps:g} Mbit/s")
+        print("=" * 78)
+        print(f"{'profile':<10} {'encode s':>9} {'output MB':>10} {'vs source':>10} {'upload s':>9} {'total s':>9}")
+
+        for name in args.profiles:
+            generator = SubtitleGenerator(encoding_profile=name)
+            start = time.perf_counter()
+            output = generator.burn_subtitles(video_path, srt_path)
+            encode_s = time.perf_counter() - start
+            if not output:
+                print(f"{name:<10} failed")
+                continue
+
+            output_bytes = os.path.getsize(output)
+            os.remove(output)
+            upload_s = output_bytes / uplink_bytes_per_s
+            print(f"{name:<10} {encode_s:9.1f} {output_bytes / 1e6:10.1f} {output_bytes / source_bytes:9.2f}x "
+                  f"{upload_s:9.1f} {encode_s + upload_s:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark VideoOrganizer.plan on a synthetic drop directory.
+
+Creates --files MP4-named files of random content (--dup-percent of them
+byte-identical copies under other names), named like XHS-Downloader and
+BBDown output, then compares:
+
+  serial       ffprobe + full SHA-256 of every file, one after another
+  organizer    VideoOrganizer.plan (worker pool, fingerprints, full hashes
+               only for colliding fingerprints)
+
+ffprobe is simulated with a fixed per-call latency (--probe-ms, roughly
+what spawning ffprobe on an MP4 costs) unless --real-ffprobe is given; the
+files are not real MP4s. Afterwards the plan is applied and run again to
+show that a re-run finds nothing new.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_organize_videos
+    python -m benchmarks.bench_organize_videos --files 2000 --size-mb 2 --workers 16
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from src.ffmpeg_runner import FFmpegRunner
+from src.video_organizer import VideoOrganizer, sha256_file
+
+
+class SimulatedProbe(FFmpegRunner):
+    """ffprobe stand-in: sleeps like a process spawn and reports a fixed stream layout"""
+
+    def __init__(self, seconds):
+        super().__init__()
+        self.seconds = seconds
+
+    def probe(self, path, entries="format=duration", stream=None, extra_args=()):
+        time.sleep(self.seconds)
+        return {"format": {"duration": "61.5", "tags": {"title": "video"}},
+                "streams": [{"codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920},
+                            {"codec_type": "audio", "codec_name": "aac"}]}
+
+
+def make_drop_dir(path, files, size_mb, dup_percent):
+    os.makedirs(path)
+    originals = []
+    for i in range(files):
+        if originals and random.random() < dup_percent / 100:
+            name = f"{random.choice(originals)[:-4]} (1).mp4"
+            if not os.path.exists(os.path.join(path, name)):
+                shutil.copyfile(os.path.join(path, random.choice(originals)), os.path.join(path, name))
+                continue
+        if i % 3 == 0:
+            name = f"2024-03-{i % 28 + 1:02d}_12.30.{i % 60:02d}_作者{i % 7}_科学小实验第{i}期.mp4"
+        elif i % 3 == 1:
+            name = f"BV1org{i:06d}_视频标题{i}.mp4"
+        else:
+            name = f"【合集】有趣的实验 {i}.mp4"
+        with open(os.path.join(path, name), 'wb') as f:
+            f.write(os.urandom(int(size_mb * 1024 * 1024)))
+        originals.append(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=300)
+    parser.add_argument('--size-mb', type=float, default=8)
+    parser.add_argument('--dup-percent', type=float, default=10)
+    parser.add_argument('--probe-ms', type=float, default=40)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--real-ffprobe', action='store_true')
+    args = parser.parse_args()
+    logging.getLogger("LRBAuto").setLevel(logging.WARNING)
+    random.seed(1)
+    runner = FFmpegRunner() if args.real_ffprobe else SimulatedProbe(args.probe_ms / 1000)
+
+    with tempfile.TemporaryDirectory(prefix="bench_organize_") as tmp:
+        drop_dir = os.path.join(tmp, "drop")
+        make_drop_dir(drop_dir, args.files, args.size_mb, args.dup_percent)
+        videos = sorted(name for name in os.listdir(drop_dir) if name.endswith(".mp4"))
+        total_mb = sum(os.path.getsize(os.path.join(drop_dir, v)) for v in videos) / 1e6
+
+        start = time.perf_counter()
+        hashes = {}
+        for name in videos:
+            path = os.path.join(drop_dir, name)
+            runner.probe(path)
+            hashes.setdefault(sha256_file(path), []).append(name)
+        serial = time.perf_counter() - start
+        serial_dups = sum(len(names) - 1 for names in hashes.values())
+
+        organizer = VideoOrganizer(drop_dir, workers=args.workers, runner=runner)
+        start = time.perf_counter()
+        items = organizer.plan()
+        planned = time.perf_counter() - start
+        dups = sum(1 for item in items if 'duplicate_of' in item)
+        start = time.perf_counter()
+        organizer.apply(items)
+        applied = time.perf_counter() - start
+
+        start = time.perf_counter()
+        again = VideoOrganizer(drop_dir, workers=args.workers, runner=runner).plan()
+        rerun = time.perf_counter() - start
+        titled = sum(1 for item in items if 'metadata' in item and item['metadata']['title'] != 'video')
+        sample = next(item['metadata'] for item in items if 'metadata' in item)
+
+    print("=" * 72)
+    print(f"{len(videos)} files, {total_mb:.0f} MB, {args.probe_ms:g} ms per ffprobe"
+          f"{' (real)' if args.real_ffprobe else ' (simulated)'}")
+    print("=" * 72)
+    print(f"serial probe + SHA-256:  {serial:6.2f}s  {serial_dups} duplicates")
+    print(f"VideoOrganizer.plan:     {planned:6.2f}s  {dups} duplicates, {organizer.stats['full_hashes']} full hashes, "
+          f"{organizer.workers} workers  ({serial / planned:.1f}x)")
+    print(f"apply (moves + JSON):    {applied:6.2f}s  {organizer.stats['organized']} folders")
+    print(f"re-run:                  {rerun:6.2f}s  {len(again)} new files")
+    print(f"titles from file names:  {titled}/{organizer.stats['organized']}, e.g. {sample['title']!r} "
+          f"({sample.get('author') or sample.get('bv_id') or '-'})")
+
+
+if __name__ == "__main__":
+    main()
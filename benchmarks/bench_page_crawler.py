@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark PageCrawler against the fake Bilibili upload pages.
+
+1. The old loop (one page at a time, 1 s pause) vs. the crawler with
+   bounded concurrency and a token-bucket rate limit.
+2. A flaky server (every n-th request 503) to show retries with jitter.
+3. A channel whose pages repeat past the end, where only early termination
+   on "no new BV ids" stops the crawl.
+4. A crawl cancelled half-way, then resumed from its JSONL file.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_page_crawler
+    python -m benchmarks.bench_page_crawler --videos 600 --latency 0.3 --concurrency 8 --rate 6
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import requests
+
+from benchmarks.fake_bilibili import FakeBilibili
+from scrape_all_bilibili import fetch_page
+from src.page_crawler import PageCrawler
+
+UID = "1966850363"
+PAGE_SIZE = 30
+
+
+def old_loop(server, pages, pause):
+    """scrape_all_bilibili.py's former loop: stop at the first empty page, pause between pages"""
+    videos = []
+    for page in range(1, pages + 1):
+        items = fetch_page(UID, page, space_url=server.space_url)
+        if not items:
+            break
+        videos.extend(items)
+        time.sleep(pause)
+    return videos
+
+
+def make_crawler(server, session, args, output_path=None, **kwargs):
+    options = dict(key="bvid", concurrency=args.concurrency, rate=args.rate, burst=args.concurrency, backoff=0.2)
+    options.update(kwargs)
+    return PageCrawler(lambda page: fetch_page(UID, page, session, server.space_url),
+                       output_path=output_path, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=300)
+    parser.add_argument('--pages', type=int, default=21, help='Pages to crawl at most')
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated time per page request (s)')
+    parser.add_argument('--pause', type=float, default=1.0, help="Old loop's pause between pages (s)")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=4.0, help='Page requests per second for the crawler')
+    args = parser.parse_args()
+    logging.getLogger("LRBAuto").setLevel(logging.ERROR)
+    channel_pages = -(-args.videos // PAGE_SIZE)
+    session = requests.Session()
+
+    print("=" * 70)
+    print(f"{args.videos} videos ({channel_pages} pages), {args.latency * 1000:.0f} ms per page, "
+          f"crawler: {args.concurrency} in flight, {args.rate:g} req/s")
+    print("=" * 70)
+
+    with FakeBilibili(videos=args.videos, latency=args.latency) as server:
+        start = time.perf_counter()
+        videos = old_loop(server, args.pages, args.pause)
+        old = time.perf_counter() - start
+        print(f"old loop:              {old:6.2f}s  {len(videos)} videos, {server.requests} requests")
+
+    with FakeBilibili(videos=args.videos, latency=args.latency) as server:
+        crawler = make_crawler(server, session, args)
+        start = time.perf_counter()
+        videos = crawler.run(1, args.pages)
+        new = time.perf_counter() - start
+        print(f"PageCrawler:           {new:6.2f}s  {len(videos)} videos, {server.requests} requests, "
+              f"{server.max_active} in flight at most  ({old / new:.1f}x)")
+
+    with FakeBilibili(videos=args.videos, latency=args.latency, fail_every=4) as server:
+        crawler = make_crawler(server, session, args)
+        start = time.perf_counter()
+        videos = crawler.run(1, args.pages)
+        seconds = time.perf_counter() - start
+        print(f"every 4th request 503: {seconds:6.2f}s  {len(videos)} videos, {crawler.stats['retries']} retries, "
+              f"{crawler.stats['failed']} pages lost")
+
+    with FakeBilibili(videos=args.videos, latency=args.latency, repeat_last=True) as server:
+        crawler = make_crawler(server, session, args)
+        start = time.perf_counter()
+        videos = crawler.run(1, None)
+        seconds = time.perf_counter() - start
+        print(f"pages repeat past end: {seconds:6.2f}s  {len(videos)} videos, stopped after "
+              f"{max(server.pages)} of an open-ended crawl")
+
+    with tempfile.TemporaryDirectory(prefix="bench_crawl_") as work_dir, \
+            FakeBilibili(videos=args.videos, latency=args.latency) as server:
+        output = os.path.join(work_dir, "crawl.jsonl")
+        crawler = make_crawler(server, session, args, output_path=output)
+        try:
+            asyncio.run(asyncio.wait_for(crawler.crawl(1, args.pages), timeout=new / 2))
+        except asyncio.TimeoutError:
+            pass
+        first = server.requests
+        crawler = make_crawler(server, session, args, output_path=output)
+        videos = crawler.run(1, args.pages)
+        print(f"interrupted + resumed: {len(videos)} videos, {first} requests before the interruption, "
+              f"{server.requests - first} after ({crawler.stats['resumed']} pages resumed)")
+        refetched = sum(count - 1 for count in server.pages.values())
+        print(f"pages fetched twice:   {refetched}")
+
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel subtitle burning against the single-process burn.
+
+Generates test videos with ffmpeg's lavfi sources, then times
+SubtitleGenerator.burn_subtitles and burn_subtitles_parallel for a range of
+segment counts and prints the speedup.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_parallel_burn
+    python -m benchmarks.bench_parallel_burn --size 1280x720 --duration 120 --segments 1 2 4 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.subtitle_gen import SubtitleGenerator
+
+
+def make_test_video(path, size, duration, gop):
+    """Creates an H.264/AAC test clip with a keyframe every `gop` frames"""
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate=30:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-g', str(gop), '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-shortest',
+        path
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def make_test_srt(path, duration, every=4.0, length=2.5):
+    """Writes a cue of `length` seconds every `every` seconds"""
+    with open(path, 'w', encoding='utf-8') as f:
+        t, i = 0.5, 1
+        while t + length < duration:
+            f.write(f"{i}\n")
+            f.write(f"{SubtitleGenerator._format_time(t)} --> {SubtitleGenerator._format_time(t + length)}\n")
+            f.write(f"Benchmark caption number {i}\n\n")
+            t += every
+            i += 1
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', default='640x360', help='Frame size of the generated clip')
+    parser.add_argument('--duration', type=int, default=60, help='Clip length in seconds')
+    parser.add_argument('--gop', type=int, default=60, help='Keyframe interval in frames')
+    parser.add_argument('--segments', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help='Segment counts to benchmark')
+    args = parser.parse_args()
+
+    generator = SubtitleGenerator()
+
+    with tempfile.TemporaryDirectory(prefix="bench_burn_") as work_dir:
+        video_path = os.path.join(work_dir, "clip.mp4")
+        srt_path = os.path.join(work_dir, "clip.srt")
+        make_test_video(video_path, args.size, args.duration, args.gop)
+        make_test_srt(srt_path, args.duration)
+
+        print("=" * 70)
+        print(f"Parallel burn benchmark: {args.size}, {args.duration}s, GOP {args.gop}, {os.cpu_count()} CPUs")
+        print("=" * 70)
+
+        baseline, output = timed(generator.burn_subtitles, video_path, srt_path)
+        if not output:
+            print("❌ Baseline burn failed")
+            sys.exit(1)
+        os.remove(output)
+        print(f"{'single process':>16}: {baseline:7.2f}s  1.00x")
+
+        for segments in args.segments:
+            elapsed, output = timed(generator.burn_subtitles_parallel, video_path, srt_path, segment_count=segments)
+            if not output:
+                print(f"{segments:>7} segments: failed")
+                continue
+            os.remove(output)
+            print(f"{segments:>7} segments: {elapsed:7.2f}s  {baseline / elapsed:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
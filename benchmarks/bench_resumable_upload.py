@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Throughput and resume benchmark for ResumableUploader against the fake YouTube server.
+
+1. Uploads a random file with several chunk sizes and reports MB/s.
+2. Drops the connection halfway through one "run", then starts a second
+   uploader with the same session store and reports how much was re-sent.
+3. Simulates an encoder producing output at --encode-mbps and compares
+   "encode to disk, then upload" with streaming the pipe into the upload.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_resumable_upload
+    python -m benchmarks.bench_resumable_upload --size-mb 256 --chunks-mb 1 8 32
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.fake_youtube import FakeYouTube
+from src.resumable_upload import ResumableUploader, UploadSessionStore, UploadError
+
+BODY = {"snippet": {"title": "benchmark"}, "status": {"privacyStatus": "private"}}
+
+
+def produce(path, out, rate):
+    """Copies path to the binary file object out at `rate` bytes/s, like an encoder would"""
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            time.sleep(len(block) / rate)
+            out.write(block)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=64, help='Size of the uploaded file')
+    parser.add_argument('--chunks-mb', type=float, nargs='+', default=[0.25, 1, 8, 32], help='Chunk sizes to compare')
+    parser.add_argument('--fail-every', type=int, default=0, help='Inject a 503 every n-th chunk')
+    parser.add_argument('--encode-mbps', type=float, default=20, help='Simulated encoder output rate (MB/s)')
+    parser.add_argument('--upload-delay', type=float, default=0.5, help='Simulated latency per chunk request (s)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_upload_") as work_dir:
+        path = os.path.join(work_dir, "video.mp4")
+        with open(path, 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            expected = hashlib.sha256(f.read()).hexdigest()
+
+        print("=" * 60)
+        print(f"Uploading {args.size_mb} MB to a local fake YouTube server")
+        print("=" * 60)
+
+        for chunk_mb in args.chunks_mb:
+            with FakeYouTube(fail_every=args.fail_every) as server:
+                uploader = ResumableUploader(requests.Session(), upload_url=server.upload_url,
+                                             chunk_size=int(chunk_mb * 1024 * 1024), backoff=0.01)
+                start = time.perf_counter()
+                video = uploader.upload_file(path, BODY)
+                elapsed = time.perf_counter() - start
+                ok = server.videos[video["id"]]["sha256"] == expected
+                print(f"chunk {chunk_mb:6.2f} MB: {size / elapsed / 1e6:8.1f} MB/s  "
+                      f"{server.requests:4d} requests  {'ok' if ok else 'CORRUPT'}")
+
+        # Cross-run resume: first run dies halfway, second run picks up the session
+        store = UploadSessionStore(os.path.join(work_dir, "sessions.json"))
+        with FakeYouTube(drop_after=size // 2) as server:
+            first = ResumableUploader(requests.Session(), upload_url=server.upload_url,
+                                      chunk_size=8 * 1024 * 1024, store=store, max_retries=0)
+            try:
+                first.upload_file(path, BODY)
+            except (UploadError, requests.RequestException):
+                pass
+            sent_first = server.bytes_received
+
+            second = ResumableUploader(requests.Session(), upload_url=server.upload_url,
+                                       chunk_size=8 * 1024 * 1024,
+                                       store=UploadSessionStore(os.path.join(work_dir, "sessions.json")))
+            video = second.upload_file(path, BODY)
+            resent = server.bytes_received - sent_first
+            ok = server.videos[video["id"]]["sha256"] == expected
+            print(f"resume: first run committed {sent_first / 1e6:.1f} MB, "
+                  f"second run sent {resent / 1e6:.1f} MB of {size / 1e6:.1f} MB  {'ok' if ok else 'CORRUPT'}")
+
+        # Encode-then-upload vs. streaming the encoder output into the upload
+        rate = args.encode_mbps * 1e6
+        with FakeYouTube(fail_every=args.fail_every, chunk_delay=args.upload_delay) as server:
+            uploader = ResumableUploader(requests.Session(), upload_url=server.upload_url,
+                                         chunk_size=8 * 1024 * 1024, backoff=0.01)
+            encoded = os.path.join(work_dir, "encoded.mp4")
+            start = time.perf_counter()
+            with open(encoded, 'wb') as out:
+                produce(path, out, rate)
+            uploader.upload_file(encoded, BODY)
+            sequential = time.perf_counter() - start
+
+            read_fd, write_fd = os.pipe()
+            with os.fdopen(read_fd, 'rb') as stream, os.fdopen(write_fd, 'wb') as sink:
+                def encoder():
+                    produce(path, sink, rate)
+                    sink.close()
+                producer = threading.Thread(target=encoder)
+                start = time.perf_counter()
+                producer.start()
+                video = uploader.upload_stream(stream, BODY, before_finish=producer.join)
+                streamed = time.perf_counter() - start
+            ok = server.videos[video["id"]]["sha256"] == expected
+            print(f"encode then upload: {sequential:6.2f}s   streamed: {streamed:6.2f}s  "
+                  f"({(1 - streamed / sequential) * 100:.0f}% less)  {'ok' if ok else 'CORRUPT'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark the summarizers on hour-long transcripts.
+
+Builds synthetic transcripts with a Zipf-like vocabulary at speaking pace
+(about 9,000 words per hour) and times SimpleSummarizer against the NumPy
+TfidfSummarizer in both modes.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_summarizer
+    python -m benchmarks.bench_summarizer --hours 2 --runs 5
+"""
+import argparse
+import random
+import time
+
+from src.idf_table import IdfTable
+from src.summarizer import SimpleSummarizer, TfidfSummarizer
+
+
+def make_transcript(hours, seed=0, vocabulary_size=6000):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(vocabulary_size)]
+    # Zipf-like weights: a few very common words, a long tail of rare ones
+    weights = [1 / (rank + 1) for rank in range(vocabulary_size)]
+    words_left = int(hours * 9000)
+    sentences = []
+    while words_left > 0:
+        length = rng.randint(6, 24)
+        words = rng.choices(vocabulary, weights=weights, k=length)
+        sentences.append(" ".join(words).capitalize() + ".")
+        words_left -= length
+    return " ".join(sentences)
+
+
+def best_of(runs, fn, *args):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hours', type=float, default=1.0, help='Transcript length in hours of speech')
+    parser.add_argument('--corpus', type=int, default=50, help='Transcripts used to warm up the IDF table')
+    parser.add_argument('--runs', type=int, default=3, help='Repetitions (best time is reported)')
+    args = parser.parse_args()
+
+    text = make_transcript(args.hours)
+    idf_table = IdfTable()
+    warmup = TfidfSummarizer(idf_table)
+    for seed in range(1, args.corpus + 1):
+        warmup.summarize(make_transcript(0.1, seed=seed))
+
+    print("=" * 60)
+    print(f"{args.hours:g}h transcript: {len(text.split())} words, IDF over {idf_table.documents} documents")
+    print("=" * 60)
+
+    baseline = best_of(args.runs, SimpleSummarizer().summarize, text)
+    print(f"{'SimpleSummarizer':<24} {baseline * 1000:8.1f} ms  1.00x")
+    for mode in TfidfSummarizer.MODES:
+        # A throwaway table keeps repeated runs from inflating the document count
+        summarizer = TfidfSummarizer(IdfTable(), mode=mode)
+        summarizer.idf_table.documents, summarizer.idf_table.df = idf_table.documents, dict(idf_table.df)
+        elapsed = best_of(args.runs, summarizer.summarize, text)
+        print(f"{'TfidfSummarizer/' + mode:<24} {elapsed * 1000:8.1f} ms  {baseline / elapsed:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for TagEngine: jieba start-up cost and per-title tagging latency.
+
+1. Initialization in a fresh process: building the prefix dictionary from
+   dict.txt vs. loading the serialized cache from the state dir.
+2. Per-title latency of the old "first five jieba tokens" tagging vs.
+   TF-IDF ranking, and batch tagging with generate_many.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_tag_engine
+    python -m benchmarks.bench_tag_engine --titles 2000
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.idf_table import IdfTable
+from src.tag_engine import TagEngine
+from src.text_utils import load_jieba
+
+WORDS = ["科学", "实验", "自制", "神奇", "教程", "火箭", "磁铁", "电路", "化学", "反应", "液氮", "干冰",
+         "手工", "挑战", "测试", "居然", "成功", "失败", "简单", "视频", "分享", "今天", "我们", "一起"]
+ENGLISH = ["science", "experiment", "homemade", "amazing", "tutorial", "rocket", "magnet", "circuit",
+           "chemistry", "reaction", "nitrogen", "challenge", "test", "simple", "today", "together"]
+
+INIT = ("import time; t = time.perf_counter(); "
+        "from src.text_utils import load_jieba; load_jieba(); "
+        "print(time.perf_counter() - t)")
+
+
+def old_tags(title):
+    """The tag extraction YouTubeUploader.generate_tags used to do"""
+    import jieba
+    return [w for w in jieba.cut(title) if len(w) > 1 and w.strip()][:5]
+
+
+def make_videos(count, seed=0):
+    rng = random.Random(seed)
+    videos = []
+    for _ in range(count):
+        words = rng.sample(WORDS, 6)
+        videos.append({
+            "chinese_title": "".join(words),
+            "english_title": " ".join(rng.sample(ENGLISH, 5)),
+            "description": "".join(rng.choices(WORDS, k=30)),
+            "chinese_tags": rng.sample(WORDS, 3),
+        })
+    return videos
+
+
+def init_time(state_dir):
+    env = dict(os.environ, LRBAUTO_STATE_DIR=state_dir)
+    out = subprocess.run([sys.executable, "-c", INIT], capture_output=True, text=True, env=env, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--titles', type=int, default=500)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("jieba initialization (fresh process)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory(prefix="bench_tags_") as state_dir:
+        cold = init_time(state_dir)
+        cached = any(name.endswith(".cache") for name in os.listdir(state_dir))
+        warm = init_time(state_dir)
+        print(f"build from dict.txt:   {cold * 1000:7.0f} ms  (cache written: {cached})")
+        print(f"load serialized cache: {warm * 1000:7.0f} ms")
+
+    load_jieba()
+    videos = make_videos(args.titles)
+    engine = TagEngine(IdfTable())
+    engine.seed({f"seed{i}": v["chinese_title"] for i, v in enumerate(make_videos(200, seed=1))})
+
+    print("=" * 60)
+    print(f"Tagging {args.titles} titles")
+    print("=" * 60)
+    start = time.perf_counter()
+    for video in videos:
+        old_tags(video["chinese_title"])
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for video in videos:
+        engine.generate(video["chinese_title"], video["english_title"], video["chinese_tags"],
+                        video["description"])
+    single = time.perf_counter() - start
+
+    engine = TagEngine(IdfTable())
+    start = time.perf_counter()
+    engine.generate_many(videos)
+    batch = time.perf_counter() - start
+
+    print(f"first five tokens:     {old / len(videos) * 1000:7.3f} ms/title")
+    print(f"TF-IDF generate:       {single / len(videos) * 1000:7.3f} ms/title")
+    print(f"TF-IDF generate_many:  {batch / len(videos) * 1000:7.3f} ms/title")
+
+    sample = videos[0]
+    print(f"\nExample: {sample['chinese_title']}")
+    print(f"  first five: {old_tags(sample['chinese_title'])}")
+    print(f"  TF-IDF:     {engine.keywords(sample['chinese_title'], sample['description'])}")
+
+
+if __name__ == "__main__":
+    main()
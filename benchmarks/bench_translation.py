@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark the translation layer with the offline stub translator.
+
+Compares the old per-field blocking calls against CachedTranslator on a cold
+cache (batched, concurrent) and on a warm cache (a retried run).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_translation
+    python -m benchmarks.bench_translation --videos 50 --latency 0.3
+"""
+import argparse
+import time
+
+from src.translation import CachedTranslator, StubTranslator, TranslationCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=20, help='Videos (title + description each)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated seconds per request')
+    args = parser.parse_args()
+
+    texts = []
+    for i in range(args.videos):
+        texts.append(f"第{i}个科学小实验")
+        texts.append("关注我，每天一个好玩的科学实验")  # boilerplate shared by every video
+
+    print("=" * 60)
+    print(f"{args.videos} videos, {len(texts)} fields, {args.latency * 1000:.0f} ms per request")
+    print("=" * 60)
+
+    stub = StubTranslator(latency=args.latency)
+    start = time.perf_counter()
+    for text in texts:
+        stub.translate(text)
+    sequential = time.perf_counter() - start
+    print(f"{'sequential, uncached':<24} {sequential:6.2f}s  {stub.calls:4d} requests")
+
+    cache = TranslationCache()
+    translator = CachedTranslator(lambda: StubTranslator(latency=args.latency), cache=cache)
+    start = time.perf_counter()
+    translator.translate_many(texts)
+    cold = time.perf_counter() - start
+    print(f"{'batched, cold cache':<24} {cold:6.2f}s  {translator.stats['requests']:4d} requests")
+
+    translator = CachedTranslator(lambda: StubTranslator(latency=args.latency), cache=cache)
+    start = time.perf_counter()
+    translator.translate_many(texts)
+    warm = time.perf_counter() - start
+    print(f"{'retry, warm cache':<24} {warm:6.2f}s  {translator.stats['requests']:4d} requests")
+
+
+if __name__ == "__main__":
+    main()
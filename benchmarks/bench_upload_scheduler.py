@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Exercises UploadScheduler against the fake YouTube server with quotas enforced.
+
+1. Drains a queue of videos over 1 and over N channels and compares wall time.
+2. Uploads more videos than today's quota allows: the rest are queued, kept on
+   disk, and uploaded by a drain() on the next quota day.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_upload_scheduler
+    python -m benchmarks.bench_upload_scheduler --videos 12 --channels 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import requests
+
+from benchmarks.fake_youtube import FakeYouTube
+from src.resumable_upload import ResumableUploader
+from src.upload_scheduler import UploadScheduler, QuotaTracker, UploadQueue, QUOTA_COSTS
+
+
+class FakeChannel:
+    """The parts of YouTubeUploader the scheduler uses, talking to the fake server"""
+
+    def __init__(self, name, upload_url):
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {name}"
+        self.upload_url = upload_url
+        self.last_error = None
+
+    def upload_video(self, file_path, title, description, privacy_status="private", tags=None):
+        self.last_error = None
+        try:
+            body = {"snippet": {"title": title, "description": description, "tags": tags or []},
+                    "status": {"privacyStatus": privacy_status}}
+            uploader = ResumableUploader(self.session, upload_url=self.upload_url, backoff=0.01)
+            return uploader.upload_file(file_path, body)["id"]
+        except Exception as e:
+            self.last_error = e
+            return None
+
+    def upload_captions(self, video_id, subtitles):
+        return None
+
+
+def make_jobs(work_dir, count, size_mb):
+    jobs = []
+    for i in range(count):
+        folder = os.path.join(work_dir, "downloads", f"video{i}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, "video_subtitled.mp4")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size_mb * 1024 * 1024))
+        jobs.append({"id": f"video{i}", "video_path": path, "title": f"Video {i}", "description": ""})
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=8)
+    parser.add_argument('--channels', type=int, default=3)
+    parser.add_argument('--size-mb', type=int, default=8)
+    parser.add_argument('--upload-delay', type=float, default=0.25, help='Simulated latency per chunk request (s)')
+    args = parser.parse_args()
+    insert = QUOTA_COSTS["videos.insert"]
+
+    with tempfile.TemporaryDirectory(prefix="bench_scheduler_") as work_dir:
+        print("=" * 60)
+        print(f"Draining {args.videos} queued videos of {args.size_mb} MB")
+        print("=" * 60)
+        for channels in (1, args.channels):
+            with FakeYouTube(chunk_delay=args.upload_delay, quota=100 * insert) as server:
+                queue = UploadQueue(directory=os.path.join(work_dir, f"pending{channels}"))
+                for job in make_jobs(work_dir, args.videos, args.size_mb):
+                    queue.put(job)
+                uploaders = {f"ch{i}": FakeChannel(f"ch{i}", server.upload_url) for i in range(channels)}
+                scheduler = UploadScheduler(uploaders, QuotaTracker(daily_quota=100 * insert), queue)
+                start = time.perf_counter()
+                uploaded = scheduler.drain()
+                elapsed = time.perf_counter() - start
+                print(f"{channels} channel(s): {elapsed:6.2f}s  uploaded {len(uploaded)}/{args.videos}")
+
+        print("=" * 60)
+        per_channel = 2
+        print(f"Quota for {per_channel} uploads per channel, {args.channels} channels, {args.videos} videos")
+        print("=" * 60)
+        now = [time.time()]
+        with FakeYouTube(quota=per_channel * insert) as server:
+            queue = UploadQueue(os.path.join(work_dir, "queue.json"), os.path.join(work_dir, "pending"))
+            uploaders = {f"ch{i}": FakeChannel(f"ch{i}", server.upload_url) for i in range(args.channels)}
+            tracker = QuotaTracker(os.path.join(work_dir, "quota.json"), daily_quota=per_channel * insert,
+                                   clock=lambda: now[0])
+            scheduler = UploadScheduler(uploaders, tracker, queue)
+            results = [scheduler.upload(job) for job in make_jobs(work_dir, args.videos, args.size_mb)]
+            uploaded = sum(1 for video_id, _ in results if video_id)
+            print(f"day 1: uploaded {uploaded}, queued {len(queue)}, "
+                  f"files kept: {all(os.path.exists(j['video_path']) for j in queue.jobs)}")
+
+            # Next quota day, new process: state comes back from disk
+            now[0] += 24 * 3600
+            server.reset_quota()
+            queue = UploadQueue(os.path.join(work_dir, "queue.json"), os.path.join(work_dir, "pending"))
+            tracker = QuotaTracker(os.path.join(work_dir, "quota.json"), daily_quota=per_channel * insert,
+                                   clock=lambda: now[0])
+            drained = UploadScheduler(uploaders, tracker, queue).drain()
+            print(f"day 2: uploaded {len(drained)} from the queue, {len(queue)} still waiting, "
+                  f"{len(server.videos)} videos on the server")
+
+
+if __name__ == "__main__":
+    main()
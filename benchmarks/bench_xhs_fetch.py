@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark XHSDownloader against the fake Xiaohongshu server.
+
+1. Lists a whole profile with iter_user_notes (cursor pagination).
+2. Resolves every video note one at a time (the old download_video path)
+   vs. get_notes_many with bounded concurrency and a rate limit.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_xhs_fetch
+    python -m benchmarks.bench_xhs_fetch --notes 300 --latency 0.2 --workers 8 --rate 10
+"""
+import argparse
+import contextlib
+import io
+import logging
+import time
+
+from benchmarks.fake_xhs import FakeXHS
+from src.xhs_downloader import XHSDownloader
+
+COOKIE = "a1=bench; web_session=bench"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--notes', type=int, default=150)
+    parser.add_argument('--latency', type=float, default=0.1, help='Simulated time per API request (s)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=20.0, help='Requests per second for the concurrent run')
+    args = parser.parse_args()
+    logging.getLogger("LRBAuto").setLevel(logging.WARNING)
+
+    with FakeXHS(notes=args.notes, latency=args.latency) as server, \
+            contextlib.redirect_stdout(io.StringIO()) as xhs_output:  # xhs prints every response
+        downloader = XHSDownloader(COOKIE, requests_per_second=None, host=server.base_url)
+        start = time.perf_counter()
+        notes = list(downloader.iter_user_notes("user"))
+        listing = time.perf_counter() - start
+        video_ids = [n["note_id"] for n in notes if n["type"] == "video"]
+        pages = server.requests["user_posted"]
+
+        start = time.perf_counter()
+        for note_id in video_ids:
+            downloader.get_note(note_id)
+        sequential = time.perf_counter() - start
+
+        downloader = XHSDownloader(COOKIE, max_workers=args.workers, requests_per_second=args.rate,
+                                   host=server.base_url)
+        server.max_active = 0
+        start = time.perf_counter()
+        infos = downloader.get_notes_many(video_ids)
+        concurrent = time.perf_counter() - start
+        resolved = sum(1 for info in infos.values() if info)
+        max_active, unsigned = server.max_active, server.unsigned
+    xhs_output.close()
+
+    print("=" * 60)
+    print(f"{args.notes} notes, {args.latency * 1000:.0f} ms per request")
+    print("=" * 60)
+    print(f"listing:             {listing:6.2f}s  {len(notes)} notes in {pages} pages, {len(video_ids)} videos")
+    print(f"one note at a time:  {sequential:6.2f}s")
+    print(f"get_notes_many:      {concurrent:6.2f}s  ({args.workers} workers, {args.rate:g} req/s, "
+          f"{resolved}/{len(video_ids)} resolved, {max_active} in flight at most)")
+    print(f"speed-up:            {sequential / concurrent:6.1f}x   unsigned requests: {unsigned}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Bilibili upload page (space.bilibili.com/<uid>/video).
+
+GET /<uid>/video?pn=N&ps=30 answers with HTML embedding
+`window.__INITIAL_STATE__ = {...};` holding that page's videos, newest
+first, like the server-rendered page scrape_all_bilibili.py reads. Pages
+past the end of the channel are empty, or repeat the last page with
+`repeat_last=True`. Every `fail_every`-th request is answered with 503,
+every `captcha_every`-th with a 200 verification page without any video
+data, like Bilibili's risk control.
+
+    with FakeBilibili(videos=300, latency=0.2) as server:
+        fetch_page(uid, 1, space_url=server.space_url)
+
+Run it standalone with `python -m benchmarks.fake_bilibili --port 8768`.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+_SPACE_PATH = re.compile(r"/(\d+)/video")
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Cancelled crawls close connections mid-request
+        pass
+
+
+class FakeBilibili:
+    """
+    Args:
+        videos: Videos on the channel
+        latency: Seconds added to every page request
+        fail_every: Answer every n-th request with 503 (None = never)
+        repeat_last: Pages past the end repeat the last page instead of being empty
+        captcha_every: Answer every n-th request with a verification page (None = never)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, videos=300, latency=0.0, fail_every=None, repeat_last=False,
+                 captcha_every=None):
+        now = int(time.time())
+        self.videos = [{"bvid": f"BV1fake{i:05d}", "title": f"视频 {i}", "created": now - i * 3600}
+                       for i in range(videos)]
+        self.latency = latency
+        self.fail_every = fail_every
+        self.repeat_last = repeat_last
+        self.captcha_every = captcha_every
+        self.requests = 0
+        self.failures = 0
+        self.pages = {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self.httpd = _QuietServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def space_url(self):
+        """URL template for fetch_page's space_url"""
+        return self.base_url + "/{uid}/video"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def page(self, number, size):
+        start = (number - 1) * size
+        if start >= len(self.videos) and self.repeat_last and self.videos:
+            start = (len(self.videos) - 1) // size * size
+        return self.videos[start:start + size]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, body, status=200):
+                payload = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if not _SPACE_PATH.fullmatch(parsed.path):
+                    return self._reply("not found", status=404)
+                query = parse_qs(parsed.query)
+                number = int(query.get("pn", ["1"])[0])
+                size = int(query.get("ps", ["30"])[0])
+                with server._lock:
+                    server.requests += 1
+                    fail = bool(server.fail_every) and server.requests % server.fail_every == 0
+                    captcha = bool(server.captcha_every) and server.requests % server.captcha_every == 0
+                    server.failures += fail or captcha
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    time.sleep(server.latency)
+                    if fail:
+                        return self._reply("busy", status=503)
+                    if captcha:
+                        return self._reply("<html><head><title>验证码</title></head>"
+                                           "<body><div id=\"geetest\"></div></body></html>")
+                    with server._lock:
+                        server.pages[number] = server.pages.get(number, 0) + 1
+                    state = {"archive": {"item": server.page(number, size)}}
+                    self._reply("<html><head><script>window.__INITIAL_STATE__="
+                                + json.dumps(state, ensure_ascii=False)
+                                + ";(function(){})();</script></head><body></body></html>")
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Bilibili upload pages")
+    parser.add_argument('--port', type=int, default=8768)
+    parser.add_argument('--videos', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--fail-every', type=int, default=None)
+    args = parser.parse_args()
+    server = FakeBilibili(port=args.port, videos=args.videos, latency=args.latency, fail_every=args.fail_every)
+    print(f"Fake Bilibili upload pages on {server.space_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a video CDN: serves files from a directory with
+single-range support (206 / Content-Range, ETag / If-Range), a per-connection bandwidth cap
+like the real CDNs apply, and optional dropped connections.
+
+    with FakeCDN(directory, mbps=50) as cdn:
+        HttpDownloader().download(cdn.url("video.mp4"), "out.mp4")
+
+Run it standalone with `python -m benchmarks.fake_cdn DIRECTORY --port 8767`.
+"""
+import argparse
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients close ranged and probe requests early; that is not an error here
+        pass
+
+
+class FakeCDN:
+    """
+    Args:
+        directory: Files to serve
+        mbps: Bandwidth per connection in Mbit/s (None = unlimited)
+        ranges: Honour Range requests (False answers every request with 200 and the whole file)
+        drop_after: Close the connection after this many bytes of a response (first `drops` responses only)
+    """
+
+    def __init__(self, directory, host="127.0.0.1", port=0, mbps=None, ranges=True, drop_after=None, drops=1):
+        self.directory = directory
+        self.mbps = mbps
+        self.ranges = ranges
+        self.drop_after = drop_after
+        self.drops = drops
+        self.requests = 0
+        self.range_requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self.httpd = _QuietServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, name):
+        return f"{self.base_url}/{name}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = os.path.join(server.directory, os.path.basename(unquote(urlparse(self.path).path)))
+                if not os.path.isfile(path):
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                stat = os.stat(path)
+                size = stat.st_size
+                etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+                start, end, status = 0, size - 1, 200
+                match = _RANGE.fullmatch(self.headers.get("Range", "").strip())
+                if_range = self.headers.get("If-Range")
+                if if_range and if_range != etag:
+                    # The client's copy is of an older version: send the whole file
+                    match = None
+                if match and server.ranges:
+                    first, last = match.groups()
+                    if first:
+                        start, end = int(first), min(int(last), size - 1) if last else size - 1
+                    elif last:
+                        start = max(size - int(last), 0)
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status = 206
+
+                with server._lock:
+                    server.requests += 1
+                    server.range_requests += status == 206
+                    drop = server.drop_after is not None and server.drops > 0
+                    if drop:
+                        server.drops -= 1
+
+                length = end - start + 1
+                self.send_response(status)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(length))
+                self.send_header("ETag", etag)
+                if server.ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                self.end_headers()
+
+                block = 256 * 1024
+                sent = 0
+                started = time.perf_counter()
+                with open(path, 'rb') as f:
+                    f.seek(start)
+                    while sent < length:
+                        if drop and sent >= server.drop_after:
+                            self.close_connection = True
+                            return
+                        chunk = f.read(min(block, length - sent))
+                        if not chunk:
+                            break
+                        try:
+                            self.wfile.write(chunk)
+                        except (BrokenPipeError, ConnectionResetError):
+                            return
+                        sent += len(chunk)
+                        with server._lock:
+                            server.bytes_sent += len(chunk)
+                        if server.mbps:
+                            # Pace to the cap instead of sleeping per block, so timer slack does not add up
+                            ahead = sent * 8 / (server.mbps * 1e6) - (time.perf_counter() - started)
+                            if ahead > 0:
+                                time.sleep(ahead)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake video CDN")
+    parser.add_argument('directory')
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--mbps', type=float, default=None)
+    args = parser.parse_args()
+    cdn = FakeCDN(args.directory, port=args.port, mbps=args.mbps)
+    print(f"Serving {args.directory} on {cdn.base_url}")
+    try:
+        cdn.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Xiaohongshu web API endpoints XHSDownloader uses.
+
+- GET  /api/sns/web/v1/user_posted  cursor-paginated note summaries (30 per page)
+- POST /api/sns/web/v1/feed         full note info with a video stream URL
+- GET  /stream/<note_id>.mp4        the video file (random bytes)
+
+Unsigned requests (no x-s / x-t headers) are refused with the sign-fault
+code, like the real API. Each API request waits `latency` seconds; the
+server counts requests and the highest number handled at once.
+
+    with FakeXHS(notes=90) as server:
+        downloader = XHSDownloader("a1=x; web_session=y", host=server.base_url)
+
+Run it standalone with `python -m benchmarks.fake_xhs --port 8766`.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PAGE_SIZE = 30
+SIGN_FAULT = 300015
+
+
+class FakeXHS:
+    """
+    Args:
+        notes: Notes on the user's profile, newest first; every third is an image note
+        latency: Seconds added to every API request
+        video_size: Bytes per video file
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, notes=90, latency=0.0, video_size=256 * 1024):
+        self.notes = [f"note{i:05d}" for i in range(notes)]
+        self.latency = latency
+        self.video_size = video_size
+        self.requests = {"user_posted": 0, "feed": 0, "stream": 0}
+        self.active = 0
+        self.max_active = 0
+        self.unsigned = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def note_type(self, note_id):
+        return "normal" if int(note_id[4:]) % 3 == 2 else "video"
+
+    def _enter(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, body, status=200, content_type="application/json"):
+                payload = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _signed(self):
+                if self.headers.get("x-s") and self.headers.get("x-t"):
+                    return True
+                with server._lock:
+                    server.unsigned += 1
+                self._reply({"success": False, "code": SIGN_FAULT, "msg": "sign fault"})
+                return False
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path.startswith("/stream/"):
+                    server._enter("stream")
+                    try:
+                        self._reply(os.urandom(server.video_size), content_type="video/mp4")
+                    finally:
+                        server._leave()
+                    return
+                if parsed.path != "/api/sns/web/v1/user_posted":
+                    return self._reply({"success": False, "code": 404}, status=404)
+                server._enter("user_posted")
+                try:
+                    time.sleep(server.latency)
+                    if not self._signed():
+                        return
+                    query = parse_qs(parsed.query, keep_blank_values=True)
+                    cursor = query.get("cursor", [""])[0]
+                    start = server.notes.index(cursor) + 1 if cursor in server.notes else 0
+                    page = server.notes[start:start + PAGE_SIZE]
+                    self._reply({"success": True, "data": {
+                        "cursor": page[-1] if page else "",
+                        "has_more": start + PAGE_SIZE < len(server.notes),
+                        "notes": [{"note_id": n, "type": server.note_type(n), "display_title": f"标题 {n}",
+                                   "cover": {"url": f"{server.base_url}/cover/{n}.jpg"}} for n in page],
+                    }})
+                finally:
+                    server._leave()
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                if parsed.path != "/api/sns/web/v1/feed":
+                    return self._reply({"success": False, "code": 404}, status=404)
+                server._enter("feed")
+                try:
+                    time.sleep(server.latency)
+                    if not self._signed():
+                        return
+                    note_id = body.get("source_note_id", "")
+                    if note_id not in server.notes:
+                        return self._reply({"success": False, "code": -510001, "msg": "笔记状态异常"})
+                    self._reply({"success": True, "data": {"items": [{"note_card": {
+                        "note_id": note_id, "type": server.note_type(note_id), "title": f"标题 {note_id}",
+                        "desc": f"描述 {note_id}",
+                        "video": {"media": {"stream": {"h264": [
+                            {"master_url": f"{server.base_url}/stream/{note_id}.mp4"}]}}},
+                    }}]}})
+                finally:
+                    server._leave()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Xiaohongshu API server")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--notes', type=int, default=90)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeXHS(port=args.port, notes=args.notes, latency=args.latency)
+    print(f"Fake Xiaohongshu API on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the YouTube resumable upload endpoint.
+
+Implements the parts of the protocol ResumableUploader uses: session
+creation (POST ?uploadType=resumable), chunk PUTs with Content-Range,
+status queries (bytes */total) and 308 Resume Incomplete replies.
+Failures can be injected to exercise retries and cross-run resume, and a
+daily quota per Authorization header can be enforced like the real API does
+(403 quotaExceeded once videos.insert calls would exceed it).
+
+    with FakeYouTube(fail_every=5) as server:
+        uploader = ResumableUploader(requests.Session(), upload_url=server.upload_url)
+
+Run it standalone with `python -m benchmarks.fake_youtube --port 8765`.
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)")
+
+
+class _Session:
+    def __init__(self, metadata, size):
+        self.metadata = metadata
+        self.size = size
+        self.received = 0
+        self.digest = hashlib.sha256()
+        self.video_id = None
+
+
+class FakeYouTube:
+    """
+    Args:
+        fail_every: Answer every n-th chunk PUT with 503 (0 = never)
+        drop_after: Close the connection once this many bytes were received in total
+            (simulates a dropped upload; triggers once)
+        chunk_delay: Seconds added to every chunk PUT (simulates a slower link)
+        quota: API units per Authorization header (None = unlimited); each session costs insert_cost
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, fail_every=0, drop_after=None, chunk_delay=0.0,
+                 quota=None, insert_cost=1600):
+        self.sessions = {}
+        self.videos = {}
+        self.fail_every = fail_every
+        self.drop_after = drop_after
+        self.chunk_delay = chunk_delay
+        self.quota = quota
+        self.insert_cost = insert_cost
+        self.quota_used = {}
+        self.requests = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def upload_url(self):
+        return f"{self.base_url}/upload/youtube/v3/videos"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=None, headers=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _error(self, status, reason, message=""):
+                self._reply(status, {"error": {"code": status, "message": message or reason,
+                                               "errors": [{"reason": reason, "message": message or reason}]}})
+
+            def _read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                if parse_qs(parsed.query).get("uploadType") != ["resumable"]:
+                    return self._error(400, "badRequest", "only resumable uploads are supported")
+                body = self._read_body()
+                refused = server.on_start(self)
+                if refused:
+                    return self._error(*refused)
+                size = self.headers.get("X-Upload-Content-Length")
+                session_id = uuid.uuid4().hex
+                with server._lock:
+                    server.sessions[session_id] = _Session(json.loads(body or b"{}"), int(size) if size else None)
+                self._reply(200, headers={"Location": f"{server.base_url}/upload/session/{session_id}"})
+
+            def do_PUT(self):
+                session_id = urlparse(self.path).path.rsplit("/", 1)[-1]
+                session = server.sessions.get(session_id)
+                data = self._read_body()
+                if session is None:
+                    return self._error(404, "notFound", "upload session not found")
+
+                match = _RANGE.fullmatch(self.headers.get("Content-Range", "").strip())
+                if not match:
+                    return self._error(400, "badContentRange")
+                start, end, total = match.groups()
+                if total != "*":
+                    session.size = int(total)
+
+                with server._lock:
+                    server.requests += 1
+                    fail = server.fail_every and start is not None and server.requests % server.fail_every == 0
+                if fail:
+                    return self._error(503, "backendError")
+
+                if start is not None:
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                    if int(start) != session.received:
+                        return self._status(session)  # Out of sync; tell the client where we are
+                    if server.drop_after is not None and server.bytes_received + len(data) > server.drop_after:
+                        server.drop_after = None
+                        self.close_connection = True
+                        self.connection.close()
+                        return
+                    session.digest.update(data)
+                    session.received += len(data)
+                    with server._lock:
+                        server.bytes_received += len(data)
+
+                self._status(session)
+
+            def _status(self, session):
+                if session.size is not None and session.received >= session.size:
+                    if session.video_id is None:
+                        session.video_id = uuid.uuid4().hex[:11]
+                        server.videos[session.video_id] = {"size": session.received,
+                                                           "sha256": session.digest.hexdigest(),
+                                                           "metadata": session.metadata}
+                    return self._reply(200, {"kind": "youtube#video", "id": session.video_id,
+                                             "snippet": session.metadata.get("snippet", {}),
+                                             "status": session.metadata.get("status", {})})
+                headers = {"Range": f"bytes=0-{session.received - 1}"} if session.received else {}
+                self._reply(308, headers=headers)
+
+        return Handler
+
+    def reset_quota(self):
+        """Starts a new quota day"""
+        with self._lock:
+            self.quota_used.clear()
+
+    def on_start(self, handler):
+        """Called when a session is created; returns (status, reason) to refuse it"""
+        if self.quota is None:
+            return None
+        credentials = handler.headers.get("Authorization", "")
+        with self._lock:
+            used = self.quota_used.get(credentials, 0)
+            if used + self.insert_cost > self.quota:
+                return 403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota."
+            self.quota_used[credentials] = used + self.insert_cost
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake YouTube resumable upload server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail-every', type=int, default=0)
+    args = parser.parse_args()
+    server = FakeYouTube(port=args.port, fail_every=args.fail_every)
+    print(f"Upload URL: {server.upload_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Download every video in one or more URL lists, several at a time.
+
+Replaces the generated download_*.sh scripts: downloads run in parallel
+(--workers), progress is kept in state/bulk_download.jsonl so a crashed or
+interrupted run resumes with what is left, and videos already in
+history.json or in the work dir are skipped.
+
+Examples:
+    python bulk_download.py /Volumes/myminihdd/xhsvdo/bilibili_all_urls.txt
+    python bulk_download.py urls.txt --workers 8 --backend yt-dlp
+    python bulk_download.py urls.txt --bbdown-args="--use-tv-api --ffmpeg-path /usr/local/bin/ffmpeg"
+"""
+import argparse
+import shlex
+import sys
+
+from src.bulk_download import (BBDownBackend, BulkDownloader, DownloadManifest, YtDlpBackend,
+                               known_video_keys, read_url_list)
+from src.utils import load_history, state_path
+
+WORK_DIR = "/Volumes/myminihdd/xhsvdo"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the videos in URL list files in parallel")
+    parser.add_argument('url_files', nargs='+', help='Text files with one URL or BV id per line')
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    parser.add_argument('--workers', type=int, default=4, help='Downloads in flight at once')
+    parser.add_argument('--backend', choices=['bbdown', 'yt-dlp'], default='bbdown')
+    parser.add_argument('--bbdown', default='BBDown', help='BBDown executable')
+    parser.add_argument('--bbdown-args', default='', help='Extra BBDown arguments, as one string')
+    parser.add_argument('--prefer-avc', action='store_true',
+                        help='yt-dlp: download H.264 over smaller HEVC/AV1 streams (for SUBTITLE_MODE smart/parallel)')
+    parser.add_argument('--retries', type=int, default=1)
+    parser.add_argument('--manifest', default=None, help='Download state file (default: state/bulk_download.jsonl)')
+    parser.add_argument('--no-skip', action='store_true', help='Do not skip videos found in history.json or the work dir')
+    parser.add_argument('--dry-run', action='store_true', help='Only list what would be downloaded')
+    args = parser.parse_args()
+
+    urls = []
+    for path in args.url_files:
+        urls += read_url_list(path)
+    if not urls:
+        print("❌ No valid URLs found")
+        sys.exit(1)
+
+    manifest = DownloadManifest(args.manifest or state_path("bulk_download.jsonl"))
+    skip_keys = set() if args.no_skip else known_video_keys(load_history(), args.work_dir)
+
+    downloader = None
+    if args.backend == 'yt-dlp':
+        from src.bilibili_downloader import BilibiliDownloader
+        downloader = BilibiliDownloader(user_id=None, prefer_avc=args.prefer_avc)
+        backend = YtDlpBackend(downloader)
+    else:
+        backend = BBDownBackend(args.bbdown, shlex.split(args.bbdown_args))
+
+    bulk = BulkDownloader(backend, args.work_dir, manifest, workers=args.workers, retries=args.retries,
+                          skip_keys=skip_keys)
+
+    print("=" * 70)
+    print(f"Bulk download of {len(urls)} videos to {args.work_dir}")
+    print("=" * 70)
+    if args.dry_run:
+        for url in bulk.pending(urls):
+            print(url)
+        return
+
+    try:
+        bulk.run(urls)
+    finally:
+        if downloader:
+            downloader.close()
+        print()
+        print("=" * 70)
+        print(f"✅ {bulk.summary()}")
+        print(f"   State: {manifest.path}")
+        print("=" * 70)
+    if bulk.stats['failed']:
+        print("⚠️  Run the same command again to retry the failed downloads")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Create download script from bilibili_video_links.txt
+Find bilibili_video_links.txt and print the bulk_download.py command for it
 """
 import os
 import sys
@@ -54,30 +54,11 @@ if not urls:
     print("❌ No valid URLs found in file")
     sys.exit(1)
 
-# Create download script
-output_script = "/Volumes/myminihdd/xhsvdo/download_all_bilibili.sh"
+# Downloads run through bulk_download.py (parallel, resumable, skips videos already downloaded)
+command = (f'python bulk_download.py "{input_file}" --work-dir /Volumes/myminihdd/xhsvdo '
+           '--bbdown-args="--use-tv-api --ffmpeg-path /usr/local/bin/ffmpeg"')
 
-with open(output_script, 'w', encoding='utf-8') as f:
-    f.write("#!/bin/bash\n\n")
-    f.write(f"# Download {len(urls)} Bilibili videos\n")
-    f.write(f"# Generated from: {input_file}\n\n")
-    f.write('echo "🎬 Starting download of all Bilibili videos..."\n')
-    f.write('echo ""\n\n')
-    
-    for i, url in enumerate(urls, 1):
-        f.write(f'echo "📥 Downloading {i}/{len(urls)}..."\n')
-        f.write(f'BBDown --use-tv-api --work-dir /Volumes/myminihdd/xhsvdo --ffmpeg-path /usr/local/bin/ffmpeg "{url}"\n')
-        f.write('echo ""\n\n')
-    
-    f.write(f'echo "✅ All {len(urls)} downloads complete!"\n')
-    f.write('echo ""\n')
-    f.write('echo "📁 Videos saved to: /Volumes/myminihdd/xhsvdo/"\n')
-
-os.chmod(output_script, 0o755)
-
-print(f"✅ Created download script: {output_script}")
-print()
 print("🚀 To download all videos, run:")
-print(f"   {output_script}")
+print(f"   {command}")
 print()
-print(f"   This will download {len(urls)} videos to your external HDD")
+print(f"   This will download {len(urls)} videos to your external HDD, 4 at a time (--workers to change)")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Organize downloaded videos into video_NNN folders for python -m src.main.
+
+Every new MP4 in the drop directory (BBDown, XHS-Downloader or
+bulk_download.py output) is moved to video_NNN/video.mp4 next to a
+metadata.json filled in from its file name and embedded tags (title,
+author, source URL, duration, codecs). Files whose content is already
+organized are moved to _duplicates/ instead.
+
+Examples:
+    python organize_videos.py
+    python organize_videos.py /path/to/downloads --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+from src.video_organizer import VideoOrganizer
+
+DROP_DIR = "/Volumes/myminihdd/xhsvdo"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Organize downloaded videos into video_NNN folders")
+    parser.add_argument('drop_dir', nargs='?', default=DROP_DIR)
+    parser.add_argument('--workers', type=int, default=None, help='Parallel ffprobe / hashing workers')
+    parser.add_argument('--dry-run', action='store_true', help='Only show what would be done')
+    args = parser.parse_args()
+
+    print("🎬 Video Organizer")
+    print("==================")
+    print()
+
+    if not os.path.isdir(args.drop_dir):
+        print(f"❌ Error: Cannot access {args.drop_dir}")
+        print("   Make sure your external HDD 'myminihdd' is connected!")
+        sys.exit(1)
+
+    organizer = VideoOrganizer(args.drop_dir, workers=args.workers)
+    videos = organizer.find_new_videos()
+    if not videos:
+        print(f"✅ No new .mp4 files in {args.drop_dir}")
+        return
+
+    print(f"📹 Found {len(videos)} new video(s), inspecting with {organizer.workers} workers...")
+    started = time.perf_counter()
+    items = organizer.plan(videos)
+    print(f"   Inspected in {time.perf_counter() - started:.1f}s "
+          f"({organizer.stats['full_hashes']} full hashes to confirm duplicates)")
+    print()
+
+    for item in items:
+        name = os.path.relpath(item['path'], args.drop_dir)
+        if 'duplicate_of' in item:
+            print(f"⏭️  {name} is a duplicate of {item['duplicate_of']}")
+        else:
+            meta = item['metadata']
+            duration = f"{meta['duration']:.0f}s" if meta['duration'] else "?"
+            print(f"✅ {item['folder']}: {meta['title']}  ({duration}, {meta['video_codec'] or '?'}) ← {name}")
+
+    if args.dry_run:
+        print()
+        print("Dry run: nothing was moved")
+        return
+
+    organizer.apply(items)
+    print()
+    print(f"🎉 Done! Organized {organizer.stats['organized']} video(s), "
+          f"moved {organizer.stats['duplicates']} duplicate(s) to _duplicates/")
+    print()
+    print("📝 Next steps:")
+    print("   1. Optionally review the generated metadata.json files (titles come from the file names)")
+    print("   2. Run: python3 -m src.main")
+
+
+if __name__ == "__main__":
+    main()
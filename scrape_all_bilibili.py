@@ -2,17 +2,36 @@
 """
 Scrape all video links from all pages of Bilibili user's upload page.
 21 pages × 40 videos = ~840 videos
+
+Pages are fetched concurrently (--concurrency) under a rate limit (--rate)
+and every finished page is appended to state/bilibili_crawl_<uid>.jsonl, so
+an interrupted crawl picks up where it stopped; --fresh starts over. The
+crawl stops early once pages stop producing new BV ids.
+
+With --incremental only the videos uploaded since the last run are scraped:
+paging stops at the first video recorded in state/bilibili_cursor.json.
 """
+import argparse
+import os
 import requests
-from bs4 import BeautifulSoup
-import json
-import re
 import time
 
-def scrape_page(uid, page_num):
-    """Scrape a single page of videos"""
+from src.bilibili_page import extract_initial_state, video_entry, bv_links
+from src.channel_cursor import ChannelCursor
+from src.page_crawler import PageCrawler
+from src.utils import state_path
+
+SPACE_URL = "https://space.bilibili.com/{uid}/video"
+
+
+def fetch_page(uid, page_num, session=None, space_url=SPACE_URL):
+    """
+    Scrape a single page of videos; raises on network and HTTP errors, and on
+    pages with neither __INITIAL_STATE__ nor video links (risk-control and
+    captcha pages), so they are retried instead of read as the end of the channel
+    """
     
-    url = f"https://space.bilibili.com/{uid}/video"
+    url = space_url.format(uid=uid)
     
     params = {
         'pn': page_num,  # Page number
@@ -26,91 +45,137 @@ def scrape_page(uid, page_num):
         'Referer': 'https://www.bilibili.com/',
     }
     
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        html = response.text
-        
-        # Look for __INITIAL_STATE__ which contains video data
-        match = re.search(r'window\.__INITIAL_STATE__\s*=\s*({.*?});', html, re.DOTALL)
-        
-        videos = []
-        
-        if match:
-            try:
-                data = json.loads(match.group(1))
-                
-                # Navigate through the data structure
-                if 'archive' in data and 'item' in data['archive']:
-                    for video in data['archive']['item']:
-                        bvid = video.get('bvid')
-                        title = video.get('title', 'Untitled')
-                        if bvid:
-                            videos.append({
-                                'bvid': bvid,
-                                'title': title,
-                                'url': f'https://www.bilibili.com/video/{bvid}'
-                            })
-            except:
-                pass
-        
-        # Fallback: parse HTML for BV links
-        if not videos:
-            soup = BeautifulSoup(html, 'html.parser')
-            seen = set()
-            
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if '/video/BV' in href:
-                    bv_match = re.search(r'(BV[a-zA-Z0-9]+)', href)
-                    if bv_match:
-                        bvid = bv_match.group(1)
-                        if bvid not in seen:
-                            seen.add(bvid)
-                            title = link.get('title', link.get_text(strip=True) or 'Untitled')
-                            videos.append({
-                                'bvid': bvid,
-                                'title': title[:100],
-                                'url': f'https://www.bilibili.com/video/{bvid}'
-                            })
-        
-        return videos
-        
-    except Exception as e:
-        print(f"Error on page {page_num}: {e}")
-        return []
-
-def main():
-    uid = "1966850363"
-    total_pages = 21
+    response = (session or requests).get(url, params=params, headers=headers, timeout=15)
+    response.raise_for_status()
     
-    print("=" * 70)
-    print(f"Scraping all videos from Bilibili user {uid}")
-    print(f"Total pages: {total_pages}")
-    print("=" * 70)
-    print()
+    html = response.text
     
-    all_videos = []
-    seen_bvids = set()
+    # Video data embedded in the page as window.__INITIAL_STATE__
+    videos = []
+    data = extract_initial_state(html)
+    if data and isinstance(data.get('archive'), dict):
+        for video in data['archive'].get('item') or []:
+            bvid = video.get('bvid')
+            if bvid:
+                videos.append(video_entry(bvid, video.get('title', 'Untitled'), video.get('created')))
+    
+    # Fallback: scan the HTML for BV links
+    if not videos:
+        videos = bv_links(html)
+    if not videos and data is None:
+        raise ValueError(f"page {page_num} has no video data (risk control or captcha page?)")
     
+    return videos
+
+
+def iter_new_videos(uid, cursor, total_pages, status=None, space_url=SPACE_URL):
+    """
+    Yields the videos not seen by the last run, newest first, stopping at the first known one.
+    status['caught_up'] is set when a known video was reached, status['error']
+    when a page could not be fetched.
+    """
+    status = status if status is not None else {}
+    status['caught_up'] = False
+    status['error'] = None
+    seen_bvids = set()
     for page in range(1, total_pages + 1):
         print(f"Scraping page {page}/{total_pages}...", end=' ', flush=True)
-        
-        videos = scrape_page(uid, page)
-        
-        # Deduplicate
-        new_videos = []
+
+        try:
+            videos = fetch_page(uid, page, space_url=space_url)
+        except Exception as e:
+            print(f"Error: {e}")
+            status['error'] = f"page {page}: {e}"
+            return
+        if not videos:
+            print("No videos")
+            return
+
+        new_count = 0
         for video in videos:
-            if video['bvid'] not in seen_bvids:
-                seen_bvids.add(video['bvid'])
-                new_videos.append(video)
-                all_videos.append(video)
-        
-        print(f"Found {len(new_videos)} new videos")
-        
+            if video['bvid'] in seen_bvids:
+                continue
+            seen_bvids.add(video['bvid'])
+            if cursor and cursor.is_known(uid, video['bvid'], video.get('created')):
+                print(f"Found {new_count} new videos, reached the last sync")
+                status['caught_up'] = True
+                return
+            new_count += 1
+            yield video
+
+        print(f"Found {new_count} new videos")
+
         # Be nice to the server
         time.sleep(1)
+
+
+def sync_new_videos(uid, cursor, total_pages, space_url=SPACE_URL):
+    """
+    Collects the videos uploaded since the last sync and advances the cursor over them.
+    The cursor only moves when the sync is complete: it reached the last synced video,
+    or, on the first sync, ran through every page without an error.
+    """
+    status = {}
+    videos = list(iter_new_videos(uid, cursor, total_pages, status, space_url))
+    # A page that failed part-way must not move the cursor past videos never scraped
+    complete = status['caught_up'] or (not cursor.get(uid) and not status['error'])
+    if videos and complete:
+        cursor.advance(uid, [{'id': v['bvid'], 'timestamp': v.get('created')} for v in videos])
+    elif videos:
+        print("⚠️  Did not reach the last synced video; cursor not advanced")
+    return videos, status
+
+
+def crawl_all_videos(uid, total_pages, args):
+    """Fetches every page concurrently, resuming from the JSONL file of an interrupted crawl"""
+    crawl_path = state_path(f"bilibili_crawl_{uid}.jsonl")
+    if args.fresh and os.path.exists(crawl_path):
+        os.remove(crawl_path)
+
+    session = requests.Session()
+    crawler = PageCrawler(lambda page: fetch_page(uid, page, session, args.space_url),
+                          output_path=crawl_path, key='bvid', concurrency=args.concurrency,
+                          rate=args.rate, burst=args.concurrency)
+    videos = crawler.run(1, total_pages)
+    session.close()
+
+    stats = crawler.stats
+    print(f"Fetched {stats['fetched']} pages in {stats['requests']} requests ({stats['retries']} retries, "
+          f"{stats['resumed']} resumed from the last run)")
+    if stats['failed']:
+        print(f"⚠️  {stats['failed']} pages failed; run again to fetch only those")
+    else:
+        # Complete: the next run should see the channel as it is then
+        os.remove(crawl_path)
+    return videos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape video links from a Bilibili user's upload pages")
+    parser.add_argument('--uid', default="1966850363")
+    parser.add_argument('--pages', type=int, default=21, help='Pages to scrape at most')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only scrape videos uploaded since the last --incremental run')
+    parser.add_argument('--concurrency', type=int, default=4, help='Pages in flight at once')
+    parser.add_argument('--rate', type=float, default=2.0, help='Page requests per second at most')
+    parser.add_argument('--fresh', action='store_true', help='Ignore pages saved by an interrupted crawl')
+    parser.add_argument('--space-url', default=SPACE_URL, help='Upload page URL template (for testing)')
+    args = parser.parse_args()
+    uid = args.uid
+    total_pages = args.pages
+    cursor = ChannelCursor(state_path("bilibili_cursor.json")) if args.incremental else None
+    kind = "new" if args.incremental else "all"
+
+    print("=" * 70)
+    print(f"Scraping {kind} videos from Bilibili user {uid}")
+    print(f"Total pages: {total_pages}")
+    print("=" * 70)
+    print()
+    
+    if cursor:
+        all_videos, status = sync_new_videos(uid, cursor, total_pages, args.space_url)
+    else:
+        all_videos = crawl_all_videos(uid, total_pages, args)
     
     print()
     print("=" * 70)
@@ -119,6 +184,13 @@ def main():
     print()
     
     if not all_videos:
+        if cursor and status['error']:
+            print(f"❌ Scraping failed on {status['error']}")
+            print("   Nothing was synced; run again later.")
+            return
+        if cursor and status['caught_up']:
+            print("✅ No new videos since the last sync.")
+            return
         print("❌ No videos found. The scraping method may not be working.")
         print("   This is likely due to JavaScript rendering or anti-bot protection.")
         return
@@ -127,42 +199,23 @@ def main():
     output_dir = "/Volumes/myminihdd/xhsvdo"
     
     # Save URLs only
-    with open(f"{output_dir}/bilibili_all_urls.txt", 'w', encoding='utf-8') as f:
+    with open(f"{output_dir}/bilibili_{kind}_urls.txt", 'w', encoding='utf-8') as f:
         for video in all_videos:
             f.write(f"{video['url']}\n")
     
-    print(f"✅ Saved {len(all_videos)} URLs to: {output_dir}/bilibili_all_urls.txt")
+    print(f"✅ Saved {len(all_videos)} URLs to: {output_dir}/bilibili_{kind}_urls.txt")
     
     # Save detailed list
-    with open(f"{output_dir}/bilibili_all_videos.txt", 'w', encoding='utf-8') as f:
+    with open(f"{output_dir}/bilibili_{kind}_videos.txt", 'w', encoding='utf-8') as f:
         for i, video in enumerate(all_videos, 1):
             f.write(f"{i}. {video['title']}\n")
             f.write(f"   {video['url']}\n\n")
     
-    print(f"✅ Saved detailed list to: {output_dir}/bilibili_all_videos.txt")
-    
-    # Create download script
-    with open(f"{output_dir}/download_all_videos.sh", 'w', encoding='utf-8') as f:
-        f.write("#!/bin/bash\n\n")
-        f.write(f"# Download all {len(all_videos)} videos from Bilibili user {uid}\n")
-        f.write(f"# Total pages scraped: {total_pages}\n\n")
-        
-        for i, video in enumerate(all_videos, 1):
-            title_safe = video['title'].replace('"', '\\"').replace('$', '\\$')
-            f.write(f'echo "Downloading {i}/{len(all_videos)}: {title_safe}"\n')
-            f.write(f'BBDown --work-dir /Volumes/myminihdd/xhsvdo "{video["url"]}"\n')
-            f.write(f'echo ""\n\n')
-        
-        f.write('echo "✅ All {len(all_videos)} downloads complete!"\n')
-    
-    import os
-    os.chmod(f"{output_dir}/download_all_videos.sh", 0o755)
-    
-    print(f"✅ Created download script: {output_dir}/download_all_videos.sh")
+    print(f"✅ Saved detailed list to: {output_dir}/bilibili_{kind}_videos.txt")
     
     print()
-    print("🚀 To download all videos, run:")
-    print(f"   {output_dir}/download_all_videos.sh")
+    print("🚀 To download all videos (in parallel, resumable), run:")
+    print(f"   python bulk_download.py {output_dir}/bilibili_{kind}_urls.txt")
     print()
     print(f"   This will download {len(all_videos)} videos to your external HDD")
 
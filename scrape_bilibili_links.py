@@ -3,9 +3,8 @@
 Scrape all video links from Bilibili user's upload page.
 """
 import requests
-from bs4 import BeautifulSoup
-import json
-import re
+
+from src.bilibili_page import extract_initial_state, video_entry, bv_links
 
 def scrape_bilibili_videos(uid):
     """Scrape videos from upload page"""
@@ -28,77 +27,36 @@ def scrape_bilibili_videos(uid):
         # Try to find video data in the page
         html = response.text
         
-        # Look for __INITIAL_STATE__ which contains video data
-        match = re.search(r'window\.__INITIAL_STATE__\s*=\s*({.*?});', html, re.DOTALL)
+        # Video data embedded in the page as window.__INITIAL_STATE__
+        data = extract_initial_state(html)
         
-        if match:
-            data = json.loads(match.group(1))
-            
+        if data:
             videos = []
             
             # Try to extract from different possible locations
             if 'sectionEpisodes' in data:
                 for section in data.get('sectionEpisodes', {}).values():
                     for ep in section.get('episodes', []):
-                        bvid = ep.get('bvid')
-                        title = ep.get('title', 'Untitled')
-                        if bvid:
-                            videos.append({
-                                'bvid': bvid,
-                                'title': title,
-                                'url': f'https://www.bilibili.com/video/{bvid}'
-                            })
+                        if ep.get('bvid'):
+                            videos.append(video_entry(ep['bvid'], ep.get('title', 'Untitled')))
             
             # Try archive list
             if 'archiveList' in data:
                 for video in data['archiveList']:
-                    bvid = video.get('bvid')
-                    title = video.get('title', 'Untitled')
-                    if bvid:
-                        videos.append({
-                            'bvid': bvid,
-                            'title': title,
-                            'url': f'https://www.bilibili.com/video/{bvid}'
-                        })
+                    if video.get('bvid'):
+                        videos.append(video_entry(video['bvid'], video.get('title', 'Untitled')))
             
             # Try vlist
             if 'vlist' in data:
                 for video in data['vlist']:
-                    bvid = video.get('bvid')
-                    title = video.get('title', 'Untitled')
-                    if bvid:
-                        videos.append({
-                            'bvid': bvid,
-                            'title': title,
-                            'url': f'https://www.bilibili.com/video/{bvid}'
-                        })
+                    if video.get('bvid'):
+                        videos.append(video_entry(video['bvid'], video.get('title', 'Untitled')))
             
             return videos
         
-        # Fallback: parse HTML for BV links
-        print("Trying HTML parsing fallback...")
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        videos = []
-        seen = set()
-        
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if '/video/BV' in href:
-                # Extract BV ID
-                bv_match = re.search(r'(BV[a-zA-Z0-9]+)', href)
-                if bv_match:
-                    bvid = bv_match.group(1)
-                    if bvid not in seen:
-                        seen.add(bvid)
-                        title = link.get('title', link.get_text(strip=True) or 'Untitled')
-                        videos.append({
-                            'bvid': bvid,
-                            'title': title[:100],  # Limit title length
-                            'url': f'https://www.bilibili.com/video/{bvid}'
-                        })
-        
-        return videos
+        # Fallback: scan the HTML for BV links
+        print("Trying HTML link fallback...")
+        return bv_links(html)
         
     except Exception as e:
         print(f"Error: {e}")
@@ -143,25 +101,8 @@ def main():
     
     print(f"✅ Saved detailed list to: {output_dir}/bilibili_videos.txt")
     
-    # Create download script
-    with open(f"{output_dir}/download_all.sh", 'w', encoding='utf-8') as f:
-        f.write("#!/bin/bash\n\n")
-        f.write(f"# Download all {len(videos)} videos from Bilibili user {uid}\n\n")
-        
-        for i, video in enumerate(videos, 1):
-            title_safe = video['title'].replace('"', '\\"')
-            f.write(f'echo "Downloading {i}/{len(videos)}: {title_safe}"\n')
-            f.write(f'BBDown --work-dir /Volumes/myminihdd/xhsvdo "{video["url"]}"\n\n')
-        
-        f.write('echo "✅ All downloads complete!"\n')
-    
-    import os
-    os.chmod(f"{output_dir}/download_all.sh", 0o755)
-    
-    print(f"✅ Created download script: {output_dir}/download_all.sh")
-    
     print(f"\n🚀 To download all {len(videos)} videos, run:")
-    print(f"   {output_dir}/download_all.sh")
+    print(f"   python bulk_download.py {output_dir}/bilibili_urls.txt")
 
 if __name__ == "__main__":
     main()
@@ -1,26 +1,331 @@
 import yt_dlp
 import os
+import glob
+import time
+import queue
 import logging
 import json
-from src.utils import clean_filename
+import shutil
+import threading
+import copy
+import itertools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from yt_dlp.utils import PagedList
+from src.utils import clean_filename, TokenBucket
+from src.encoding_profiles import get_profile
+from src.ffmpeg_runner import FFmpegRunner
 
 logger = logging.getLogger("LRBAuto")
 
+# Realistic browser headers to avoid anti-bot detection
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Referer': 'https://www.bilibili.com/',
+}
+
+def download_format(max_height=None, max_bitrate=None, prefer_avc=False):
+    """
+    yt-dlp format spec and sort order that pick the smallest stream meeting the target.
+
+    Everything is re-encoded after download, so a 4K or 1080p60 source taller
+    than the encoding profile keeps only costs transfer and merge time.
+    Within the height limit, streams are ranked by resolution (highest that
+    fits) and then by size (smallest first), so a smaller codec (HEVC/AV1) wins
+    over AVC at the same resolution. The smart and parallel subtitle modes
+    stream-copy H.264 only and fall back to a full burn otherwise; for them
+    `prefer_avc` ranks AVC first at each resolution, trading a larger
+    download for the cheaper encode.
+
+    Args:
+        max_height (int): Tallest video worth downloading (None = no limit)
+        max_bitrate (int): Total bitrate cap in kbit/s (None = no limit)
+        prefer_avc (bool): Prefer H.264 over smaller codecs at the same resolution
+
+    Returns:
+        (format, format_sort) for the yt-dlp options
+    """
+    limits = ""
+    if max_height:
+        limits += f"[height<={max_height}]"
+    if max_bitrate:
+        limits += f"[tbr<={max_bitrate}]"
+    # The capped choices first, then progressively looser fallbacks so a video
+    # without a matching stream is still downloaded
+    choices = [f"bv*{limits}+ba", f"b{limits}"]
+    if max_bitrate and max_height:
+        choices += [f"bv*[height<={max_height}]+ba"]
+    choices += ["bv*+ba", "b"]
+    # abr:128 keeps the audio at a bitrate the encoder would copy or produce anyway
+    format_sort = [f"res:{max_height}" if max_height else "res", "abr:128", "+size", "+br"]
+    if prefer_avc:
+        format_sort.insert(1, "vcodec:avc")
+    return "/".join(choices), format_sort
+
+
+def video_only_format(max_height=None, max_bitrate=None, prefer_avc=False):
+    """
+    Like download_format, but for the video stream alone (audio-first downloads
+    fetch the audio separately).
+    """
+    limits = ""
+    if max_height:
+        limits += f"[height<={max_height}]"
+    if max_bitrate:
+        limits += f"[tbr<={max_bitrate}]"
+    choices = [f"bv{limits}"]
+    if max_bitrate and max_height:
+        choices += [f"bv[height<={max_height}]"]
+    choices += ["bv"]
+    format_sort = [f"res:{max_height}" if max_height else "res", "+size", "+br"]
+    if prefer_avc:
+        format_sort.insert(1, "vcodec:avc")
+    return "/".join(choices), format_sort
+
+
+def is_dash(info):
+    """Whether a video is served as separate video and audio streams"""
+    formats = info.get('formats') or []
+    return (any(f.get('vcodec') not in (None, 'none') and f.get('acodec') == 'none' for f in formats)
+            and any(f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none') for f in formats))
+
+
+class AudioFirstDownload:
+    """
+    A download whose audio track is already on disk while the video stream is
+    still downloading in the background.
+
+    Attributes:
+        audio_path: The audio stream (None when the source is not DASH and was
+            downloaded as one file); it is deleted if the video download fails
+        future: Future with the merged video's path (None on failure)
+    """
+
+    def __init__(self, video_id, audio_path, future):
+        self.video_id = video_id
+        self.audio_path = audio_path
+        self.future = future
+
+    def video_path(self, timeout=None):
+        """Waits for the video download and merge; returns the video's path or None"""
+        return self.future.result(timeout)
+
+    def done(self):
+        return self.future.done()
+
+
+def _stream_size(fmt, duration):
+    """Size of a format in bytes: exact, approximate, or estimated from its bitrate"""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if not size and fmt.get('tbr') and duration:
+        size = fmt['tbr'] * 1000 / 8 * duration
+    return int(size or 0)
+
+
+def download_report(info):
+    """
+    Bytes of the streams yt-dlp selected vs. what bestvideo+bestaudio would have fetched
+    (the smallest stream at the highest resolution and frame rate, plus the best audio).
+
+    Returns:
+        dict with format, chosen_bytes, best_bytes and saved_bytes (0 when sizes are unknown)
+    """
+    duration = info.get('duration')
+    formats = info.get('formats') or []
+    chosen = info.get('requested_formats') or [info]
+    chosen_bytes = sum(_stream_size(f, duration) for f in chosen)
+
+    videos = [f for f in formats if f.get('vcodec') not in (None, 'none')]
+    audios = [f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')]
+    best_video = max(videos, key=lambda f: (f.get('height') or 0, f.get('fps') or 0, -_stream_size(f, duration)),
+                     default=None)
+    best_audio = max(audios, key=lambda f: f.get('abr') or f.get('tbr') or 0, default=None)
+    best_bytes = sum(_stream_size(f, duration) for f in (best_video, best_audio) if f)
+
+    return {
+        'format': info.get('format', ''),
+        'chosen_bytes': chosen_bytes,
+        'best_bytes': best_bytes,
+        'saved_bytes': max(best_bytes - chosen_bytes, 0) if chosen_bytes else 0,
+    }
+
+
 class BilibiliDownloader:
-    def __init__(self, user_id):
+    def __init__(self, user_id, max_workers=4, requests_per_second=2.0, encoding_profile=None,
+                 max_height=None, max_bitrate=None, fragment_concurrency=8, runner=None, prefer_avc=False):
         """
         Initialize Bilibili downloader for a specific user.
+
+        yt-dlp instances are created on first use and kept for the lifetime of
+        the downloader (one per concurrent caller), so extractors, cookies and
+        HTTP connections are set up once rather than on every call. Call
+        close() (or use the downloader as a context manager) when done.
         
         Args:
             user_id (str): Bilibili user ID (UID)
+            max_workers (int): Concurrent requests in get_video_info_many
+            requests_per_second (float): Rate limit for all metadata requests (None = unlimited)
+            encoding_profile (str): Download no taller than this profile encodes (default profile if None)
+            max_height (int): Explicit height limit, overrides the profile's
+            max_bitrate (int): Total bitrate cap in kbit/s for the downloaded streams
+            fragment_concurrency (int): Fragments / connections downloaded in parallel
+            runner (FFmpegRunner): Merges the streams of audio-first downloads
+            prefer_avc (bool): Download H.264 rather than smaller HEVC/AV1 streams
+                (for the smart and parallel subtitle modes, see download_format)
         """
         self.user_id = user_id
         self.user_url = f"https://space.bilibili.com/{user_id}"
         self.download_dir = "downloads"
         os.makedirs(self.download_dir, exist_ok=True)
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(requests_per_second, burst=max_workers)
+        self.max_height = max_height or get_profile(encoding_profile)["max_height"]
+        self.max_bitrate = max_bitrate
+        self.prefer_avc = prefer_avc
+        self.fragment_concurrency = fragment_concurrency
+        self.runner = runner or FFmpegRunner()
+        # Video streams of audio-first downloads, see download_audio_first()
+        self._video_executor = None
         
         # Load Bilibili cookies from environment variables and create cookie file
         self.cookie_file = self._create_cookie_file()
+
+        # Idle yt-dlp instances per kind ("flat", "info", "download")
+        self._pools = {}
+        self._instances = []
+        self._pool_lock = threading.Lock()
+        # Per-call instrumentation, see log_stats()
+        self.stats = {"calls": 0, "instances": 0, "setup_seconds": 0.0, "call_seconds": 0.0,
+                      "downloaded_bytes": 0, "saved_bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Waits for background video downloads, then closes every pooled yt-dlp instance (and its connections)"""
+        if self._video_executor:
+            self._video_executor.shutdown(wait=True)
+            self._video_executor = None
+        with self._pool_lock:
+            instances, self._instances, self._pools = self._instances, [], {}
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception as e:
+                logger.debug(f"Closing yt-dlp instance failed: {e}")
+
+    def _options(self, kind):
+        """
+        yt-dlp options shared by every call of a kind: "flat" and "info" for
+        metadata, "download" for the merged video, "audio" and "video" for the
+        two streams of an audio-first download
+        """
+        if kind in ("download", "audio", "video"):
+            if kind == "audio":
+                video_format, format_sort = "ba/b", ["abr:128", "+size", "+br"]
+            elif kind == "video":
+                video_format, format_sort = video_only_format(self.max_height, self.max_bitrate, self.prefer_avc)
+            else:
+                video_format, format_sort = download_format(self.max_height, self.max_bitrate, self.prefer_avc)
+            ydl_opts = {
+                'format': video_format,
+                'format_sort': format_sort,
+                'quiet': False,
+                'no_warnings': False,
+                'merge_output_format': 'mp4',  # Ensure output is mp4
+                'max_filesize': 500 * 1024 * 1024,  # 500MB limit
+                # DASH/HLS fragments in parallel instead of one after another
+                'concurrent_fragment_downloads': self.fragment_concurrency,
+            }
+            if kind != "video":
+                # CC and AI subtitle tracks land next to the media as <name>.<lang>.srt,
+                # where SubtitleSourceResolver picks them up instead of running Whisper
+                ydl_opts.update({
+                    'writesubtitles': True,
+                    'subtitleslangs': ['en.*', 'zh.*', 'ai-.*', '-danmaku'],
+                    'subtitlesformat': 'srt/vtt/best',
+                })
+            # Bilibili's DASH streams are single files, which yt-dlp fetches over one
+            # connection; aria2c splits them into parallel ranged requests
+            if shutil.which("aria2c"):
+                ydl_opts['external_downloader'] = {'http': 'aria2c'}
+                ydl_opts['external_downloader_args'] = {'aria2c': [
+                    '-x', str(self.fragment_concurrency), '-s', str(self.fragment_concurrency),
+                    '-k', '1M', '--console-log-level=warn', '--summary-interval=0',
+                ]}
+        else:
+            ydl_opts = {
+                'quiet': True,
+                'no_warnings': True,
+            }
+            if kind == "flat":
+                ydl_opts['extract_flat'] = True  # Only extract metadata, don't download
+        ydl_opts['http_headers'] = dict(HTTP_HEADERS)
+
+        # Add cookie file if available
+        if self.cookie_file:
+            ydl_opts['cookiefile'] = self.cookie_file
+        return ydl_opts
+
+    def _new_ydl(self, kind):
+        return yt_dlp.YoutubeDL(self._options(kind))
+
+    @contextlib.contextmanager
+    def _ydl(self, kind, **params):
+        """
+        Borrows a pooled yt-dlp instance of `kind` for one call.
+        An instance is only used by one thread at a time. `params` are per-call
+        options (outtmpl, playlistend) applied to the instance for this call and
+        restored before it goes back to the pool.
+        """
+        with self._pool_lock:
+            pool = self._pools.setdefault(kind, queue.LifoQueue())
+        try:
+            ydl = pool.get_nowait()
+        except queue.Empty:
+            started = time.perf_counter()
+            ydl = self._new_ydl(kind)
+            with self._stats_lock:
+                self.stats["instances"] += 1
+                self.stats["setup_seconds"] += time.perf_counter() - started
+            with self._pool_lock:
+                self._instances.append(ydl)
+
+        # yt-dlp reads these at call time, so they can change per call
+        saved = {key: ydl.params[key] for key in params if key in ydl.params}
+        ydl.params.update(params)
+        started = time.perf_counter()
+        try:
+            yield ydl
+        finally:
+            with self._stats_lock:
+                self.stats["calls"] += 1
+                self.stats["call_seconds"] += time.perf_counter() - started
+            for key in params:
+                if key in saved:
+                    ydl.params[key] = saved[key]
+                else:
+                    ydl.params.pop(key, None)
+            pool.put(ydl)
+
+    def log_stats(self):
+        """Logs how much time went into creating yt-dlp instances vs. the calls themselves"""
+        stats = self.stats
+        calls = max(stats["calls"], 1)
+        logger.info(
+            f"yt-dlp: {stats['calls']} calls on {stats['instances']} instances, "
+            f"setup {stats['setup_seconds']:.2f}s ({stats['setup_seconds'] / calls * 1000:.1f} ms/call), "
+            f"calls {stats['call_seconds']:.2f}s ({stats['call_seconds'] / calls * 1000:.1f} ms/call)"
+        )
+        if stats["downloaded_bytes"]:
+            logger.info(f"Downloaded {stats['downloaded_bytes'] / 1e6:.1f} MB, "
+                        f"saved {stats['saved_bytes'] / 1e6:.1f} MB by format selection")
     
     def _create_cookie_file(self):
         """
@@ -77,25 +382,8 @@ class BilibiliDownloader:
         try:
             logger.info(f"Fetching latest {limit} videos from Bilibili user {self.user_id}")
             
-            # Add realistic browser headers and cookies to avoid anti-bot detection
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,  # Only extract metadata, don't download
-                'playlistend': limit,  # Limit number of videos
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                    'Referer': 'https://www.bilibili.com/',
-                },
-            }
-            
-            # Add cookie file if available
-            if self.cookie_file:
-                ydl_opts['cookiefile'] = self.cookie_file
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            self.rate_limiter.acquire()
+            with self._ydl("flat", playlistend=limit) as ydl:
                 info = ydl.extract_info(self.user_url, download=False)
                 
                 if not info or 'entries' not in info:
@@ -105,12 +393,7 @@ class BilibiliDownloader:
                 videos = []
                 for entry in info['entries'][:limit]:
                     if entry:
-                        video_info = {
-                            'id': entry.get('id', ''),
-                            'title': entry.get('title', 'Untitled'),
-                            'url': entry.get('url', '') or f"https://www.bilibili.com/video/{entry.get('id', '')}",
-                            'description': entry.get('description', ''),
-                        }
+                        video_info = self._entry_video(entry)
                         videos.append(video_info)
                         logger.info(f"Found video: {video_info['id']} - {video_info['title']}")
                 
@@ -122,13 +405,81 @@ class BilibiliDownloader:
             logger.error(traceback.format_exc())
             return []
     
-    def download_video(self, video_id, video_title="video"):
+    @staticmethod
+    def _entry_video(entry):
+        """Video info dict of a flat playlist entry"""
+        video_id = entry.get('id', '')
+        return {
+            'id': video_id,
+            'title': entry.get('title', 'Untitled'),
+            'url': entry.get('url', '') or f"https://www.bilibili.com/video/{video_id}",
+            'description': entry.get('description', ''),
+            'timestamp': entry.get('timestamp'),
+        }
+
+    @staticmethod
+    def _iter_entries(entries):
+        """
+        Playlist entries one at a time. yt-dlp returns the user space as a
+        PagedList, which downloads a page only when an entry on it is read.
+        """
+        if isinstance(entries, PagedList):
+            for index in itertools.count():
+                try:
+                    yield entries[index]
+                except PagedList.IndexError:
+                    return
+        else:
+            yield from entries or []
+
+    def iter_new_videos(self, cursor, limit=None):
+        """
+        Yields the videos uploaded since the last sync, newest first.
+
+        Pages of the user space are fetched lazily and paging stops at the
+        first video the cursor knows, so checking a large channel costs one
+        or two requests. The cursor is advanced once the generator has run to
+        the end (reached a known video, the end of the channel or `limit`);
+        if the caller stops early nothing is recorded and the same videos are
+        yielded again next time.
+
+        Args:
+            cursor (ChannelCursor): Per-UID sync state
+            limit (int): Stop after this many new videos and treat the rest as
+                seen, e.g. to start syncing a large channel from its latest uploads
+
+        Yields:
+            dict: Video info with 'id', 'title', 'url', 'description', 'timestamp'
+        """
+        newest = (cursor.get(self.user_id) or {}).get('bvid')
+        logger.info(f"Syncing Bilibili user {self.user_id} since {newest or 'the first upload'}")
+        self.rate_limiter.acquire()
+        with self._ydl("flat") as ydl:
+            # process=False keeps the entries as yt-dlp's lazy PagedList
+            info = ydl.extract_info(self.user_url, download=False, process=False)
+            new_videos = []
+            for entry in self._iter_entries((info or {}).get('entries')):
+                if limit is not None and len(new_videos) >= limit:
+                    break
+                # Hidden-mode collections show up as playlists, not videos
+                if not entry or not str(entry.get('id', '')).startswith('BV'):
+                    continue
+                video = self._entry_video(entry)
+                if cursor.is_known(self.user_id, video['id'], video['timestamp']):
+                    break
+                new_videos.append(video)
+                yield video
+
+        cursor.advance(self.user_id, new_videos)
+
+    def download_video(self, video_id, video_title="video", output_dir=None):
         """
         Downloads a single video from Bilibili.
         
         Args:
             video_id (str): Bilibili video ID (BV ID)
-            video_title (str): Video title for filename
+            video_title (str): Video title for filename (None = the title yt-dlp reports)
+            output_dir (str): Folder to download into (default: self.download_dir)
             
         Returns:
             str: Path to downloaded video file, or None if failed
@@ -138,30 +489,11 @@ class BilibiliDownloader:
             logger.info(f"Downloading video: {video_id} - {video_title}")
             
             # Clean filename
-            safe_title = clean_filename(video_title)
-            output_template = os.path.join(self.download_dir, f"{video_id}_{safe_title}.%(ext)s")
-            
-            # Add realistic browser headers and cookies to avoid anti-bot detection
-            ydl_opts = {
-                'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-                'outtmpl': output_template,
-                'quiet': False,
-                'no_warnings': False,
-                'merge_output_format': 'mp4',  # Ensure output is mp4
-                'max_filesize': 500 * 1024 * 1024,  # 500MB limit
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                    'Referer': 'https://www.bilibili.com/',
-                },
-            }
-            
-            # Add cookie file if available
-            if self.cookie_file:
-                ydl_opts['cookiefile'] = self.cookie_file
+            safe_title = clean_filename(video_title) if video_title else "%(title).80B"
+            output_template = os.path.join(output_dir or self.download_dir, f"{video_id}_{safe_title}.%(ext)s")
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            started = time.perf_counter()
+            with self._ydl("download", outtmpl={'default': output_template}) as ydl:
                 info = ydl.extract_info(video_url, download=True)
                 
                 # Get the actual downloaded filename
@@ -169,6 +501,7 @@ class BilibiliDownloader:
                 
                 if os.path.exists(downloaded_file):
                     logger.info(f"Successfully downloaded: {downloaded_file}")
+                    self._report_download(info, downloaded_file, time.perf_counter() - started)
                     return downloaded_file
                 else:
                     logger.error(f"Download completed but file not found: {downloaded_file}")
@@ -180,6 +513,115 @@ class BilibiliDownloader:
             logger.error(traceback.format_exc())
             return None
     
+    def download_audio_first(self, video_id, video_title="video"):
+        """
+        Downloads the audio stream first and the video stream in the background.
+
+        For DASH sources (every Bilibili video) the audio is a small fraction
+        of the bytes: it is on disk after a few seconds, so transcription can
+        start while the video is still downloading. The streams are merged
+        (stream copy) once the video is done; callers that transcribe
+        audio_path join at their burn stage with video_path(). Other sources
+        are downloaded as one file in the background, with audio_path set to None.
+
+        This is a library API: src/main.py takes its videos from the remote
+        and local processors, not from Bilibili, so its pipeline does not use it.
+
+        Args:
+            video_id (str): Bilibili video ID (BV ID)
+            video_title (str): Video title for filename
+
+        Returns:
+            AudioFirstDownload, or None if the audio could not be downloaded
+        """
+        if self._video_executor is None:
+            self._video_executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                      thread_name_prefix="bilibili-video")
+        try:
+            video_url = f"https://www.bilibili.com/video/{video_id}"
+            base = os.path.join(self.download_dir, f"{video_id}_{clean_filename(video_title)}")
+            started = time.perf_counter()
+            self.rate_limiter.acquire()
+            # Subtitle tracks are named after the final video (<base>.<lang>.srt), not the audio
+            outtmpl = {'default': f"{base}.audio.%(ext)s", 'subtitle': f"{base}.%(ext)s"}
+            with self._ydl("audio", outtmpl=outtmpl) as ydl:
+                info = ydl.extract_info(video_url, download=False)
+                if not is_dash(info):
+                    logger.info(f"{video_id} is not DASH; downloading it as one file in the background")
+                    return AudioFirstDownload(video_id, None, self._video_executor.submit(
+                        self.download_video, video_id, video_title))
+                # A copy: the video stream is selected from the same info dict later
+                audio_info = ydl.process_ie_result(copy.deepcopy(info), download=True)
+                audio_path = ydl.prepare_filename(audio_info)
+            logger.info(f"Audio of {video_id} ready in {time.perf_counter() - started:.1f}s: {audio_path}")
+        except Exception as e:
+            logger.error(f"Error downloading audio of {video_id}: {e}")
+            return None
+
+        future = self._video_executor.submit(self._download_video_stream, info, base, audio_path, started)
+        return AudioFirstDownload(video_id, audio_path, future)
+
+    def _download_video_stream(self, info, base, audio_path, started):
+        """
+        Background half of download_audio_first: video stream, then merge with the audio.
+        On failure the stream files (audio included, partial ones too) and any
+        partial merge are removed.
+        """
+        video_id = info.get('id', '')
+        try:
+            with self._ydl("video", outtmpl={'default': f"{base}.video.%(ext)s"}) as ydl:
+                video_info = ydl.process_ie_result(info, download=True)
+                stream_path = ydl.prepare_filename(video_info)
+
+            output_path = f"{base}.mp4"
+            # The report compares what was fetched, both streams
+            video_info['requested_formats'] = [{'filesize': os.path.getsize(stream_path)},
+                                               {'filesize': os.path.getsize(audio_path)}]
+            self.runner.run([
+                'ffmpeg', '-y', '-i', stream_path, '-i', audio_path,
+                '-map', '0:v:0', '-map', '1:a:0', '-c', 'copy', '-movflags', '+faststart',
+                output_path,
+            ], duration=info.get('duration'), label=f"merge {video_id}")
+            os.remove(stream_path)
+            self._report_download(video_info, output_path, time.perf_counter() - started)
+            return output_path
+        except Exception as e:
+            logger.error(f"Error downloading video stream of {video_id}: {e}")
+            leftovers = glob.glob(f"{glob.escape(base)}.video.*") + glob.glob(f"{glob.escape(base)}.audio.*")
+            for path in leftovers + [audio_path, f"{base}.mp4"]:
+                if os.path.exists(path):
+                    os.remove(path)
+            return None
+
+    def _report_download(self, info, path, seconds):
+        """Logs the selected format and how many bytes it saved over bestvideo+bestaudio"""
+        report = download_report(info)
+        size = os.path.getsize(path)
+        with self._stats_lock:
+            self.stats["downloaded_bytes"] += size
+            self.stats["saved_bytes"] += report['saved_bytes']
+        message = f"Downloaded {report['format']}: {size / 1e6:.1f} MB in {seconds:.1f}s"
+        if report['best_bytes']:
+            message += (f", best quality would have been {report['best_bytes'] / 1e6:.1f} MB "
+                        f"(saved {report['saved_bytes'] / 1e6:.1f} MB)")
+        logger.info(message)
+
+    def _extract_info(self, video_id):
+        """Metadata of one video; raises on failure"""
+        video_url = f"https://www.bilibili.com/video/{video_id}"
+        self.rate_limiter.acquire()
+        with self._ydl("info") as ydl:
+            info = ydl.extract_info(video_url, download=False)
+
+        return {
+            'id': info.get('id', video_id),
+            'title': info.get('title', 'Untitled'),
+            'description': info.get('description', ''),
+            'uploader': info.get('uploader', ''),
+            'duration': info.get('duration', 0),
+            'view_count': info.get('view_count', 0),
+        }
+
     def get_video_info(self, video_id):
         """
         Gets detailed information about a video without downloading.
@@ -191,29 +633,7 @@ class BilibiliDownloader:
             dict: Video information including title, description, etc.
         """
         try:
-            video_url = f"https://www.bilibili.com/video/{video_id}"
-            
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-            }
-            
-            # Add cookie file if available
-            if self.cookie_file:
-                ydl_opts['cookiefile'] = self.cookie_file
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
-                
-                return {
-                    'id': info.get('id', video_id),
-                    'title': info.get('title', 'Untitled'),
-                    'description': info.get('description', ''),
-                    'uploader': info.get('uploader', ''),
-                    'duration': info.get('duration', 0),
-                    'view_count': info.get('view_count', 0),
-                }
-                
+            return self._extract_info(video_id)
         except Exception as e:
             logger.error(f"Error getting video info for {video_id}: {e}")
             return {
@@ -221,3 +641,25 @@ class BilibiliDownloader:
                 'title': 'Unknown',
                 'description': '',
             }
+
+    def get_video_info_many(self, video_ids, max_workers=None):
+        """
+        Gets information about many videos concurrently, within the rate limit.
+        
+        Args:
+            video_ids (list): Bilibili video IDs (BV IDs)
+            max_workers (int): Concurrent requests (default: the downloader's max_workers)
+            
+        Returns:
+            dict: video_id -> info dict as returned by get_video_info
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids:
+            return {}
+        workers = max(min(max_workers or self.max_workers, len(video_ids)), 1)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bilibili-info") as executor:
+            results = dict(zip(video_ids, executor.map(self.get_video_info, video_ids)))
+        logger.info(f"Resolved {len(video_ids)} videos in {time.perf_counter() - started:.1f}s with {workers} workers")
+        self.log_stats()
+        return results
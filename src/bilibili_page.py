@@ -0,0 +1,75 @@
+import re
+import json
+import html as html_lib
+
+# Server-rendered Bilibili pages assign their data to this global
+INITIAL_STATE_MARKER = "window.__INITIAL_STATE__"
+
+_decoder = json.JSONDecoder()
+_ASSIGNMENT = re.compile(r'\s*=\s*')
+# <a> elements pointing at a video: [^>] keeps the href inside the opening tag
+# and the lazy text group stops at the first </a> (or the next <a> when one is
+# never closed), so a page is scanned once without building a DOM. The text
+# may hold markup such as <span>Title</span>
+_BV_ANCHOR = re.compile(r'<a\b[^>]*?/video/(BV[0-9A-Za-z]{10})[^>]*>(.*?)(?:</a\s*>|(?=<a\b)|$)',
+                        re.IGNORECASE | re.DOTALL)
+_TITLE_ATTR = re.compile(r'(?<![\w-])title\s*=\s*"([^"]*)"', re.IGNORECASE)
+_TAG = re.compile(r'<[^>]*>')
+
+
+def extract_initial_state(html):
+    """
+    Parses the object assigned to window.__INITIAL_STATE__.
+
+    The marker is located with str.find and exactly one JSON value is
+    decoded from there with raw_decode, so braces or `};` inside strings
+    and the scripts that follow cannot cut the object short.
+
+    Returns:
+        The decoded dict, or None if the page has no (valid) initial state
+    """
+    start = html.find(INITIAL_STATE_MARKER)
+    while start != -1:
+        assignment = _ASSIGNMENT.match(html, start + len(INITIAL_STATE_MARKER))
+        if assignment:
+            try:
+                state, _ = _decoder.raw_decode(html, assignment.end())
+                if isinstance(state, dict):
+                    return state
+            except json.JSONDecodeError:
+                pass
+        start = html.find(INITIAL_STATE_MARKER, start + 1)
+    return None
+
+
+def video_entry(bvid, title, created=None):
+    """The video dict the scrapers write out"""
+    video = {'bvid': bvid, 'title': title, 'url': f'https://www.bilibili.com/video/{bvid}'}
+    if created is not None:
+        video['created'] = created
+    return video
+
+
+def iter_bv_links(html):
+    """
+    Yields (bvid, title) for every distinct video link in the page, in page order.
+
+    Fallback for pages without an initial state; the title is the link's
+    title attribute, else its text without tags. Cards often link a video
+    twice (cover image, then title), so the first link with a title wins.
+    """
+    titles = {}
+    for match in _BV_ANCHOR.finditer(html):
+        bvid = match.group(1)
+        if titles.get(bvid):
+            continue
+        title = _TITLE_ATTR.search(html, match.start(), match.start(2))
+        title = title.group(1) if title else _TAG.sub(' ', match.group(2))
+        titles[bvid] = ' '.join(html_lib.unescape(title).split())
+    for bvid, title in titles.items():
+        yield bvid, title or 'Untitled'
+
+
+def bv_links(html, max_title=100):
+    """Video dicts for the links in a page (see iter_bv_links)"""
+    return [video_entry(bvid, title[:max_title]) for bvid, title in iter_bv_links(html)]
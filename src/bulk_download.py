@@ -0,0 +1,307 @@
+import os
+import re
+import json
+import time
+import shutil
+import random
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.http_download import DownloadError
+from src.utils import load_json
+
+logger = logging.getLogger("LRBAuto")
+
+_BVID = re.compile(r'BV[0-9A-Za-z]{10}')
+# Per-URL working folders inside the work dir; finished files are moved out of them
+STAGING_DIR = ".bulk"
+# Lines of a failed downloader's output kept in the manifest
+ERROR_TAIL_LINES = 5
+
+
+def video_key(url):
+    """Identity of a video URL: its BV id if it has one, else the URL without query or fragment"""
+    match = _BVID.search(url)
+    if match:
+        return match.group(0)
+    return url.split('#', 1)[0].split('?', 1)[0].rstrip('/')
+
+
+def read_url_list(path):
+    """URLs (or bare BV ids) from a text file, one per line; # comments and duplicates are skipped"""
+    urls, seen = [], set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('BV'):
+                line = f"https://www.bilibili.com/video/{line}"
+            elif not line.startswith('http'):
+                continue
+            key = video_key(line)
+            if key not in seen:
+                seen.add(key)
+                urls.append(line)
+    return urls
+
+
+def known_video_keys(history=None, work_dir=None):
+    """
+    Keys of videos that need no download: ids and URLs recorded in the
+    history, plus BV ids in file names and metadata.json URLs under work_dir
+    """
+    keys = set()
+    if history:
+        for video_id in history.get("downloaded_ids", []):
+            keys.add(video_key(video_id))
+        for video_id, meta in history.get("processed_metadata", {}).items():
+            keys.update(_BVID.findall(video_id))
+            if meta.get("url"):
+                keys.add(video_key(meta["url"]))
+    if work_dir and os.path.isdir(work_dir):
+        for root, dirs, files in os.walk(work_dir):
+            dirs[:] = [d for d in dirs if d != STAGING_DIR]
+            for name in files:
+                keys.update(_BVID.findall(name))
+                if name == "metadata.json":
+                    url = (load_json(os.path.join(root, name), {}) or {}).get("url")
+                    if url:
+                        keys.add(video_key(url))
+    return keys
+
+
+class DownloadManifest:
+    """
+    Per-URL download state as an append-only JSONL log (the last record per
+    key wins), so a crash loses at most the record being written.
+
+    States: "running", "done", "failed". A "running" record left by a crash
+    or Ctrl-C counts as not downloaded. The log is compacted on load.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self.entries[record["key"]] = record
+                except (ValueError, KeyError, TypeError):
+                    # A line cut off by a crash
+                    continue
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self.entries.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def status(self, key):
+        entry = self.entries.get(key)
+        return entry["status"] if entry else None
+
+    def record(self, key, url, status, **fields):
+        entry = {"key": key, "url": url, "status": status, "at": int(time.time()), **fields}
+        with self._lock:
+            self.entries[key] = entry
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class BBDownBackend:
+    """
+    Runs the BBDown CLI for one URL.
+
+    Args:
+        binary: BBDown executable
+        args: Extra arguments (e.g. ["--use-tv-api", "--ffmpeg-path", "/usr/local/bin/ffmpeg"])
+        timeout: Seconds before a stuck download is killed
+    """
+
+    name = "BBDown"
+    # Picks up its own partial files in output_dir on the next attempt
+    resumable = True
+
+    def __init__(self, binary="BBDown", args=(), timeout=3600):
+        self.binary = binary
+        self.args = list(args)
+        self.timeout = timeout
+
+    def __call__(self, url, output_dir):
+        command = [self.binary, *self.args, "--work-dir", output_dir, url]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, errors="replace",
+                                    timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise DownloadError(f"{self.binary} timed out after {self.timeout}s")
+        except OSError as e:
+            raise DownloadError(f"Could not run {self.binary}: {e}")
+        if result.returncode != 0:
+            tail = (result.stderr or result.stdout).strip().splitlines()[-ERROR_TAIL_LINES:]
+            raise DownloadError(f"{self.binary} exited with {result.returncode}: {' | '.join(tail)}")
+
+
+class YtDlpBackend:
+    """
+    Downloads one Bilibili URL with a shared BilibiliDownloader (pooled yt-dlp
+    instances, format selection from its encoding profile).
+    """
+
+    name = "yt-dlp"
+    # Failed attempts can leave stream files and partial merges behind
+    resumable = False
+
+    def __init__(self, downloader):
+        self.downloader = downloader
+
+    def __call__(self, url, output_dir):
+        key = video_key(url)
+        if not _BVID.fullmatch(key):
+            raise DownloadError(f"Not a Bilibili video URL: {url}")
+        if not self.downloader.download_video(key, video_title=None, output_dir=output_dir):
+            raise DownloadError(f"yt-dlp could not download {key}")
+
+
+class BulkDownloader:
+    """
+    Downloads a list of URLs with `workers` downloads in flight.
+
+    - Every URL is downloaded into its own folder under <work_dir>/.bulk and
+      its files are moved into work_dir when it succeeds, so a crashed or
+      failed download never leaves partial files next to finished ones.
+      Backends that can resume (`resumable`, BBDown) find their partial files
+      there again on the next attempt; for the others the folder is cleared first
+    - Progress is recorded in a DownloadManifest; URLs marked done there or
+      found in `skip_keys` (history / catalog, see known_video_keys) are skipped
+    - Failed URLs are retried `retries` times with backoff, then left as
+      "failed" for the next run
+
+    Args:
+        backend: Callable(url, output_dir) that raises on failure (BBDownBackend, YtDlpBackend);
+            not resumable unless it has a true `resumable` attribute
+        work_dir: Where finished files end up
+        manifest: DownloadManifest
+    """
+
+    def __init__(self, backend, work_dir, manifest, workers=4, retries=1, backoff=5.0, skip_keys=None):
+        self.backend = backend
+        self.work_dir = work_dir
+        self.manifest = manifest
+        self.workers = max(workers, 1)
+        self.retries = retries
+        self.backoff = backoff
+        self.skip_keys = set(skip_keys or ())
+        self.stats = {"done": 0, "failed": 0, "skipped": 0, "bytes": 0, "seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def pending(self, urls):
+        """URLs that still need downloading, in order"""
+        pending = []
+        for url in urls:
+            key = video_key(url)
+            if key in self.skip_keys or self.manifest.status(key) == "done":
+                self.stats["skipped"] += 1
+            else:
+                pending.append(url)
+        return pending
+
+    def _move_out(self, staging):
+        """Moves downloaded files into work_dir (keeping sub-folders); returns (files, bytes)"""
+        files, size = [], 0
+        for root, _, names in os.walk(staging):
+            for name in names:
+                source = os.path.join(root, name)
+                target = os.path.join(self.work_dir, os.path.relpath(source, staging))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                stem, ext = os.path.splitext(target)
+                counter = 1
+                while os.path.exists(target):
+                    target = f"{stem} ({counter}){ext}"
+                    counter += 1
+                size += os.path.getsize(source)
+                shutil.move(source, target)
+                files.append(os.path.relpath(target, self.work_dir))
+        shutil.rmtree(staging, ignore_errors=True)
+        return files, size
+
+    def _download(self, url):
+        key = video_key(url)
+        staging = os.path.join(self.work_dir, STAGING_DIR, re.sub(r'[^\w.-]', '_', key)[-80:])
+        resumable = getattr(self.backend, "resumable", False)
+        self.manifest.record(key, url, "running")
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            # Leftovers of a failed attempt (or an interrupted run) would be moved out as results
+            if not resumable:
+                shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging, exist_ok=True)
+            try:
+                self.backend(url, staging)
+                files, size = self._move_out(staging)
+                if not files:
+                    raise DownloadError("the downloader finished without writing a file")
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    self.manifest.record(key, url, "failed", error=str(e)[:500], attempts=attempt + 1)
+                    with self._stats_lock:
+                        self.stats["failed"] += 1
+                    raise DownloadError(str(e)) from e
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"{key} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        seconds = time.perf_counter() - started
+        self.manifest.record(key, url, "done", files=files, bytes=size, seconds=round(seconds, 1),
+                             attempts=attempt + 1)
+        with self._stats_lock:
+            self.stats["done"] += 1
+            self.stats["bytes"] += size
+            self.stats["seconds"] += seconds
+        return size, seconds
+
+    def run(self, urls, progress=print):
+        """
+        Downloads every pending URL; returns the stats dict.
+        Ctrl-C stops starting new downloads; interrupted ones are retried on the next run.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        todo = self.pending(urls)
+        progress(f"{len(todo)} to download, {self.stats['skipped']} already downloaded "
+                 f"({self.workers} at a time with {getattr(self.backend, 'name', 'the backend')})")
+        started = time.perf_counter()
+        finished = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-download")
+        try:
+            futures = {executor.submit(self._download, url): url for url in todo}
+            for future in as_completed(futures):
+                finished += 1
+                key = video_key(futures[future])
+                try:
+                    size, seconds = future.result()
+                    progress(f"[{finished}/{len(todo)}] ✅ {key}  {size / 1e6:.1f} MB in {seconds:.1f}s")
+                except Exception as e:
+                    progress(f"[{finished}/{len(todo)}] ❌ {key}  {e}")
+        except KeyboardInterrupt:
+            progress("Interrupted; waiting for running downloads (they will be retried next run)")
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            self.stats["wall_seconds"] = time.perf_counter() - started
+        return self.stats
+
+    def summary(self):
+        """Aggregate throughput of the last run()"""
+        stats = self.stats
+        wall = max(stats.get("wall_seconds", 0.0), 1e-6)
+        return (f"{stats['done']} downloaded, {stats['failed']} failed, {stats['skipped']} skipped | "
+                f"{stats['bytes'] / 1e6:.1f} MB in {wall:.1f}s = {stats['bytes'] * 8 / wall / 1e6:.1f} Mbit/s, "
+                f"{stats['done'] / wall * 60:.1f} videos/min")
@@ -0,0 +1,79 @@
+import time
+import logging
+import threading
+from src.utils import load_json, save_json
+
+logger = logging.getLogger("LRBAuto")
+
+# Recent ids remembered per channel, so a deleted or re-ordered newest video
+# still leaves something to stop at
+DEFAULT_WINDOW = 50
+
+
+class ChannelCursor:
+    """
+    Newest video seen per Bilibili UID, persisted as JSON, for incremental syncs.
+
+    Upload lists are newest first, so a sync can stop paging at the first
+    video it already knows: one or two requests per run instead of walking
+    the whole channel.
+
+    Args:
+        path: JSON file to persist to (in-memory if None)
+        window: How many recent ids to remember per channel
+    """
+
+    def __init__(self, path=None, window=DEFAULT_WINDOW):
+        self.path = path
+        self.window = window
+        self.channels = load_json(path, {}) if path else {}
+        self._lock = threading.Lock()
+
+    def get(self, uid):
+        """Cursor of a channel: dict with bvid, timestamp, recent and synced_at, or None"""
+        return self.channels.get(str(uid))
+
+    def is_known(self, uid, video_id, timestamp=None):
+        """
+        Whether a video was seen by an earlier sync (or is older than the newest one seen).
+        Nothing is known for a channel that was never synced.
+        """
+        cursor = self.get(uid)
+        if not cursor:
+            return False
+        if video_id in cursor.get("recent", ()):
+            return True
+        newest = cursor.get("timestamp")
+        return bool(timestamp and newest and timestamp < newest)
+
+    def advance(self, uid, videos):
+        """
+        Records the videos of a completed sync as seen and saves.
+
+        Args:
+            uid: Bilibili user ID
+            videos: The new videos, newest first; dicts with 'id' and optionally 'timestamp'
+        """
+        videos = [v for v in videos if v.get("id")]
+        with self._lock:
+            cursor = self.channels.setdefault(str(uid), {"bvid": None, "timestamp": None, "recent": []})
+            if videos:
+                cursor["bvid"] = videos[0]["id"]
+                timestamps = [v["timestamp"] for v in videos if v.get("timestamp")]
+                if timestamps:
+                    cursor["timestamp"] = max(timestamps + [cursor.get("timestamp") or 0])
+                recent = [v["id"] for v in videos] + cursor.get("recent", [])
+                cursor["recent"] = list(dict.fromkeys(recent))[:self.window]
+            cursor["synced_at"] = int(time.time())
+            self.save()
+        logger.info(f"Bilibili cursor for {uid}: {len(videos)} new, newest {cursor['bvid']}")
+
+    def reset(self, uid):
+        """Forgets a channel, so the next sync walks it from the start"""
+        with self._lock:
+            self.channels.pop(str(uid), None)
+            self.save()
+
+    def save(self):
+        if self.path:
+            save_json(self.path, self.channels, indent=2)
@@ -0,0 +1,111 @@
+import logging
+
+logger = logging.getLogger("LRBAuto")
+
+# Named x264 settings for re-encoding (burning subtitles).
+# YouTube re-encodes everything it receives, so anything above what it serves
+# for our audience only costs encode time and upload bandwidth.
+#
+#   preset     - x264 speed/size trade-off
+#   crf        - constant quality target (lower is better/larger)
+#   maxrate    - VBV cap so busy scenes can't blow up the file (None = uncapped)
+#   max_height - downscale anything taller, keeping aspect ratio (None = keep)
+#   max_fps    - drop frames above this rate (None = keep). Applies in every
+#                subtitle mode: parallel pieces are each capped, smart render
+#                does a full burn when the source is faster (copied GOPs keep
+#                their rate)
+#   audio      - "copy" or an AAC bitrate such as "128k"
+ENCODING_PROFILES = {
+    # What burn_subtitles did before profiles existed: ffmpeg's libx264 defaults
+    "source": {
+        "preset": "medium",
+        "crf": 23,
+        "maxrate": None,
+        "max_height": None,
+        "max_fps": None,
+        "audio": "copy",
+    },
+    "balanced": {
+        "preset": "veryfast",
+        "crf": 23,
+        "maxrate": "5M",
+        "max_height": 1080,
+        "max_fps": 30,
+        "audio": "copy",
+    },
+    "upload": {
+        "preset": "veryfast",
+        "crf": 25,
+        "maxrate": "2500k",
+        "max_height": 720,
+        "max_fps": 30,
+        "audio": "128k",
+    },
+    "fast": {
+        "preset": "ultrafast",
+        "crf": 26,
+        "maxrate": "2M",
+        "max_height": 720,
+        "max_fps": 30,
+        "audio": "copy",
+    },
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name=None):
+    """
+    Look up an encoding profile by name.
+
+    Raises:
+        ValueError: If the profile does not exist
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile '{name}', expected one of {', '.join(ENCODING_PROFILES)}")
+    return ENCODING_PROFILES[name]
+
+
+def scales_down(profile, height):
+    """Whether the profile would change the geometry of a video of this height"""
+    return bool(profile["max_height"]) and height > profile["max_height"]
+
+
+def caps_fps(profile, fps):
+    """Whether the profile would drop frames of a video at this frame rate"""
+    return bool(profile["max_fps"]) and fps > profile["max_fps"]
+
+
+def video_filters(profile):
+    """Filters to run before drawing subtitles (downscale only, never upscale)"""
+    filters = []
+    if profile["max_height"]:
+        filters.append(f"scale=-2:'min(ih,{profile['max_height']})'")
+    return filters
+
+
+def video_args(profile, fps_cap=True):
+    """libx264 output arguments for the profile"""
+    args = ['-c:v', 'libx264', '-preset', profile["preset"], '-crf', str(profile["crf"])]
+    if profile["maxrate"]:
+        # A buffer of twice the cap keeps quality steady without big spikes
+        args += ['-maxrate', profile["maxrate"], '-bufsize', _double_rate(profile["maxrate"])]
+    if fps_cap and profile["max_fps"]:
+        args += ['-fpsmax', str(profile["max_fps"])]
+    return args
+
+
+def audio_args(profile):
+    """Audio output arguments for the profile"""
+    if profile["audio"] == "copy":
+        return ['-c:a', 'copy']
+    return ['-c:a', 'aac', '-b:a', profile["audio"]]
+
+
+def _double_rate(rate):
+    """'2500k' -> '5000k', '5M' -> '10M'"""
+    number, unit = rate[:-1], rate[-1]
+    if not unit.isalpha():
+        number, unit = rate, ""
+    return f"{int(float(number) * 2)}{unit}"
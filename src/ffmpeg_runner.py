@@ -0,0 +1,291 @@
+import collections
+import json
+import logging
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger("LRBAuto")
+
+
+class FFmpegError(RuntimeError):
+    """ffmpeg exited with an error; `stderr` holds the tail of its log"""
+
+    def __init__(self, message, returncode=None, stderr=""):
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class FFmpegTimeout(FFmpegError):
+    """ffmpeg exceeded its wall-clock limit or stopped making progress"""
+
+
+class FFmpegCancelled(FFmpegError):
+    """The run was cancelled through FFmpegRunner.cancel()"""
+
+
+class FFmpegProgress:
+    """Latest values reported by `-progress`"""
+
+    __slots__ = ("frame", "fps", "speed", "out_time", "total_size", "duration", "done")
+
+    def __init__(self, duration=None):
+        self.frame = 0
+        self.fps = 0.0
+        self.speed = 0.0
+        self.out_time = 0.0
+        self.total_size = 0
+        self.duration = duration
+        self.done = False
+
+    @property
+    def percent(self):
+        if self.done:
+            return 100.0
+        if not self.duration:
+            return None
+        return min(self.out_time / self.duration * 100, 100.0)
+
+    def as_dict(self):
+        return {
+            "frame": self.frame,
+            "fps": self.fps,
+            "speed": self.speed,
+            "out_time": self.out_time,
+            "total_size": self.total_size,
+            "percent": self.percent,
+        }
+
+
+class _PipedOutput:
+    """
+    ffmpeg's piped stdout. Tracks whether the consumer is reading: while it is
+    not, ffmpeg may be blocked writing to a full pipe, which is not a stall.
+    """
+
+    def __init__(self, job, pipe):
+        self._job = job
+        self._pipe = pipe
+        self.reading = False
+
+    def read(self, size=-1):
+        self._job.last_advance = time.monotonic()
+        self.reading = True
+        try:
+            return self._pipe.read(size)
+        finally:
+            self.reading = False
+            self._job.last_advance = time.monotonic()
+
+    def close(self):
+        self._pipe.close()
+
+    def __getattr__(self, name):
+        return getattr(self._pipe, name)
+
+
+class FFmpegJob:
+    """A running ffmpeg process; call wait() to supervise it until it exits"""
+
+    def __init__(self, runner, cmd, duration=None, stdout=None, label="ffmpeg"):
+        self.runner = runner
+        self.label = label
+        self.progress = FFmpegProgress(duration)
+        self.stderr_tail = collections.deque(maxlen=runner.stderr_lines)
+        self.started = time.monotonic()
+        self.last_advance = self.started
+        self._last_logged = None
+        self._cancelled = threading.Event()
+
+        logger.debug(f"Running command: {cmd}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=stdout if stdout is not None else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        self.stdout = _PipedOutput(self, self.process.stdout) if self.process.stdout else None
+        self._reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._reader.start()
+
+    def _read_stderr(self):
+        # Progress blocks and log lines share stderr, so stdout stays free for piped output
+        for raw in self.process.stderr:
+            line = raw.decode("utf-8", errors="replace").strip()
+            key, sep, value = line.partition("=")
+            if sep and key.replace("_", "").isalnum() and " " not in key:
+                self._update(key, value.strip())
+            elif line:
+                self.stderr_tail.append(line)
+
+    def _update(self, key, value):
+        progress = self.progress
+        try:
+            if key == "frame":
+                frame = int(value)
+                if frame != progress.frame:
+                    self.last_advance = time.monotonic()
+                progress.frame = frame
+            elif key == "fps":
+                progress.fps = float(value)
+            elif key == "speed":
+                progress.speed = float(value.rstrip("x")) if value not in ("N/A", "") else 0.0
+            elif key in ("out_time_us", "out_time_ms"):
+                # Both keys are in microseconds (out_time_ms is a historical misnomer)
+                out_time = int(value) / 1_000_000
+                if out_time > progress.out_time:
+                    self.last_advance = time.monotonic()
+                progress.out_time = out_time
+            elif key == "total_size":
+                progress.total_size = int(value)
+            elif key == "progress":
+                progress.done = value == "end"
+                self._report()
+        except ValueError:
+            pass  # N/A values at the start of a run
+
+    def _report(self):
+        if self.runner.on_progress:
+            try:
+                self.runner.on_progress(self.label, self.progress)
+            except Exception as e:
+                logger.debug(f"Progress callback failed: {e}")
+
+        # Log roughly every 10% so long encodes show signs of life without flooding the log
+        percent = self.progress.percent
+        bucket = int(percent // 10) if percent is not None else None
+        if bucket is not None and bucket != self._last_logged:
+            self._last_logged = bucket
+            logger.info(f"{self.label}: {percent:.0f}% (fps={self.progress.fps:.1f}, speed={self.progress.speed:.2f}x)")
+
+    def cancel(self):
+        """Stops this run only; wait() raises FFmpegCancelled at its next check"""
+        self._cancelled.set()
+
+    def _stalled(self, now):
+        # Piped output: only ffmpeg's fault while the consumer is waiting on it
+        if self.stdout is not None and not self.stdout.reading:
+            return False
+        return now - self.last_advance > self.runner.stall_timeout
+
+    def _stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def wait(self):
+        """
+        Supervises the process until it exits.
+
+        Returns:
+            FFmpegProgress with the final values
+
+        Raises:
+            FFmpegTimeout: Wall-clock or stall limit hit
+            FFmpegCancelled: cancel() or FFmpegRunner.cancel() was called
+            FFmpegError: Non-zero exit status
+        """
+        runner = self.runner
+        while True:
+            try:
+                self.process.wait(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+
+            now = time.monotonic()
+            error = None
+            if runner.cancel_event.is_set() or self._cancelled.is_set():
+                error = FFmpegCancelled(f"{self.label} cancelled")
+            elif runner.timeout and now - self.started > runner.timeout:
+                error = FFmpegTimeout(f"{self.label} exceeded {runner.timeout}s")
+            elif runner.stall_timeout and self._stalled(now):
+                error = FFmpegTimeout(f"{self.label} made no progress for {runner.stall_timeout}s")
+
+            if error:
+                self._stop()
+                self._reader.join(timeout=5)
+                error.returncode = self.process.returncode
+                error.stderr = "\n".join(self.stderr_tail)
+                raise error
+
+        self._reader.join(timeout=5)
+        if self.process.returncode != 0:
+            stderr = "\n".join(self.stderr_tail)
+            raise FFmpegError(f"{self.label} exited with status {self.process.returncode}: {stderr[-500:]}",
+                              returncode=self.process.returncode, stderr=stderr)
+
+        self.progress.done = True
+        logger.debug(f"{self.label} finished in {time.monotonic() - self.started:.1f}s")
+        return self.progress
+
+
+class FFmpegRunner:
+    """
+    Runs ffmpeg with `-progress` reporting, timeouts and cooperative cancellation.
+
+    Args:
+        timeout: Wall-clock limit per run in seconds (None = unlimited)
+        stall_timeout: Abort when neither frames nor output time advance for this long.
+            For piped output, time the consumer spends away from reading does not count
+        on_progress: Optional callback(label, FFmpegProgress) on every progress block
+        stderr_lines: How much of the log to keep for error messages
+    """
+
+    def __init__(self, timeout=None, stall_timeout=120, on_progress=None, stderr_lines=200):
+        self.timeout = timeout
+        self.stall_timeout = stall_timeout
+        self.on_progress = on_progress
+        self.stderr_lines = stderr_lines
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stops every run of this runner at its next check (within half a second)"""
+        self.cancel_event.set()
+
+    def start(self, cmd, duration=None, stdout=None, label="ffmpeg"):
+        """
+        Starts ffmpeg and returns an FFmpegJob without waiting for it.
+        Pass stdout=subprocess.PIPE to read piped output from job.stdout; the
+        stall check is suspended while the reader is busy elsewhere.
+        """
+        if self.cancel_event.is_set():
+            raise FFmpegCancelled(f"{label} cancelled")
+        cmd = [cmd[0], '-nostdin', '-nostats', '-progress', 'pipe:2'] + list(cmd[1:])
+        return FFmpegJob(self, cmd, duration=duration, stdout=stdout, label=label)
+
+    def run(self, cmd, duration=None, label="ffmpeg"):
+        """Runs ffmpeg to completion. See FFmpegJob.wait() for return value and errors."""
+        return self.start(cmd, duration=duration, label=label).wait()
+
+    def probe(self, path, entries="format=duration", stream=None, extra_args=()):
+        """
+        Runs ffprobe and returns its parsed JSON output.
+
+        Raises:
+            FFmpegError: ffprobe failed or timed out
+        """
+        cmd = ['ffprobe', '-v', 'error']
+        if stream:
+            cmd += ['-select_streams', stream]
+        cmd += list(extra_args)
+        cmd += ['-show_entries', entries, '-of', 'json', path]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True,
+                                    timeout=self.stall_timeout or None)
+        except subprocess.CalledProcessError as e:
+            raise FFmpegError(f"ffprobe failed on {path}: {e.stderr.strip()}", e.returncode, e.stderr)
+        except subprocess.TimeoutExpired:
+            raise FFmpegTimeout(f"ffprobe timed out on {path}")
+        return json.loads(result.stdout)
+
+    def probe_duration(self, path):
+        """Container duration in seconds, or None when unknown"""
+        try:
+            return float(self.probe(path)['format']['duration'])
+        except (FFmpegError, KeyError, TypeError, ValueError):
+            return None
@@ -0,0 +1,250 @@
+import os
+import time
+import random
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("LRBAuto")
+
+# Large reads keep the Python-level loop to a few hundred iterations per
+# 100 MB; urllib3's readinto() copies through read() anyway, so a
+# preallocated buffer would not save anything over this
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+# Files below this size are fetched over one connection even when parallel parts are enabled
+MIN_PART_SIZE = 4 * 1024 * 1024
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class DownloadError(RuntimeError):
+    """A download failed after all retries"""
+
+
+class HttpDownloader:
+    """
+    Streaming file downloader shared by the XHS and remote-folder sources.
+
+    - One pooled requests.Session (keep-alive across files and threads)
+    - Connect/read timeouts and retries with exponential backoff and jitter
+    - Resumes into `<path>.part` with a Range request after a dropped
+      connection, also across runs
+    - Optionally splits large files into `parallel_parts` byte ranges fetched
+      concurrently, when the server supports ranges (CDNs usually throttle
+      per connection)
+
+    Args:
+        session: requests.Session to use (a pooled one is created if None)
+        parallel_parts: Connections per file (1 = a single stream)
+        buffer_size: Bytes per read
+        timeout: (connect, read) timeout in seconds
+        retries: Attempts after the first one, per file or part
+        headers: Extra headers for every request (e.g. Referer)
+    """
+
+    def __init__(self, session=None, parallel_parts=1, buffer_size=DEFAULT_BUFFER_SIZE, timeout=(10, 60),
+                 retries=3, backoff=1.0, headers=None):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(parallel_parts * 2, 10))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        if headers:
+            session.headers.update(headers)
+        self.session = session
+        self.parallel_parts = max(int(parallel_parts or 1), 1)
+        self.buffer_size = buffer_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = {"files": 0, "bytes": 0, "seconds": 0.0, "resumed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _retry_delay(self, attempt):
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def _probe(self, url):
+        """(size, accepts_ranges) of a URL from a one-byte range request; size may be None"""
+        try:
+            with self.session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout) as r:
+                if r.status_code == 206:
+                    total = r.headers.get("Content-Range", "").rpartition("/")[2]
+                    return (int(total) if total.isdigit() else None), True
+                if r.ok and r.headers.get("Content-Length", "").isdigit():
+                    return int(r.headers["Content-Length"]), False
+        except requests.RequestException as e:
+            logger.debug(f"Probing {url} failed: {e}")
+        return None, False
+
+    def _write_stream(self, response, f, limit=None):
+        """Copies a response body into an open file; returns the bytes written"""
+        written = 0
+        for chunk in response.iter_content(chunk_size=self.buffer_size):
+            if limit is not None and written + len(chunk) > limit:
+                chunk = chunk[:limit - written]
+            f.write(chunk)
+            written += len(chunk)
+            if limit is not None and written >= limit:
+                break
+        return written
+
+    @staticmethod
+    def _validator(response):
+        """ETag (strong only) or Last-Modified of a response, for If-Range"""
+        etag = response.headers.get("ETag", "")
+        if etag and not etag.startswith("W/"):
+            return etag
+        return response.headers.get("Last-Modified")
+
+    def _fetch_single(self, url, part_path, total):
+        """
+        Downloads (or resumes) the whole file into part_path.
+
+        The response's validator is kept in `<part_path>.validator`. A .part
+        from an earlier run is only resumed when it has one, and the resume
+        sends If-Range, so a file changed on the server restarts instead of
+        being spliced onto the old prefix.
+        """
+        validator_path = f"{part_path}.validator"
+        # Without a validator, only a .part written by this call is trusted
+        written_here = False
+        for attempt in range(self.retries + 1):
+            validator = None
+            if os.path.exists(part_path) and os.path.exists(validator_path):
+                with open(validator_path, 'r', encoding='utf-8') as f:
+                    validator = f.read().strip() or None
+            resumable = os.path.exists(part_path) and (validator or written_here)
+            offset = os.path.getsize(part_path) if resumable else 0
+            if total is not None and offset >= total:
+                if offset == total:
+                    return
+                offset = 0
+            headers = {}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                if validator:
+                    headers["If-Range"] = validator
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as r:
+                    if r.status_code == 416 and offset:
+                        # Stale .part larger than the file: start over
+                        os.remove(part_path)
+                        continue
+                    if r.status_code in RETRY_STATUSES:
+                        raise DownloadError(f"HTTP {r.status_code}")
+                    r.raise_for_status()
+                    resumed = offset and r.status_code == 206
+                    if offset and not resumed:
+                        logger.info(f"File changed or Range ignored; restarting {url}")
+                    elif resumed:
+                        logger.info(f"Resuming {os.path.basename(part_path)} at {offset / 1e6:.1f} MB")
+                        with self._stats_lock:
+                            self.stats["resumed"] += 1
+                    if not resumed:
+                        # Written before the body, so any .part on disk has a matching validator
+                        new_validator = self._validator(r)
+                        if new_validator:
+                            with open(validator_path, 'w', encoding='utf-8') as f:
+                                f.write(new_validator)
+                        elif os.path.exists(validator_path):
+                            os.remove(validator_path)
+                    written_here = True
+                    with open(part_path, 'ab' if resumed else 'wb') as f:
+                        self._write_stream(r, f)
+                if total is None or os.path.getsize(part_path) >= total:
+                    return
+                raise DownloadError(f"connection closed at {os.path.getsize(part_path)}/{total} bytes")
+            except (requests.RequestException, DownloadError) as e:
+                if attempt == self.retries:
+                    raise DownloadError(f"Downloading {url} failed: {e}") from e
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Download of {url} interrupted ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _fetch_range(self, url, part_path, start, end):
+        """Downloads bytes [start, end] into their place in part_path, resuming within the range"""
+        position = start
+        for attempt in range(self.retries + 1):
+            try:
+                headers = {"Range": f"bytes={position}-{end}"}
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as r:
+                    if r.status_code != 206:
+                        raise DownloadError(f"HTTP {r.status_code} for a range request")
+                    with open(part_path, 'r+b') as f:
+                        f.seek(position)
+                        position += self._write_stream(r, f, limit=end - position + 1)
+                if position > end:
+                    return
+                raise DownloadError(f"range closed at {position}/{end + 1}")
+            except (requests.RequestException, DownloadError) as e:
+                if attempt == self.retries:
+                    raise DownloadError(f"Downloading bytes {start}-{end} of {url} failed: {e}") from e
+                time.sleep(self._retry_delay(attempt))
+
+    def _fetch_parallel(self, url, part_path, total):
+        """
+        Splits the file into parallel_parts ranges written into a preallocated
+        file. part_path is `<path>.ranges`, never the resumable `.part`: a
+        preallocated file has full size from the start, so after a kill it
+        would look like a finished single-stream download.
+        """
+        parts = min(self.parallel_parts, max(total // MIN_PART_SIZE, 1))
+        size = -(-total // parts)
+        ranges = [(i, min(i + size, total) - 1) for i in range(0, total, size)]
+        with open(part_path, 'wb') as f:
+            f.truncate(total)
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="download-part") as executor:
+                for future in [executor.submit(self._fetch_range, url, part_path, s, e) for s, e in ranges]:
+                    future.result()
+        except BaseException:
+            # A preallocated file has holes; it must not be kept for a later run
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+    def download(self, url, path):
+        """
+        Downloads `url` to `path`, written as `<path>.part` (single stream,
+        resumable) or `<path>.ranges` (parallel parts, discarded if interrupted)
+        and renamed when complete.
+
+        Returns:
+            path
+
+        Raises:
+            DownloadError: The download failed after all retries
+        """
+        part_path = f"{path}.part"
+        ranges_path = f"{path}.ranges"
+        if os.path.exists(ranges_path):
+            # Left by a killed parallel download; its holes cannot be resumed
+            os.remove(ranges_path)
+        started = time.perf_counter()
+        total, ranges = (None, False)
+        if self.parallel_parts > 1 or os.path.exists(part_path):
+            total, ranges = self._probe(url)
+
+        if (self.parallel_parts > 1 and ranges and total and total >= 2 * MIN_PART_SIZE
+                and not os.path.exists(part_path)):
+            self._fetch_parallel(url, ranges_path, total)
+            os.replace(ranges_path, path)
+        else:
+            self._fetch_single(url, part_path, total)
+            os.replace(part_path, path)
+            if os.path.exists(f"{part_path}.validator"):
+                os.remove(f"{part_path}.validator")
+
+        size = os.path.getsize(path)
+        seconds = time.perf_counter() - started
+        with self._stats_lock:
+            self.stats["files"] += 1
+            self.stats["bytes"] += size
+            self.stats["seconds"] += seconds
+        logger.info(f"Downloaded {os.path.basename(path)}: {size / 1e6:.1f} MB in {seconds:.1f}s "
+                    f"({size * 8 / max(seconds, 1e-6) / 1e6:.0f} Mbit/s)")
+        return path
+
+    def close(self):
+        self.session.close()
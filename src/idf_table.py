@@ -0,0 +1,61 @@
+import math
+import logging
+import numpy as np
+from src.utils import load_json, save_json
+
+logger = logging.getLogger("LRBAuto")
+
+
+class IdfTable:
+    """
+    Document frequencies over every processed document, persisted as JSON and
+    updated incrementally, so term weights reflect the whole corpus rather
+    than a single transcript. Documents added with a key are counted once per
+    key, so a video processed again does not inflate the frequencies.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.documents = 0
+        self.df = {}
+        self.keys = set()
+        self._dirty = False
+        if path:
+            data = load_json(path, {})
+            self.documents = int(data.get("documents", 0))
+            self.df = data.get("df", {})
+            self.keys = set(data.get("keys", []))
+            if self.documents:
+                logger.info(f"Loaded IDF table {path}: {self.documents} documents, {len(self.df)} terms")
+
+    def add_document(self, terms, key=None):
+        """
+        Counts one document; `terms` may contain duplicates.
+        Returns False (and counts nothing) if a document with `key` was already counted.
+        """
+        if key is not None:
+            if key in self.keys:
+                return False
+            self.keys.add(key)
+        df = self.df
+        for term in set(terms):
+            df[term] = df.get(term, 0) + 1
+        self.documents += 1
+        self._dirty = True
+        return True
+
+    def idf(self, term):
+        # Smoothed so unseen terms get the highest weight and nothing is zero
+        return math.log((1 + self.documents) / (1 + self.df.get(term, 0))) + 1
+
+    def idf_vector(self, vocabulary):
+        """IDF weights for a list of terms as a float32 array."""
+        get = self.df.get
+        df = np.fromiter((get(term, 0) for term in vocabulary), dtype=np.float32, count=len(vocabulary))
+        return np.log((1 + self.documents) / (1 + df)).astype(np.float32) + 1
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        save_json(self.path, {"documents": self.documents, "df": self.df, "keys": sorted(self.keys)})
+        self._dirty = False
@@ -1,12 +1,22 @@
 import os
 import json
 import logging
-from src.utils import load_history, mark_video_downloaded, is_video_downloaded, check_similarity
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import (load_history, mark_video_downloaded, unmark_video_downloaded, record_upload_failure,
+                       is_video_downloaded, check_similarity, state_path)
 from src.local_video_processor import LocalVideoProcessor
 from src.remote_video_processor import RemoteVideoProcessor
-from src.subtitle_gen import SubtitleGenerator
+from src.subtitle_gen import SubtitleGenerator, SUBTITLE_MODES
+from src.subtitle_source import SubtitleSourceResolver
+from src.encoding_profiles import ENCODING_PROFILES, DEFAULT_PROFILE
+from src.ffmpeg_runner import FFmpegRunner
 from src.youtube_uploader import YouTubeUploader
-from src.summarizer import SimpleSummarizer
+from src.upload_scheduler import UploadScheduler, QuotaTracker, UploadQueue, MAX_UPLOAD_ATTEMPTS
+from src.summarizer import TfidfSummarizer
+from src.tag_engine import TagEngine
+from src.text_utils import load_jieba
+from src.idf_table import IdfTable
+from src.translation import CachedTranslator, TranslationCache, StubTranslator
 from deep_translator import GoogleTranslator
 
 # Configure logging
@@ -15,21 +25,112 @@ logger = logging.getLogger("LRBAuto")
 
 # Constants
 DOWNLOAD_LIMIT_PER_RUN = 1  # Process 1 video per run
+FFMPEG_TIMEOUT = 3 * 3600  # Wall-clock limit per ffmpeg run (seconds)
+FFMPEG_STALL_TIMEOUT = 120  # Abort ffmpeg when it makes no progress for this long
+UPLOAD_CHUNK_MB = int(os.environ.get("UPLOAD_CHUNK_MB", "8"))  # Resumable upload chunk size
+DOWNLOAD_PARTS = int(os.environ.get("DOWNLOAD_PARTS", "4"))  # Parallel ranged connections per remote video
+PENDING_UPLOAD_DIR = os.environ.get("PENDING_UPLOAD_DIR", "pending_uploads")  # Encoded videos waiting for quota
+
+def _load_channels(refresh_token, client_secrets):
+    """
+    Upload channels as {name: (refresh_token, client_secrets)}. YOUTUBE_CHANNELS holds
+    a JSON list of {"name": ..., "refresh_token": ..., "client_secret": ...}; without
+    it the single YOUTUBE_REFRESH_TOKEN is used. A channel without its own
+    client_secret uses YOUTUBE_CLIENT_SECRET (client_secrets, None if unset).
+
+    YouTube charges quota to the OAuth client's Cloud project, so only channels
+    that bring their own client add quota; channels sharing a client share it.
+    """
+    configured = os.environ.get("YOUTUBE_CHANNELS", "").strip()
+    if not configured:
+        return {"default": (refresh_token, client_secrets)} if refresh_token else {}
+    channels = {}
+    for i, channel in enumerate(json.loads(configured)):
+        secrets = channel.get("client_secret") or client_secrets
+        if isinstance(secrets, str):
+            secrets = json.loads(secrets)
+        channels[channel.get("name") or f"channel{i + 1}"] = (channel["refresh_token"], secrets)
+    return channels
+
+def _prepare_metadata(translator, uploader, video_id, chinese_title, chinese_desc, chinese_tags,
+                      translation_warmup=None):
+    """
+    The per-video work that does not need the transcript: translation and tag
+    generation. Runs next to transcription/burning.
+    """
+    if translation_warmup is not None:
+        # Let the batched pass finish first so these texts aren't requested twice
+        translation_warmup.result()
+    logger.info("Translating title and description...")
+    english_title, english_desc = translator.translate_many([chinese_title, chinese_desc])
+    if english_title is None or english_desc is None:
+        logger.error("Translation failed, using fallback text")
+        # Use fallback
+        english_title = english_title or "Chinese Video"
+        english_desc = english_desc or "Video from China"
+    translator.cache.save()
+
+    return {
+        "english_title": english_title,
+        "english_desc": english_desc,
+        "bilingual_title": uploader.create_bilingual_title(chinese_title, english_title),
+        "tags": _generate_tags(uploader, video_id, chinese_title, english_title, chinese_tags, chinese_desc),
+    }
+
+def _generate_tags(uploader, video_id, chinese_title, english_title, chinese_tags, chinese_desc):
+    tags = uploader.generate_tags(chinese_title, english_title, chinese_tags, description=chinese_desc,
+                                  video_id=video_id)
+    uploader.tag_engine.save()
+    return tags
 
 def main():
     # Load configuration from environment variables
     youtube_client_secret = os.environ.get("YOUTUBE_CLIENT_SECRET")
     youtube_refresh_token = os.environ.get("YOUTUBE_REFRESH_TOKEN")
     remote_video_url = os.environ.get("REMOTE_VIDEO_URL", "https://chat.ainewskit.com/vdos/") # Default to user provided URL
+    # One of SUBTITLE_MODES (src/subtitle_gen.py), burn by default; set per channel in its workflow env
+    subtitle_mode = os.environ.get("SUBTITLE_MODE", "burn").strip().lower()
+    # tfidf (default) or textrank
+    summary_mode = os.environ.get("SUMMARY_MODE", "tfidf").strip().lower()
+    # Named x264 settings for burning, see src/encoding_profiles.py
+    encoding_profile = os.environ.get("ENCODING_PROFILE", DEFAULT_PROFILE).strip().lower()
 
-    if not all([youtube_client_secret, youtube_refresh_token]):
+    if not (youtube_refresh_token or os.environ.get("YOUTUBE_CHANNELS")):
         logger.error("Missing environment variables. Please check YOUTUBE_CLIENT_SECRET and YOUTUBE_REFRESH_TOKEN.")
         return
 
+    youtube_client_secrets_json = None
+    if youtube_client_secret:
+        try:
+            youtube_client_secrets_json = json.loads(youtube_client_secret)
+        except json.JSONDecodeError:
+            logger.error("Invalid JSON in YOUTUBE_CLIENT_SECRET")
+            return
+
     try:
-        youtube_client_secrets_json = json.loads(youtube_client_secret)
-    except json.JSONDecodeError:
-        logger.error("Invalid JSON in YOUTUBE_CLIENT_SECRET")
+        channels = _load_channels(youtube_refresh_token, youtube_client_secrets_json)
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        logger.error(f"Invalid YOUTUBE_CHANNELS, expected a JSON list of {{name, refresh_token, client_secret}}: {e}")
+        return
+    if not channels:
+        logger.error("YOUTUBE_CHANNELS is empty")
+        return
+    without_client = [name for name, (_, secrets) in channels.items() if not secrets]
+    if without_client:
+        logger.error(f"No client secret for channel(s) {', '.join(without_client)}. "
+                     f"Set YOUTUBE_CLIENT_SECRET or give them a client_secret in YOUTUBE_CHANNELS.")
+        return
+
+    if subtitle_mode not in SUBTITLE_MODES:
+        logger.error(f"Invalid SUBTITLE_MODE '{subtitle_mode}'. Expected one of: {', '.join(SUBTITLE_MODES)}")
+        return
+
+    if encoding_profile not in ENCODING_PROFILES:
+        logger.error(f"Invalid ENCODING_PROFILE '{encoding_profile}'. Expected one of: {', '.join(ENCODING_PROFILES)}")
+        return
+
+    if summary_mode not in TfidfSummarizer.MODES:
+        logger.error(f"Invalid SUMMARY_MODE '{summary_mode}'. Expected one of: {', '.join(TfidfSummarizer.MODES)}")
         return
 
     # Initialize components
@@ -38,15 +139,63 @@ def main():
     # Choose processor
     if remote_video_url:
         logger.info(f"Using RemoteVideoProcessor with URL: {remote_video_url}")
-        processor = RemoteVideoProcessor(base_url=remote_video_url)
+        processor = RemoteVideoProcessor(base_url=remote_video_url, parallel_parts=DOWNLOAD_PARTS)
     else:
         logger.info("Using LocalVideoProcessor")
         processor = LocalVideoProcessor(videos_dir="/Volumes/myminihdd/xhsvdo")
 
-    subtitle_gen = SubtitleGenerator(model_name="small")
-    uploader = YouTubeUploader(youtube_client_secrets_json, youtube_refresh_token)
-    translator = GoogleTranslator(source='zh-CN', target='en')
-    summarizer = SimpleSummarizer() # Initialize summarizer
+    runner = FFmpegRunner(timeout=FFMPEG_TIMEOUT, stall_timeout=FFMPEG_STALL_TIMEOUT)
+    subtitle_gen = SubtitleGenerator(model_name="small", encoding_profile=encoding_profile, runner=runner)
+    # I/O-bound work (auth, translation, tagging) runs here while the main thread
+    # transcribes and burns; results are joined only where they are needed
+    background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="metadata")
+    # Load jieba's dictionary (~1s) while the rest starts up instead of on first use
+    background.submit(load_jieba)
+    # Tag keywords are ranked by IDF over every processed video, counted once per video
+    # id; English keywords against the translated titles
+    tag_engine = TagEngine(IdfTable(state_path("tag_idf.json")), IdfTable(state_path("tag_idf_en.json")))
+    tag_engine.seed({video_id: m.get("title", "") for video_id, m in history.get("processed_metadata", {}).items()})
+    uploaders = {
+        name: YouTubeUploader(client_secrets, refresh_token,
+                              caption_upload=(subtitle_mode == "captions"),
+                              chunk_size=UPLOAD_CHUNK_MB * 1024 * 1024,
+                              tag_engine=tag_engine)
+        for name, (refresh_token, client_secrets) in channels.items()
+    }
+    # The first channel's uploader only provides the title/tag helpers
+    uploader = next(iter(uploaders.values()))
+    # Quota is tracked per OAuth client (Cloud project), which channels sharing a client share.
+    # Quota use and the upload queue survive between runs in the state dir; the queued video
+    # files live in PENDING_UPLOAD_DIR, which the workflow caches separately
+    scheduler = UploadScheduler(
+        uploaders,
+        quota=QuotaTracker(state_path("youtube_quota.json")),
+        queue=UploadQueue(state_path("upload_queue.json"), PENDING_UPLOAD_DIR),
+        projects={name: channel_uploader.client_id for name, channel_uploader in uploaders.items()}
+    )
+    # TRANSLATOR=stub swaps Google for an offline stand-in (tests, dry runs). Its
+    # placeholder output must never reach the persistent cache real runs read
+    if os.environ.get("TRANSLATOR", "google").strip().lower() == "stub":
+        translator = CachedTranslator(lambda: StubTranslator(source='zh-CN', target='en'),
+                                      cache=TranslationCache(), backend_name="stub")
+    else:
+        translator = CachedTranslator(lambda: GoogleTranslator(source='zh-CN', target='en'),
+                                      cache=TranslationCache(state_path("translations.json")))
+    # Existing subtitle tracks (sidecar files, Bilibili CC/AI) are used before falling back to Whisper
+    subtitle_source = SubtitleSourceResolver(subtitle_gen, translator)
+    # IDF learned from every transcript processed so far (persisted in the state dir)
+    summarizer = TfidfSummarizer(IdfTable(state_path("summary_idf.json")), mode=summary_mode)
+
+    # 0. Videos finished in earlier runs only need quota; they go first
+    for job, video_id, channel in scheduler.drain():
+        logger.info(f"Uploaded queued video {job['id']} to '{channel}': {video_id}")
+    for job in scheduler.lost:
+        # Its files did not survive (e.g. a fresh CI runner); process it again from the source
+        unmark_video_downloaded(job["id"], history)
+    if not scheduler.has_quota():
+        logger.warning(f"YouTube quota exhausted on every project, {len(scheduler.queue)} video(s) queued. "
+                       f"Not processing new videos until the quota resets.")
+        return
 
     # 1. Check for new videos
     logger.info("Checking for new videos...")
@@ -62,6 +211,13 @@ def main():
         return
     
     logger.info(f"Found {len(unprocessed_videos)} unprocessed video(s)")
+
+    # Translate every candidate's title and description in one batched pass in the
+    # background; results land in the persistent cache, so per-video lookups are free
+    translation_warmup = background.submit(translator.translate_many, [
+        text for v in unprocessed_videos
+        for text in (v['metadata'].get('title', ''), v['metadata'].get('description', ''))
+    ])
     
     videos_processed = 0
     
@@ -107,42 +263,45 @@ def main():
         logger.info(f"Processing video: {chinese_title}")
         
         try:
-            # 2. Generate subtitles
+            # Translation and tags run concurrently with steps 2-3
+            metadata_future = background.submit(_prepare_metadata, translator, uploader, folder_name,
+                                                 chinese_title, chinese_desc, chinese_tags,
+                                                 translation_warmup)
+
+            # 2. Generate subtitles (segments stay in memory for the summary and captions)
             logger.info("Generating subtitles...")
-            subtitle_path = subtitle_gen.generate_subtitles(video_path)
-            if not subtitle_path:
+            segments, subtitle_origin = subtitle_source.resolve(video_path)
+            if segments is None:
                 logger.error("Subtitle generation failed. Skipping.")
                 continue
+            subtitle_path = subtitle_gen.write_subtitles(video_path, segments,
+                                                         language=None if subtitle_origin == "whisper" else "en")
             
-            # 3. Burn subtitles into video
-            logger.info("Burning subtitles into video...")
-            subtitled_video_path = subtitle_gen.burn_subtitles(video_path, subtitle_path)
-            if not subtitled_video_path:
-                logger.error("Burning subtitles failed. Skipping.")
-                continue
-            
-            # 4. Translate title and description
-            logger.info("Translating title and description...")
-            try:
-                english_title = translator.translate(chinese_title)
-                english_desc = translator.translate(chinese_desc)
-            except Exception as e:
-                logger.error(f"Translation failed: {e}")
-                # Use fallback
-                english_title = "Chinese Video"
-                english_desc = "Video from China"
+            # 3. Burn/mux subtitles into video (or keep it as-is for caption upload).
+            # In stream mode the burn happens during the upload in step 6 instead
+            if subtitle_mode != "stream":
+                logger.info(f"Applying subtitles (mode: {subtitle_mode})...")
+                subtitled_video_path = subtitle_gen.apply_subtitles(video_path, subtitle_path, mode=subtitle_mode,
+                                                                    segments=segments)
+                if not subtitled_video_path:
+                    logger.error("Applying subtitles failed. Skipping.")
+                    continue
             
             # 4.5 Generate Summary from Subtitles (New Step)
             logger.info("Generating video summary from subtitles...")
-            srt_text = summarizer.extract_text_from_srt(subtitle_path)
-            video_summary = summarizer.summarize(srt_text)
+            video_summary = summarizer.summarize_segments(segments)
+            summarizer.idf_table.save()
             if video_summary:
                 logger.info(f"Generated summary: {video_summary[:50]}...")
             
+            # 4. Join the metadata branch (translation, tags)
+            prepared = metadata_future.result()
+            english_title = prepared["english_title"]
+            english_desc = prepared["english_desc"]
+            bilingual_title = prepared["bilingual_title"]
+            tags = prepared["tags"]
+
             # 5. Create bilingual content (Updated method signature)
-            bilingual_title = uploader.create_bilingual_title(chinese_title, english_title)
-            tags = uploader.generate_tags(chinese_title, english_title, chinese_tags)
-            
             bilingual_desc = uploader.create_bilingual_description(
                 chinese_title, english_title,
                 chinese_desc, english_desc,
@@ -153,32 +312,66 @@ def main():
             logger.info(f"Bilingual title: {bilingual_title}")
             logger.info(f"Generated {len(tags)} tags")
             
-            # 6. Upload to YouTube
-            logger.info("Uploading to YouTube...")
-            video_id = uploader.upload_video(
-                subtitled_video_path,
-                title=bilingual_title,
-                description=bilingual_desc,
-                tags=tags,
-                privacy_status="public"  # Changed to public as requested
-            )
-            
-            if video_id:
-                logger.info(f"Successfully uploaded! YouTube video ID: {video_id}")
-                
-                # 7. Mark as processed
-                mark_video_downloaded(folder_name, history, metadata)
-                videos_processed += 1
-                
-                # Clean up downloads if remote
-                if remote_video_url:
-                     import shutil
-                     if os.path.exists(video_info['folder_path']):
-                         shutil.rmtree(video_info['folder_path'])
-                         logger.info(f"Cleaned up {video_info['folder_path']}")
+            # 6. Upload to YouTube (or queue the finished video when no channel has quota left)
+            video_id = None
+            channel = scheduler.pick_channel() if subtitle_mode == "stream" else None
+            if channel:
+                # ffmpeg writes a fragmented MP4 to a pipe that is uploaded chunk by chunk while encoding
+                logger.info(f"Burning subtitles while uploading to YouTube channel '{channel}'...")
+                channel_uploader = scheduler.uploaders[channel]
+                video_id = subtitle_gen.burn_subtitles_stream(
+                    video_path, subtitle_path,
+                    lambda stream, finish: channel_uploader.upload_stream(
+                        stream,
+                        title=bilingual_title,
+                        description=bilingual_desc,
+                        tags=tags,
+                        privacy_status="public",
+                        before_finish=finish
+                    )
+                )
+                scheduler.record(channel, None if video_id else channel_uploader.last_error)
+            if subtitle_mode == "stream" and not video_id:
+                logger.warning("Streaming upload not possible; encoding to disk and uploading the file instead.")
+                subtitled_video_path = subtitle_gen.apply_subtitles(video_path, subtitle_path, mode=subtitle_mode)
+                if not subtitled_video_path:
+                    logger.error("Applying subtitles failed. Skipping.")
+                    continue
 
+            if not video_id:
+                logger.info("Uploading to YouTube...")
+                video_id, channel = scheduler.upload({
+                    "id": folder_name,
+                    "video_path": subtitled_video_path,
+                    "title": bilingual_title,
+                    "description": bilingual_desc,
+                    "tags": tags,
+                    "privacy_status": "public",  # Changed to public as requested
+                    "captions_path": subtitle_path if subtitle_mode == "captions" else None,
+                })
+
+            if video_id:
+                logger.info(f"Successfully uploaded to '{channel}'! YouTube video ID: {video_id}")
+            elif channel:
+                failures = record_upload_failure(folder_name, history)
+                if failures < MAX_UPLOAD_ATTEMPTS:
+                    logger.error(f"Upload to '{channel}' failed ({failures}/{MAX_UPLOAD_ATTEMPTS}); "
+                                 f"{folder_name} will be processed again next run.")
+                    continue
+                logger.error(f"Giving up on {folder_name} after {failures} failed uploads.")
             else:
-                logger.error("Upload failed.")
+                logger.warning("Upload deferred; the finished video is queued for the next run.")
+
+            # 7. Mark as processed (queued and given-up videos too; the queue owns queued files now)
+            mark_video_downloaded(folder_name, history, metadata)
+            videos_processed += 1
+
+            # Clean up downloads if remote
+            if remote_video_url:
+                 import shutil
+                 if os.path.exists(video_info['folder_path']):
+                     shutil.rmtree(video_info['folder_path'])
+                     logger.info(f"Cleaned up {video_info['folder_path']}")
                 
         except Exception as e:
             logger.error(f"Error processing video {folder_name}: {e}")
@@ -186,6 +379,7 @@ def main():
             logger.error(traceback.format_exc())
             continue
     
+    subtitle_source.log_stats()
     if videos_processed > 0:
         logger.info(f"Successfully processed {videos_processed} video(s)")
     else:
@@ -14,6 +14,12 @@ class MetadataHandler:
     
     REQUIRED_FIELDS = ["title", "description", "url"]
     OPTIONAL_FIELDS = ["author", "tags", "bv_id"]
+    # Values of the templates written by create_template() and the old
+    # organize_videos.sh; a folder still holding them has not been filled in
+    PLACEHOLDER_VALUES = {
+        "title": {"请填写中文标题", "视频标题 (Chinese Title)", "视频的中文标题"},
+        "description": {"请填写中文描述", "视频描述 (Chinese Description)", "视频的中文描述"},
+    }
     
     @staticmethod
     def load_metadata(json_path: str) -> Dict:
@@ -44,6 +50,12 @@ class MetadataHandler:
                 if not isinstance(metadata[field], str) or not metadata[field].strip():
                     raise ValueError(f"Field '{field}' must be a non-empty string")
             
+            # Reject templates nobody filled in: their shared titles would all
+            # look like duplicates of each other to the similarity check
+            for field, placeholders in MetadataHandler.PLACEHOLDER_VALUES.items():
+                if metadata[field].strip() in placeholders:
+                    raise ValueError(f"Field '{field}' is still the template placeholder")
+            
             # Validate optional fields if present
             if "tags" in metadata and not isinstance(metadata["tags"], list):
                 raise ValueError("Field 'tags' must be a list")
@@ -0,0 +1,173 @@
+import os
+import json
+import random
+import asyncio
+import logging
+from src.utils import TokenBucket
+
+logger = logging.getLogger("LRBAuto")
+
+
+class PageCrawler:
+    """
+    Crawls numbered listing pages concurrently with asyncio.
+
+    - `fetch_page(page)` is a blocking function (requests etc.) returning the
+      page's items as dicts; it runs in worker threads via asyncio.to_thread
+      and should raise on failure so the page is retried
+    - At most `concurrency` pages are in flight, started no faster than the
+      token bucket allows (`rate` per second, bursts of `burst`)
+    - Failed pages are retried with exponential backoff and jitter; a page
+      that still fails is logged and left for the next run
+    - Every finished page is appended to `output_path` as one JSON line, so
+      an interrupted crawl resumes where it stopped
+    - The crawl stops early once `stale_pages` consecutive pages (in page
+      order) brought no new ids
+
+    Args:
+        fetch_page: Callable(page) -> list of item dicts
+        output_path: JSONL file of finished pages (None = keep nothing on disk)
+        key: Item field that identifies it (e.g. "bvid")
+    """
+
+    def __init__(self, fetch_page, output_path=None, key="id", concurrency=4, rate=1.0, burst=2,
+                 retries=3, backoff=1.0, stale_pages=2):
+        self.fetch_page = fetch_page
+        self.output_path = output_path
+        self.key = key
+        self.concurrency = max(concurrency, 1)
+        self.rate_limiter = TokenBucket(rate, burst=burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.stale_pages = stale_pages
+        # requests counts every attempt (retries included), fetched the pages that succeeded
+        self.stats = {"requests": 0, "fetched": 0, "retries": 0, "failed": 0, "resumed": 0}
+
+    def load(self):
+        """
+        Pages finished by earlier runs: {page: items}. The file is rewritten
+        without lines cut off by an interruption, so new records are never
+        appended to a torn one.
+        """
+        pages = {}
+        if not self.output_path or not os.path.exists(self.output_path):
+            return pages
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    pages[int(record["page"])] = record["items"]
+                except (ValueError, KeyError, TypeError):
+                    # A line cut off by the interruption; that page is fetched again
+                    continue
+        tmp_path = f"{self.output_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for page, items in sorted(pages.items()):
+                f.write(json.dumps({"page": page, "items": items}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.output_path)
+        return pages
+
+    async def _fetch(self, page):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await self.rate_limiter.acquire_async()
+            self.stats["requests"] += 1
+            try:
+                items = await asyncio.to_thread(self.fetch_page, page)
+                self.stats["fetched"] += 1
+                return items
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"Page {page} failed after {attempt + 1} attempts: {e}")
+                    self.stats["failed"] += 1
+                    return None
+                self.stats["retries"] += 1
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"Page {page} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def crawl(self, first_page=1, last_page=None):
+        """
+        Crawls pages first_page..last_page (open-ended if None, relying on early stop).
+
+        Returns:
+            List of unique items in page order, including pages from earlier runs
+
+        Raises:
+            ValueError: Neither last_page nor stale_pages would ever end the crawl
+        """
+        if last_page is None and not self.stale_pages:
+            raise ValueError("An open-ended crawl needs stale_pages to know when to stop")
+        done = self.load()
+        self.stats["resumed"] = len(done)
+        if done:
+            logger.info(f"Resuming crawl: {len(done)} pages already in {self.output_path}")
+
+        results = dict(done)
+        failed = set()
+        next_page = first_page
+        stop = asyncio.Event()
+        out = open(self.output_path, 'a', encoding='utf-8') if self.output_path else None
+
+        def take_page():
+            nonlocal next_page
+            while next_page in done:
+                next_page += 1
+            if stop.is_set() or (last_page is not None and next_page > last_page):
+                return None
+            page, next_page = next_page, next_page + 1
+            return page
+
+        def check_stale():
+            """Walks the finished prefix in page order and stops once it went stale"""
+            seen, stale = set(), 0
+            page = first_page
+            while page in results or page in failed:
+                items = results.get(page)
+                if items is not None:
+                    new = {item.get(self.key) for item in items} - seen
+                    seen.update(new)
+                    stale = 0 if new else stale + 1
+                    if self.stale_pages and stale >= self.stale_pages:
+                        if not stop.is_set():
+                            logger.info(f"No new ids on {stale} pages up to page {page}; stopping")
+                        stop.set()
+                        return
+                page += 1
+
+        async def worker():
+            while True:
+                # Wait for the token before picking a page, so an early stop
+                # does not leave already-assigned pages to be fetched
+                await self.rate_limiter.acquire_async()
+                page = take_page()
+                if page is None:
+                    return
+                items = await self._fetch(page)
+                if items is None:
+                    failed.add(page)
+                else:
+                    results[page] = items
+                    if out:
+                        out.write(json.dumps({"page": page, "items": items}, ensure_ascii=False) + "\n")
+                        out.flush()
+                check_stale()
+
+        try:
+            check_stale()
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            if out:
+                out.close()
+
+        if failed:
+            logger.warning(f"Pages {sorted(failed)} failed; run again to retry them")
+        unique = {}
+        for page in sorted(results):
+            for item in results[page]:
+                unique.setdefault(item.get(self.key), item)
+        return list(unique.values())
+
+    def run(self, first_page=1, last_page=None):
+        """Blocking wrapper around crawl()"""
+        return asyncio.run(self.crawl(first_page, last_page))
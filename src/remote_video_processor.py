@@ -1,11 +1,12 @@
 import os
 import logging
-import requests
 import json
 import shutil
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, unquote
 from typing import List, Dict, Optional
+from src.subtitle_source import SUBTITLE_EXTENSIONS
+from src.http_download import HttpDownloader
 
 logger = logging.getLogger("LRBAuto")
 
@@ -15,9 +16,11 @@ class RemoteVideoProcessor:
     scrapes for folders containing video.mp4 and metadata.json.
     """
     
-    def __init__(self, base_url: str = "https://chat.ainewskit.com/vdos/"):
+    def __init__(self, base_url: str = "https://chat.ainewskit.com/vdos/", parallel_parts: int = 1):
         self.base_url = base_url if base_url.endswith('/') else base_url + '/'
         self.download_dir = "downloads"
+        # Pooled, resumable downloads; parallel_parts > 1 fetches large files as concurrent ranges
+        self.http = HttpDownloader(parallel_parts=parallel_parts, retries=2)
         os.makedirs(self.download_dir, exist_ok=True)
         logger.info(f"Remote video processor initialized: {self.base_url}")
         
@@ -28,7 +31,7 @@ class RemoteVideoProcessor:
         """
         try:
             logger.info(f"Fetching directory listing from {self.base_url}")
-            response = requests.get(self.base_url, timeout=30)
+            response = self.http.session.get(self.base_url, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -113,6 +116,7 @@ class RemoteVideoProcessor:
             try:
                 # Logic depends on whether it's a file or folder
                 video_download_url = ""
+                subtitle_urls = []
                 metadata = {}
                 
                 if item['type'] == 'file':
@@ -150,6 +154,8 @@ class RemoteVideoProcessor:
                         continue
                         
                     video_download_url = video_file_url
+                    # Sidecar subtitles spare the Whisper run (see SubtitleSourceResolver)
+                    subtitle_urls = [i['url'] for i in sub_items if i['url'].lower().endswith(SUBTITLE_EXTENSIONS)]
                     
                     # Try to get metadata, if fail, generate it
                     try:
@@ -176,6 +182,10 @@ class RemoteVideoProcessor:
                     logger.warning(f"Failed to download video for {unique_id}, skipping.")
                     shutil.rmtree(local_folder)
                     continue
+
+                for subtitle_url in subtitle_urls:
+                    name = os.path.basename(unquote(subtitle_url.rstrip('/')))
+                    self.download_file(subtitle_url, os.path.join(local_folder, name))
                     
                 unprocessed.append({
                     'folder_name': unique_id, # This effectively becomes the ID in history.json
@@ -198,7 +208,7 @@ class RemoteVideoProcessor:
         # We can create a temporary instance or just duplicate logic. 
         # For cleanliness, let's just do a quick fetch here
         try:
-            response = requests.get(folder_url, timeout=10)
+            response = self.http.session.get(folder_url, timeout=10)
             if response.status_code != 200: return []
             soup = BeautifulSoup(response.text, 'html.parser')
             items = []
@@ -215,11 +225,7 @@ class RemoteVideoProcessor:
         """Download a file from a URL to a local path"""
         try:
             logger.info(f"Downloading {url} to {local_path}")
-            with requests.get(url, stream=True, timeout=120) as r:
-                r.raise_for_status()
-                with open(local_path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
+            self.http.download(url, local_path)
             return True
         except Exception as e:
             logger.error(f"Failed to download {url}: {e}")
@@ -0,0 +1,366 @@
+import os
+import time
+import queue
+import random
+import hashlib
+import logging
+import threading
+import requests
+from src.utils import load_json, save_json
+
+logger = logging.getLogger("LRBAuto")
+
+UPLOAD_URL = "https://www.googleapis.com/upload/youtube/v3/videos"
+
+# The resumable protocol requires every chunk except the last to be a multiple of 256 KiB
+CHUNK_ALIGNMENT = 256 * 1024
+DEFAULT_CHUNK_SIZE = 32 * CHUNK_ALIGNMENT  # 8 MiB
+
+# YouTube keeps an unfinished session for about a week; don't try older ones
+SESSION_MAX_AGE = 6 * 24 * 3600
+
+RETRY_STATUSES = {500, 502, 503, 504}
+# 403 reasons meaning "no more uploads with these credentials today"
+QUOTA_REASONS = {"quotaExceeded", "uploadLimitExceeded", "dailyLimitExceeded"}
+
+
+class UploadError(Exception):
+    """The upload failed and cannot be retried as-is"""
+
+    def __init__(self, message, status=None, reason=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+
+class QuotaExceededError(UploadError):
+    """The API quota of the credentials is used up for today"""
+
+
+def file_fingerprint(path, block_size=1024 * 1024):
+    """sha256 of the file contents; identifies the same video across runs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _error_reason(response):
+    """First 'reason' of a Google API error response, if any"""
+    try:
+        errors = response.json().get("error", {}).get("errors", [])
+        return errors[0].get("reason") if errors else None
+    except ValueError:
+        return None
+
+
+class UploadSessionStore:
+    """Resumable session URIs persisted on disk, keyed by file fingerprint"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.sessions = load_json(path, {}) if path else {}
+        self._lock = threading.Lock()
+        now = time.time()
+        self.sessions = {k: v for k, v in self.sessions.items() if now - v.get("created", 0) < SESSION_MAX_AGE}
+
+    def get(self, key):
+        return self.sessions.get(key)
+
+    def put(self, key, uri, size):
+        with self._lock:
+            self.sessions[key] = {"uri": uri, "size": size, "created": time.time()}
+            self._save()
+
+    def remove(self, key):
+        with self._lock:
+            if self.sessions.pop(key, None) is not None:
+                self._save()
+
+    def _save(self):
+        if self.path:
+            save_json(self.path, self.sessions, indent=2)
+
+
+class ResumableUploader:
+    """
+    Client for Google's resumable upload protocol.
+
+    The file is sent in `chunk_size` pieces. 5xx responses and dropped
+    connections are retried with exponential backoff, after asking the server
+    how many bytes it has committed. The session URI is persisted per file
+    fingerprint, so a later run continues where a failed one stopped.
+
+    Args:
+        session: requests-compatible session that adds auth (e.g. AuthorizedSession)
+        upload_url: Upload endpoint (point it at a fake server for tests)
+        chunk_size: Bytes per request, rounded down to a multiple of 256 KiB
+        store: UploadSessionStore for cross-run resume (None = in-memory only)
+    """
+
+    def __init__(self, session, upload_url=UPLOAD_URL, chunk_size=DEFAULT_CHUNK_SIZE, store=None,
+                 max_retries=8, backoff=1.0, timeout=300):
+        self.session = session
+        self.upload_url = upload_url
+        self.chunk_size = max(chunk_size // CHUNK_ALIGNMENT, 1) * CHUNK_ALIGNMENT
+        self.store = store or UploadSessionStore()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def _sleep(self, attempt):
+        delay = min(self.backoff * (2 ** attempt), 64) * (0.5 + random.random())
+        logger.info(f"Retrying upload in {delay:.1f}s")
+        time.sleep(delay)
+
+    def _raise_for(self, response, action):
+        reason = _error_reason(response)
+        message = f"{action} failed: HTTP {response.status_code} {reason or response.text[:200]}"
+        if response.status_code == 403 and reason in QUOTA_REASONS:
+            raise QuotaExceededError(message, response.status_code, reason)
+        raise UploadError(message, response.status_code, reason)
+
+    def start_session(self, body, size=None, mimetype="video/mp4", part="snippet,status"):
+        """Creates an upload session and returns its URI. size=None for streams of unknown length."""
+        headers = {"X-Upload-Content-Type": mimetype}
+        if size is not None:
+            headers["X-Upload-Content-Length"] = str(size)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(
+                    self.upload_url,
+                    params={"uploadType": "resumable", "part": part},
+                    json=body,
+                    headers=headers,
+                    timeout=self.timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise UploadError(f"Starting upload session failed: {e}")
+                logger.warning(f"Starting upload session failed: {e}")
+                self._sleep(attempt)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._sleep(attempt)
+                continue
+            if response.status_code != 200 or "Location" not in response.headers:
+                self._raise_for(response, "Starting upload session")
+            return response.headers["Location"]
+
+    def query_offset(self, uri, size=None):
+        """
+        Asks the server how much of the upload it has.
+
+        Returns:
+            (offset, response_json): response_json is set when the upload is already complete.
+            (None, None) when the session no longer exists.
+        """
+        total = str(size) if size is not None else "*"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.put(uri, headers={"Content-Range": f"bytes */{total}", "Content-Length": "0"},
+                                            timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise UploadError(f"Querying upload status failed: {e}")
+                self._sleep(attempt)
+                continue
+
+            if response.status_code in (200, 201):
+                return size, response.json()
+            if response.status_code == 308:
+                return self._committed(response), None
+            if response.status_code in (404, 410):
+                return None, None
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._sleep(attempt)
+                continue
+            self._raise_for(response, "Querying upload status")
+
+    @staticmethod
+    def _committed(response):
+        """Bytes committed according to a 308 response's Range header ("bytes=0-N")"""
+        committed = response.headers.get("Range")
+        return int(committed.rsplit("-", 1)[1]) + 1 if committed else 0
+
+    def put_chunk(self, uri, data, offset, total=None):
+        """
+        Sends one chunk. total=None marks the length as still unknown.
+
+        Returns:
+            (next_offset, response_json): response_json is set once the upload is complete.
+
+        Raises:
+            requests.ConnectionError / requests.Timeout, or UploadError with a
+            status in RETRY_STATUSES, when the caller should query and retry
+        """
+        end = offset + len(data) - 1
+        total_text = str(total) if total is not None else "*"
+        content_range = f"bytes {offset}-{end}/{total_text}" if data else f"bytes */{total_text}"
+        response = self.session.put(uri, data=data, headers={"Content-Range": content_range}, timeout=self.timeout)
+
+        if response.status_code in (200, 201):
+            return offset + len(data), response.json()
+        if response.status_code == 308:
+            return self._committed(response), None
+        self._raise_for(response, "Uploading chunk")
+
+    def upload_file(self, path, body, mimetype="video/mp4", part="snippet,status", progress=None):
+        """
+        Uploads a file, resuming a persisted session for the same content if one exists.
+
+        Args:
+            progress: Optional callback(bytes_sent, total_bytes)
+
+        Returns:
+            The created resource (parsed JSON response)
+        """
+        size = os.path.getsize(path)
+        key = file_fingerprint(path)
+        offset = 0
+        uri = None
+
+        saved = self.store.get(key)
+        if saved and saved.get("size") == size:
+            offset, done = self.query_offset(saved["uri"], size)
+            if done:
+                self.store.remove(key)
+                return done
+            if offset is not None:
+                uri = saved["uri"]
+                logger.info(f"Resuming upload of {path} at {offset}/{size} bytes")
+            else:
+                logger.info("Saved upload session expired, starting over")
+                self.store.remove(key)
+                offset = 0
+
+        if uri is None:
+            uri = self.start_session(body, size, mimetype, part)
+            self.store.put(key, uri, size)
+
+        attempt = 0
+        with open(path, 'rb') as f:
+            while True:
+                f.seek(offset)
+                data = f.read(self.chunk_size)
+                try:
+                    offset, done = self.put_chunk(uri, data, offset, size)
+                    attempt = 0
+                except (requests.ConnectionError, requests.Timeout, UploadError) as e:
+                    if isinstance(e, UploadError) and e.status in (404, 410):
+                        self.store.remove(key)
+                    offset, done = self._recover(uri, size, attempt, e)
+                    attempt += 1
+                    if offset is None:
+                        self.store.remove(key)
+                        raise UploadError("Upload session expired during upload")
+
+                if progress:
+                    progress(offset, size)
+                if done:
+                    self.store.remove(key)
+                    return done
+
+    def _recover(self, uri, total, attempt, error):
+        """After a failed chunk: re-raises if it cannot be retried, else waits and returns the committed offset"""
+        if isinstance(error, UploadError) and error.status not in RETRY_STATUSES:
+            raise error
+        if attempt >= self.max_retries:
+            raise UploadError(f"Upload failed after {attempt} retries: {error}")
+        logger.warning(f"Chunk upload failed ({error}); checking committed offset")
+        self._sleep(attempt)
+        return self.query_offset(uri, total)
+
+    def upload_stream(self, stream, body, mimetype="video/mp4", part="snippet,status", progress=None,
+                      before_finish=None, read_ahead=4):
+        """
+        Uploads from a non-seekable stream (e.g. an ffmpeg pipe) whose length is unknown
+        until EOF. Chunks are sent while the producer is still writing; the total size is
+        declared with the last chunk. Only the bytes the server has not committed yet are
+        kept in memory, so a failed chunk can be re-sent, but there is no cross-run resume.
+        The stream is drained on a separate thread up to `read_ahead` chunks ahead, so the
+        producer keeps writing while a chunk is in flight instead of blocking on the pipe.
+
+        Args:
+            progress: Optional callback(bytes_sent, total_bytes or None while unknown)
+            before_finish: Optional callback run at EOF, before the last chunk is sent.
+                If it raises, the upload is abandoned unfinished, so a producer that
+                failed half-way never turns into a truncated video.
+
+        Returns:
+            The created resource (parsed JSON response)
+        """
+        uri = self.start_session(body, None, mimetype, part)
+        blocks = queue.Queue(maxsize=max(read_ahead, 1))
+        stop = threading.Event()
+
+        def drain():
+            try:
+                for block in iter(lambda: stream.read(self.chunk_size), b''):
+                    while not stop.is_set():
+                        try:
+                            blocks.put(block, timeout=0.5)
+                            break
+                        except queue.Full:
+                            pass
+                    if stop.is_set():
+                        return
+                blocks.put(None)
+            except Exception as e:
+                blocks.put(e)
+
+        threading.Thread(target=drain, daemon=True, name="upload-read-ahead").start()
+        try:
+            return self._upload_blocks(uri, blocks, progress, before_finish)
+        finally:
+            stop.set()
+
+    def _upload_blocks(self, uri, blocks, progress, before_finish):
+        """Sends blocks from a queue (None = EOF, exception = read error) as one upload"""
+        buffer = bytearray()
+        offset = 0
+        eof = False
+        finished = False
+        attempt = 0
+
+        while True:
+            # One byte past the chunk tells whether this chunk is the last one
+            while not eof and len(buffer) <= self.chunk_size:
+                block = blocks.get()
+                if isinstance(block, Exception):
+                    raise UploadError(f"Reading the upload stream failed: {block}")
+                if block is None:
+                    eof = True
+                else:
+                    buffer += block
+
+            if eof and len(buffer) <= self.chunk_size:
+                if before_finish and not finished:
+                    before_finish()
+                finished = True
+                chunk, total = bytes(buffer), offset + len(buffer)
+            else:
+                chunk, total = bytes(buffer[:self.chunk_size]), None
+
+            try:
+                committed, done = self.put_chunk(uri, chunk, offset, total)
+                attempt = 0
+            except (requests.ConnectionError, requests.Timeout, UploadError) as e:
+                committed, done = self._recover(uri, total, attempt, e)
+                attempt += 1
+                if committed is None:
+                    raise UploadError("Upload session expired during upload")
+
+            if done:
+                if progress:
+                    progress(total, total)
+                return done
+            if committed < offset:
+                raise UploadError(f"Server rolled back to byte {committed}, which is no longer buffered")
+            del buffer[:committed - offset]
+            offset = committed
+            if progress:
+                progress(offset, total)
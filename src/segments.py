@@ -0,0 +1,132 @@
+import io
+import logging
+
+logger = logging.getLogger("LRBAuto")
+
+
+class Segment:
+    """One timed piece of transcript text (seconds)"""
+
+    __slots__ = ("start", "end", "text")
+
+    def __init__(self, start, end, text):
+        self.start = float(start)
+        self.end = float(end)
+        self.text = text
+
+    def __repr__(self):
+        return f"Segment({self.start:.3f}, {self.end:.3f}, {self.text!r})"
+
+    def __eq__(self, other):
+        return (isinstance(other, Segment) and self.start == other.start
+                and self.end == other.end and self.text == other.text)
+
+
+def from_whisper(result):
+    """Builds segments from a whisper transcribe() result"""
+    return [Segment(s["start"], s["end"], s["text"].strip()) for s in result["segments"]]
+
+
+def format_timestamp(seconds, separator=","):
+    """Converts seconds to HH:MM:SS,mmm (or HH:MM:SS.mmm for VTT)"""
+    millis = int(round(max(seconds, 0) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def parse_timestamp(value):
+    """Parses HH:MM:SS,mmm, HH:MM:SS.mmm or MM:SS.mmm into seconds"""
+    parts = value.strip().replace(',', '.').split(':')
+    seconds = float(parts[-1])
+    if len(parts) >= 2:
+        seconds += int(parts[-2]) * 60
+    if len(parts) >= 3:
+        seconds += int(parts[-3]) * 3600
+    return seconds
+
+
+def iter_subtitles(source):
+    """
+    Streams segments out of an SRT or WebVTT file (path or text file object).
+
+    A cue is a timing line followed by text lines up to the next blank line;
+    cue numbers/identifiers before the timing line are skipped, so text that
+    happens to be a bare number is kept.
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8-sig') as f:
+            yield from iter_subtitles(f)
+        return
+
+    timing = None
+    text_lines = []
+    for raw in source:
+        line = raw.rstrip('\r\n')
+        if timing is None:
+            if '-->' in line:
+                start, _, rest = line.partition('-->')
+                # VTT cue settings may follow the end time
+                timing = (parse_timestamp(start), parse_timestamp(rest.split()[0]))
+            continue
+        if line.strip():
+            text_lines.append(line.strip())
+            continue
+        yield Segment(timing[0], timing[1], "\n".join(text_lines))
+        timing = None
+        text_lines = []
+
+    if timing is not None:
+        yield Segment(timing[0], timing[1], "\n".join(text_lines))
+
+
+def read_subtitles(path):
+    """Reads a whole SRT/VTT file into a list of segments"""
+    return list(iter_subtitles(path))
+
+
+def write_srt(segments, target):
+    """Writes segments as SRT to a path or text file object. Returns the number written."""
+    if isinstance(target, str):
+        with open(target, 'w', encoding='utf-8') as f:
+            return write_srt(segments, f)
+
+    count = 0
+    for count, segment in enumerate(segments, 1):
+        target.write(f"{count}\n"
+                     f"{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n"
+                     f"{segment.text}\n\n")
+    return count
+
+
+def write_vtt(segments, target):
+    """Writes segments as WebVTT to a path or text file object. Returns the number written."""
+    if isinstance(target, str):
+        with open(target, 'w', encoding='utf-8') as f:
+            return write_vtt(segments, f)
+
+    target.write("WEBVTT\n\n")
+    count = 0
+    for count, segment in enumerate(segments, 1):
+        target.write(f"{format_timestamp(segment.start, '.')} --> {format_timestamp(segment.end, '.')}\n"
+                     f"{segment.text}\n\n")
+    return count
+
+
+def to_srt(segments):
+    """SRT document as a string"""
+    buffer = io.StringIO()
+    write_srt(segments, buffer)
+    return buffer.getvalue()
+
+
+def slice_segments(segments, start, end):
+    """Segments overlapping [start, end), clipped and shifted so that `start` becomes 0"""
+    return [Segment(max(s.start - start, 0), min(s.end, end) - start, s.text)
+            for s in segments if s.end > start and s.start < end]
+
+
+def segments_text(segments):
+    """Transcript as a single line of text"""
+    return " ".join(" ".join(s.text.split()) for s in segments if s.text)
@@ -1,57 +1,130 @@
 import whisper
 import os
+import bisect
+import shutil
 import logging
+import tempfile
+import threading
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from src.ffmpeg_runner import FFmpegRunner, FFmpegError
+from src.segments import from_whisper, format_timestamp, read_subtitles, slice_segments, write_srt
+from src.encoding_profiles import get_profile, scales_down, caps_fps, video_filters, video_args, audio_args
 from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
 
 logger = logging.getLogger("LRBAuto")
 
+# How subtitles reach the viewer:
+#   burn     - draw them into the picture (full decode + re-encode)
+#   stream   - burn into a fragmented MP4 on a pipe that is uploaded while ffmpeg is still encoding
+#   smart    - burn, but only re-encode the GOPs that carry captions and stream-copy the rest
+#   parallel - burn, split at keyframes into one segment per core, each encoded by its own ffmpeg
+#   soft     - mux the SRT as a mov_text track, streams are copied untouched
+#   captions - leave the video untouched and upload the SRT as a YouTube caption track
+SUBTITLE_MODES = ("burn", "stream", "smart", "parallel", "soft", "captions")
+# Modes that cut and stream-copy the source, which only works for H.264; other
+# sources get a full burn, so downloads for them should prefer AVC (prefer_avc)
+H264_SOURCE_MODES = ("smart", "parallel")
+
+# Smart render only pays off when captions leave real gaps; above this share of
+# the running time a single full re-encode is cheaper than cutting and joining
+SMART_RENDER_MAX_COVERAGE = 0.8
+
+
+def _filter_path(path):
+    """Escapes a path for use inside an ffmpeg filter argument"""
+    return os.path.abspath(path).replace('\\', '/').replace(':', '\\:').replace("'", "'\\''")
+
 class SubtitleGenerator:
-    def __init__(self, model_name="base"): # Using base model for free/fast inference
-        logger.info(f"Loading Whisper model: {model_name}")
-        self.model = whisper.load_model(model_name)
+    def __init__(self, model_name="base", encoding_profile=None, runner=None): # Using base model for free/fast inference
+        self.model_name = model_name
+        self.encoding_profile = get_profile(encoding_profile)
+        # Shared by every ffmpeg call so one cancel()/timeout policy covers them all
+        self.runner = runner or FFmpegRunner()
+        self._model = None
+
+    @property
+    def model(self):
+        # Loaded on first transcription so burn-only callers don't pay for it
+        if self._model is None:
+            logger.info(f"Loading Whisper model: {self.model_name}")
+            self._model = whisper.load_model(self.model_name)
+        return self._model
+
+    def extract_audio(self, video_path):
+        """
+        Decodes the audio track to 16 kHz mono float32, the format Whisper expects.
+        Goes through the ffmpeg runner (instead of whisper.load_audio) so it gets
+        the same timeouts, progress and cancellation as the other ffmpeg calls.
+        """
+        abs_video_path = os.path.abspath(video_path)
+        fd, raw_path = tempfile.mkstemp(suffix=".f32le", dir=os.path.dirname(abs_video_path))
+        os.close(fd)
+        try:
+            cmd = [
+                'ffmpeg', '-y',
+                '-i', abs_video_path,
+                '-vn', '-ac', '1', '-ar', str(whisper.audio.SAMPLE_RATE),
+                '-f', 'f32le',
+                raw_path
+            ]
+            self.runner.run(cmd, duration=self.runner.probe_duration(abs_video_path), label="extract audio")
+            return np.fromfile(raw_path, dtype=np.float32)
+        finally:
+            os.remove(raw_path)
+
+    def transcribe(self, video_path):
+        """
+        Transcribes the video's Chinese audio into English segments.
+        Returns a list of Segment, or None on failure.
+        """
+        try:
+            audio = self.extract_audio(video_path)
+            logger.info(f"Transcribing {video_path}...")
+            result = self.model.transcribe(audio, task="translate", language="Chinese") # Translate Chinese audio to English text
+            segments = from_whisper(result)
+            logger.info(f"Transcribed {len(segments)} segments")
+            return segments
+        except Exception as e:
+            logger.error(f"Error transcribing: {e}")
+            return None
+
+    def write_subtitles(self, video_path, segments, language=None):
+        """
+        Writes segments to an SRT file next to the video
+        (video.srt, or video.<language>.srt so a sidecar video.srt is not overwritten).
+        Returns the path to the SRT file.
+        """
+        srt_path = video_path.rsplit('.', 1)[0] + (f".{language}" if language else "") + ".srt"
+        write_srt(segments, srt_path)
+        logger.info(f"Generated subtitles: {srt_path}")
+        return srt_path
 
     def generate_subtitles(self, video_path):
         """
         Generates English subtitles for the given video.
         Returns the path to the SRT file.
         """
+        segments = self.transcribe(video_path)
+        if segments is None:
+            return None
         try:
-            logger.info(f"Transcribing {video_path}...")
-            result = self.model.transcribe(video_path, task="translate", language="Chinese") # Translate Chinese audio to English text
-            
-            srt_path = video_path.rsplit('.', 1)[0] + ".srt"
-            
-            with open(srt_path, "w", encoding="utf-8") as f:
-                for i, segment in enumerate(result["segments"]):
-                    start = self._format_time(segment["start"])
-                    end = self._format_time(segment["end"])
-                    text = segment["text"].strip()
-                    
-                    f.write(f"{i+1}\n")
-                    f.write(f"{start} --> {end}\n")
-                    f.write(f"{text}\n\n")
-            
-            logger.info(f"Generated subtitles: {srt_path}")
-            return srt_path
+            return self.write_subtitles(video_path, segments)
         except Exception as e:
             logger.error(f"Error generating subtitles: {e}")
             return None
 
-    def _format_time(self, seconds):
+    @staticmethod
+    def _format_time(seconds):
         """Converts seconds to HH:MM:SS,mmm format"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = seconds % 60
-        milliseconds = int((seconds - int(seconds)) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{int(seconds):02d},{milliseconds:03d}"
+        return format_timestamp(seconds)
 
     def burn_subtitles(self, video_path, subtitle_path):
         """
         Burns subtitles into video using ffmpeg directly.
         Returns the path to the new video file or None on failure.
         """
-        import subprocess
-        
         try:
             output_path = video_path.rsplit('.', 1)[0] + "_subtitled.mp4"
             logger.info(f"Burning subtitles: {video_path} + {subtitle_path} -> {output_path}")
@@ -67,22 +140,21 @@ class SubtitleGenerator:
             # 3. Escape single quotes (we wrap path in single quotes)
             filter_path = abs_sub_path.replace('\\', '/').replace(':', '\\:').replace("'", "'\\''")
             
+            # Downscale before drawing so the text is rendered at output resolution
+            filters = video_filters(self.encoding_profile) + [f"subtitles='{filter_path}'"]
+
             cmd = [
                 'ffmpeg', '-y',
                 '-i', abs_video_path,
-                '-vf', f"subtitles='{filter_path}'",
-                '-c:a', 'copy',
+                '-vf', ",".join(filters),
+                *video_args(self.encoding_profile),
+                *audio_args(self.encoding_profile),
                 abs_output_path
             ]
             
             logger.info(f"Running ffmpeg command: {cmd}")
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            self.runner.run(cmd, duration=self.runner.probe_duration(abs_video_path), label="burn subtitles")
             
             if os.path.exists(abs_output_path) and os.path.getsize(abs_output_path) > 0:
                 logger.info(f"Successfully burned subtitles: {abs_output_path}")
@@ -91,9 +163,409 @@ class SubtitleGenerator:
                 logger.error("FFmpeg ran but output file is missing or empty")
                 return None
                 
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg failed: {e.stderr}")
+        except FFmpegError as e:
+            logger.error(f"FFmpeg failed: {e}")
             return None
         except Exception as e:
             logger.error(f"Error burning subtitles: {e}")
             return None
+
+    def burn_subtitles_stream(self, video_path, subtitle_path, consume):
+        """
+        Burns subtitles into a fragmented MP4 written to a pipe, for consumers that
+        upload while encoding continues. Nothing is written to disk.
+
+        consume(stream, finish) reads the pipe to EOF; finish() blocks until ffmpeg
+        exits and raises FFmpegError if it failed, so the consumer can check the
+        output was complete before committing it.
+
+        Returns consume's return value, or None on failure.
+        """
+        logger.info(f"Burning subtitles to stream: {video_path} + {subtitle_path}")
+        filters = video_filters(self.encoding_profile) + [f"subtitles='{_filter_path(subtitle_path)}'"]
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', os.path.abspath(video_path),
+            '-vf', ",".join(filters),
+            *video_args(self.encoding_profile),
+            *audio_args(self.encoding_profile),
+            # A pipe can't be seeked back to write the moov atom, so emit self-contained fragments
+            '-movflags', 'frag_keyframe+empty_moov+default_base_moof',
+            '-f', 'mp4', 'pipe:1'
+        ]
+
+        try:
+            job = self.runner.start(cmd, duration=self.runner.probe_duration(video_path),
+                                    stdout=subprocess.PIPE, label="burn subtitles (stream)")
+        except FFmpegError as e:
+            logger.error(f"FFmpeg failed: {e}")
+            return None
+
+        # The job is supervised on its own thread so timeouts apply while the consumer reads
+        errors = []
+        def supervise():
+            try:
+                job.wait()
+            except FFmpegError as e:
+                errors.append(e)
+        supervisor = threading.Thread(target=supervise, daemon=True)
+        supervisor.start()
+
+        def finish():
+            supervisor.join()
+            if errors:
+                raise errors[0]
+
+        try:
+            return consume(job.stdout, finish)
+        except FFmpegError as e:
+            logger.error(f"FFmpeg failed: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error streaming subtitled video: {e}")
+            return None
+        finally:
+            # Stops ffmpeg if the consumer gave up early; a no-op once it has exited
+            job.cancel()
+            job.stdout.close()
+            supervisor.join()
+
+    def mux_subtitles(self, video_path, subtitle_path):
+        """
+        Muxes subtitles into the video as a soft mov_text track.
+        Audio and video are stream-copied, so this takes about as long as copying the file.
+        Returns the path to the new video file or None on failure.
+        """
+        try:
+            output_path = video_path.rsplit('.', 1)[0] + "_subtitled.mp4"
+            logger.info(f"Muxing subtitles: {video_path} + {subtitle_path} -> {output_path}")
+
+            abs_video_path = os.path.abspath(video_path)
+            abs_sub_path = os.path.abspath(subtitle_path)
+            abs_output_path = os.path.abspath(output_path)
+
+            cmd = [
+                'ffmpeg', '-y',
+                '-i', abs_video_path,
+                '-i', abs_sub_path,
+                '-map', '0:v', '-map', '0:a?', '-map', '1:0',
+                '-c', 'copy',
+                '-c:s', 'mov_text',
+                '-metadata:s:s:0', 'language=eng',
+                abs_output_path
+            ]
+
+            logger.info(f"Running ffmpeg command: {cmd}")
+
+            self.runner.run(cmd, duration=self.runner.probe_duration(abs_video_path), label="mux subtitles")
+
+            if os.path.exists(abs_output_path) and os.path.getsize(abs_output_path) > 0:
+                logger.info(f"Successfully muxed subtitles: {abs_output_path}")
+                return abs_output_path
+            else:
+                logger.error("FFmpeg ran but output file is missing or empty")
+                return None
+
+        except FFmpegError as e:
+            logger.error(f"FFmpeg failed: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error muxing subtitles: {e}")
+            return None
+
+    def _probe_video(self, video_path):
+        """Returns codec, geometry, frame rate (fps) and duration of the first video stream"""
+        info = self.runner.probe(video_path, 'stream=codec_name,width,height,pix_fmt,avg_frame_rate:format=duration',
+                                 stream='v:0')
+        stream = info['streams'][0]
+        stream['duration'] = float(info['format']['duration'])
+        num, _, den = str(stream.get('avg_frame_rate') or '0/1').partition('/')
+        try:
+            stream['fps'] = float(num) / float(den or 1)
+        except (ValueError, ZeroDivisionError):
+            stream['fps'] = 0.0
+        return stream
+
+    def _probe_keyframes(self, video_path):
+        """Returns the sorted presentation times of all video keyframes"""
+        info = self.runner.probe(video_path, 'frame=pts_time', stream='v:0', extra_args=['-skip_frame', 'nokey'])
+        times = set()
+        for frame in info.get('frames', []):
+            value = frame.get('pts_time')
+            if value not in (None, 'N/A'):
+                times.add(float(value))
+        return sorted(times)
+
+    def _split_at_keyframes(self, video_path, cut_times, work_dir):
+        """
+        Splits the video stream (no audio) at the given keyframe times with stream copy.
+        Returns the list of MPEG-TS piece paths, one more than len(cut_times).
+        MPEG-TS keeps SPS/PPS in-band, which lets copied and re-encoded pieces be
+        concatenated even though their encoder parameters differ.
+        """
+        pattern = os.path.join(work_dir, "piece_%05d.ts")
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', os.path.abspath(video_path),
+            '-map', '0:v:0', '-an', '-sn',
+            '-c', 'copy',
+            '-bsf:v', 'h264_mp4toannexb',
+            '-f', 'segment',
+            '-segment_format', 'mpegts',
+            '-reset_timestamps', '1',
+        ]
+        if cut_times:
+            # The segment muxer cuts at the first keyframe at or after each time; back off
+            # half a millisecond so rounding can never push a cut onto the next GOP
+            cmd += ['-segment_times', ",".join(f"{max(t - 0.0005, 0):.4f}" for t in cut_times)]
+        cmd.append(pattern)
+        self.runner.run(cmd, label="split video")
+        return [os.path.join(work_dir, name) for name in sorted(os.listdir(work_dir))
+                if name.startswith("piece_") and name.endswith(".ts")]
+
+    def _burn_piece(self, piece_path, subtitle_path, output_path, pix_fmt, threads=0, scale=True, duration=None,
+                    max_fps=None):
+        """
+        Re-encodes one video-only piece with subtitles drawn in, keeping its frame timing.
+        scale=False keeps the source geometry, needed when the piece is joined with copied ones.
+        max_fps resamples the piece to that rate, for joins where every piece is re-encoded.
+        """
+        filters = video_filters(self.encoding_profile) if scale else []
+        if max_fps:
+            filters.append(f"fps={max_fps}")
+        filters.append(f"subtitles='{_filter_path(subtitle_path)}'")
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', piece_path,
+            '-vf', ",".join(filters),
+            '-an',
+            # -fpsmax would fight -vsync passthrough; the cap is the fps filter above
+            *video_args(self.encoding_profile, fps_cap=False),
+            '-threads', str(threads),
+            '-pix_fmt', pix_fmt,
+            '-vsync', 'passthrough',
+            '-f', 'mpegts',
+            output_path
+        ]
+        self.runner.run(cmd, duration=duration, label=f"burn {os.path.basename(piece_path)}")
+        return output_path
+
+    def _join_pieces(self, pieces, audio_source, output_path, work_dir):
+        """Concatenates video pieces losslessly and muxes the original audio back in (per profile)"""
+        list_path = os.path.join(work_dir, "pieces.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for piece in pieces:
+                escaped = os.path.abspath(piece).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-i', os.path.abspath(audio_source),
+            '-map', '0:v:0', '-map', '1:a?',
+            '-c:v', 'copy',
+            *audio_args(self.encoding_profile),
+            '-movflags', '+faststart',
+            output_path
+        ]
+        self.runner.run(cmd, label="join pieces")
+        return output_path
+
+    def burn_subtitles_smart(self, video_path, subtitle_path, segments=None):
+        """
+        Burns subtitles but only re-encodes the GOPs that overlap a caption.
+        The video is cut at keyframes, captioned pieces are re-encoded with the
+        same filter as burn_subtitles, everything else is stream-copied, and the
+        pieces are concatenated without another encode. Falls back to
+        burn_subtitles when the source is not H.264, captions cover most of it,
+        or the encoding profile would downscale it or cap its frame rate. Pass `segments` to skip
+        re-reading the SRT.
+        Returns the path to the new video file or None on failure.
+        """
+        work_dir = None
+        try:
+            output_path = os.path.abspath(video_path.rsplit('.', 1)[0] + "_subtitled.mp4")
+            segments = segments if segments is not None else read_subtitles(subtitle_path)
+            info = self._probe_video(video_path)
+            duration = info['duration']
+
+            if info.get('codec_name') != 'h264':
+                logger.info(f"Smart render needs H.264, source is {info.get('codec_name')}; doing a full burn")
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            if scales_down(self.encoding_profile, info.get('height', 0)):
+                logger.info(f"Encoding profile downscales {info.get('height')}p; copied GOPs can't be mixed in, doing a full burn")
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            if caps_fps(self.encoding_profile, info['fps']):
+                logger.info(f"Encoding profile caps {info['fps']:.3g} fps at {self.encoding_profile['max_fps']}; "
+                            f"copied GOPs can't be mixed in, doing a full burn")
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            keyframes = self._probe_keyframes(video_path)
+            if not keyframes:
+                return self.burn_subtitles(video_path, subtitle_path)
+            keyframes[0] = 0.0
+
+            # Widen every cue to the enclosing GOPs and merge overlapping spans
+            spans = []
+            for segment in segments:
+                start, end = segment.start, segment.end
+                if end <= 0 or start >= duration:
+                    continue
+                span_start = keyframes[max(bisect.bisect_right(keyframes, start) - 1, 0)]
+                next_index = bisect.bisect_right(keyframes, end)
+                span_end = keyframes[next_index] if next_index < len(keyframes) else duration
+                if spans and span_start <= spans[-1][1]:
+                    spans[-1][1] = max(spans[-1][1], span_end)
+                else:
+                    spans.append([span_start, span_end])
+
+            encoded = sum(end - start for start, end in spans)
+            if duration <= 0 or encoded / duration > SMART_RENDER_MAX_COVERAGE:
+                logger.info(f"Captions cover {encoded:.1f}s of {duration:.1f}s; doing a full burn")
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            logger.info(f"Smart render: re-encoding {encoded:.1f}s of {duration:.1f}s in {len(spans)} span(s)")
+
+            bounds = sorted({t for span in spans for t in span if 0 < t < duration})
+            work_dir = tempfile.mkdtemp(prefix="smart_", dir=os.path.dirname(output_path))
+            pieces = self._split_at_keyframes(video_path, bounds, work_dir)
+            starts = [0.0] + bounds
+            if len(pieces) != len(starts):
+                logger.warning(f"Expected {len(starts)} pieces, ffmpeg produced {len(pieces)}; doing a full burn")
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            span_starts = {span[0] for span in spans}
+            for i, piece in enumerate(pieces):
+                if starts[i] not in span_starts:
+                    continue
+                piece_end = starts[i + 1] if i + 1 < len(starts) else duration
+                slice_path = os.path.join(work_dir, f"piece_{i:05d}.srt")
+                write_srt(slice_segments(segments, starts[i], piece_end), slice_path)
+                pieces[i] = self._burn_piece(piece, slice_path, os.path.join(work_dir, f"burned_{i:05d}.ts"),
+                                             info.get('pix_fmt') or 'yuv420p', scale=False,
+                                             duration=piece_end - starts[i])
+
+            self._join_pieces(pieces, video_path, output_path, work_dir)
+
+            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                logger.info(f"Successfully burned subtitles: {output_path}")
+                return output_path
+            else:
+                logger.error("FFmpeg ran but output file is missing or empty")
+                return None
+
+        except FFmpegError as e:
+            logger.error(f"FFmpeg failed: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error burning subtitles: {e}")
+            return None
+        finally:
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def burn_subtitles_parallel(self, video_path, subtitle_path, segment_count=None, segments=None):
+        """
+        Burns subtitles with several ffmpeg processes working side by side.
+        The video stream is split at keyframes into `segment_count` pieces of
+        roughly equal length (default: one per CPU core), each piece is burned
+        with its time-shifted slice of the captions, and the pieces are joined
+        with the concat demuxer. Helps most on short, low-resolution clips where
+        x264's own threading does not scale.
+        `segments` is the caption cue list (e.g. the transcript); pass it to
+        skip re-reading the SRT.
+        Returns the path to the new video file or None on failure.
+        """
+        work_dir = None
+        try:
+            output_path = os.path.abspath(video_path.rsplit('.', 1)[0] + "_subtitled.mp4")
+            cpus = os.cpu_count() or 1
+            segment_count = segment_count or cpus
+            info = self._probe_video(video_path)
+            duration = info['duration']
+
+            if segment_count <= 1 or info.get('codec_name') != 'h264':
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            # Snap the ideal equal-length cut points to the nearest keyframes
+            keyframes = self._probe_keyframes(video_path)
+            cut_times = set()
+            for k in range(1, segment_count):
+                target = duration * k / segment_count
+                index = bisect.bisect_left(keyframes, target)
+                candidates = keyframes[max(index - 1, 0):index + 1]
+                if candidates:
+                    nearest = min(candidates, key=lambda t: abs(t - target))
+                    if 0 < nearest < duration:
+                        cut_times.add(nearest)
+            cut_times = sorted(cut_times)
+            if not cut_times:
+                logger.info("No keyframes to split at; doing a single burn")
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            work_dir = tempfile.mkdtemp(prefix="parallel_", dir=os.path.dirname(output_path))
+            pieces = self._split_at_keyframes(video_path, cut_times, work_dir)
+            starts = [0.0] + cut_times
+            if len(pieces) != len(starts):
+                logger.warning(f"Expected {len(starts)} pieces, ffmpeg produced {len(pieces)}; doing a single burn")
+                return self.burn_subtitles(video_path, subtitle_path)
+
+            segments = segments if segments is not None else read_subtitles(subtitle_path)
+            pix_fmt = info.get('pix_fmt') or 'yuv420p'
+            # Every piece is re-encoded, so each gets the profile's frame rate cap
+            max_fps = self.encoding_profile['max_fps'] if caps_fps(self.encoding_profile, info['fps']) else None
+            # Share the cores out so the processes don't oversubscribe each other
+            threads = max(cpus // len(pieces), 1)
+            logger.info(f"Parallel burn: {len(pieces)} segment(s), {threads} thread(s) each")
+
+            def burn(i):
+                piece_end = starts[i + 1] if i + 1 < len(starts) else duration
+                slice_path = os.path.join(work_dir, f"piece_{i:05d}.srt")
+                write_srt(slice_segments(segments, starts[i], piece_end), slice_path)
+                return self._burn_piece(pieces[i], slice_path, os.path.join(work_dir, f"burned_{i:05d}.ts"),
+                                        pix_fmt, threads=threads, duration=piece_end - starts[i],
+                                        max_fps=max_fps)
+
+            with ThreadPoolExecutor(max_workers=len(pieces)) as executor:
+                burned = list(executor.map(burn, range(len(pieces))))
+
+            self._join_pieces(burned, video_path, output_path, work_dir)
+
+            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                logger.info(f"Successfully burned subtitles: {output_path}")
+                return output_path
+            else:
+                logger.error("FFmpeg ran but output file is missing or empty")
+                return None
+
+        except FFmpegError as e:
+            logger.error(f"FFmpeg failed: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error burning subtitles: {e}")
+            return None
+        finally:
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def apply_subtitles(self, video_path, subtitle_path, mode="burn", segments=None):
+        """
+        Prepares the video for upload according to the subtitle delivery mode.
+        Returns the path of the video to upload, or None on failure.
+        In "captions" mode the original video is returned unchanged; the caller
+        is expected to upload the SRT with YouTubeUploader.upload_captions.
+        """
+        if mode in ("burn", "stream"):
+            # "stream" is normally handled with burn_subtitles_stream; this is its on-disk fallback
+            return self.burn_subtitles(video_path, subtitle_path)
+        if mode == "smart":
+            return self.burn_subtitles_smart(video_path, subtitle_path, segments=segments)
+        if mode == "parallel":
+            return self.burn_subtitles_parallel(video_path, subtitle_path, segments=segments)
+        if mode == "soft":
+            return self.mux_subtitles(video_path, subtitle_path)
+        if mode == "captions":
+            return os.path.abspath(video_path)
+        raise ValueError(f"Unknown subtitle mode '{mode}', expected one of {SUBTITLE_MODES}")
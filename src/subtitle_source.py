@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import logging
+from src.segments import read_subtitles
+from src.text_utils import has_cjk
+
+logger = logging.getLogger("LRBAuto")
+
+SUBTITLE_EXTENSIONS = (".srt", ".vtt")
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".flv", ".webm", ".mov")
+
+# Whisper seconds per second of audio, for the time-saved estimate until this
+# run has timed a transcription of its own ("small" on a CPU-only runner)
+WHISPER_SECONDS_PER_MEDIA_SECOND = 1.0
+
+# Language tags as yt-dlp names Bilibili tracks (ai-zh, zh-Hans, en-US, ...)
+_LANGUAGE_TAG = re.compile(r'^(ai-)?(en|zh|chs|cht)([-_].*)?$', re.IGNORECASE)
+
+
+class SubtitleTrack:
+    """A subtitle file found next to a video"""
+
+    __slots__ = ("path", "language", "generated")
+
+    def __init__(self, path, language, generated=False):
+        self.path = path
+        self.language = language  # "en", "zh" or None when unknown
+        self.generated = generated  # Speech recognition (Bilibili AI subtitles) rather than human
+
+    def __repr__(self):
+        return f"SubtitleTrack({self.path!r}, {self.language!r}, generated={self.generated})"
+
+    @property
+    def rank(self):
+        """Sort key: human before generated, English (no translation) before Chinese"""
+        return (self.generated, self.language != "en")
+
+
+def find_subtitle_tracks(video_path):
+    """
+    Subtitle files that belong to a video: those named after it
+    (video.srt, video.zh-Hans.srt, as yt-dlp writes them) and, when the video
+    is the only one in its folder, any other .srt/.vtt there.
+    """
+    folder = os.path.dirname(os.path.abspath(video_path))
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    try:
+        names = sorted(os.listdir(folder))
+    except OSError:
+        return []
+    only_video = sum(1 for n in names if n.lower().endswith(VIDEO_EXTENSIONS)) == 1
+
+    tracks = []
+    for name in names:
+        base, ext = os.path.splitext(name)
+        if ext.lower() not in SUBTITLE_EXTENSIONS:
+            continue
+        if not (base == stem or base.startswith(stem + ".") or only_video):
+            continue
+        tag = base[len(stem) + 1:] if base.startswith(stem + ".") else base.rsplit(".", 1)[-1]
+        match = _LANGUAGE_TAG.match(tag)
+        language = None
+        if match:
+            language = "en" if match.group(2).lower() == "en" else "zh"
+        tracks.append(SubtitleTrack(os.path.join(folder, name), language, generated=bool(match and match.group(1))))
+    return tracks
+
+
+class SubtitleSourceResolver:
+    """
+    Picks where a video's English subtitles come from, cheapest first:
+
+    1. A subtitle track shipped with the video: a sidecar .srt/.vtt from the
+       remote folder or the one yt-dlp wrote for Bilibili CC/AI subtitles.
+       Chinese tracks are translated line by line with the CachedTranslator.
+    2. Whisper, only when no usable track exists.
+
+    Args:
+        subtitle_gen: SubtitleGenerator used for the Whisper fallback
+        translator: CachedTranslator (zh -> en) for Chinese tracks; None skips them
+        min_segments: Fewer cues than this is not a usable track
+    """
+
+    def __init__(self, subtitle_gen, translator=None, min_segments=3):
+        self.subtitle_gen = subtitle_gen
+        self.translator = translator
+        self.min_segments = min_segments
+        self.stats = {"tracks": 0, "whisper": 0, "skipped_media_seconds": 0.0,
+                      "whisper_seconds": 0.0, "whisper_media_seconds": 0.0}
+
+    def _load_track(self, track):
+        """English segments of a track, or None if it is unusable"""
+        try:
+            segments = [s for s in read_subtitles(track.path) if s.text.strip()]
+        except Exception as e:
+            logger.warning(f"Unreadable subtitle file {track.path}: {e}")
+            return None
+        if len(segments) < self.min_segments:
+            logger.info(f"Ignoring {track.path}: only {len(segments)} cues")
+            return None
+
+        language = track.language or ("zh" if any(has_cjk(s.text) for s in segments) else "en")
+        if language == "en":
+            return segments
+        if not self.translator:
+            return None
+        translated = self.translator.translate_many([s.text for s in segments])
+        failed = sum(1 for t in translated if t is None)
+        if failed:
+            logger.warning(f"Could not translate {failed}/{len(segments)} cues of {track.path}")
+            return None
+        for segment, text in zip(segments, translated):
+            segment.text = text.strip()
+        self.translator.cache.save()
+        return segments
+
+    def _duration(self, video_path):
+        return self.subtitle_gen.runner.probe_duration(os.path.abspath(video_path)) or 0.0
+
+    def resolve(self, video_path):
+        """
+        English segments for a video.
+
+        Returns:
+            (segments, source): source is the subtitle file used, or "whisper";
+            segments is None if Whisper failed as well
+        """
+        for track in sorted(find_subtitle_tracks(video_path), key=lambda t: t.rank):
+            segments = self._load_track(track)
+            if segments:
+                duration = self._duration(video_path)
+                self.stats["tracks"] += 1
+                self.stats["skipped_media_seconds"] += duration
+                logger.info(f"Using existing subtitles {os.path.basename(track.path)} "
+                            f"({len(segments)} cues, {track.language or 'detected'}"
+                            f"{', generated' if track.generated else ''}); skipping Whisper for {duration:.0f}s of audio")
+                return segments, track.path
+
+        started = time.perf_counter()
+        segments = self.subtitle_gen.transcribe(video_path)
+        if segments is not None:
+            self.stats["whisper"] += 1
+            self.stats["whisper_seconds"] += time.perf_counter() - started
+            self.stats["whisper_media_seconds"] += self._duration(video_path)
+        return segments, "whisper"
+
+    def whisper_seconds_saved(self):
+        """Estimated Whisper time skipped, at the speed measured in this run if any"""
+        stats = self.stats
+        rate = WHISPER_SECONDS_PER_MEDIA_SECOND
+        if stats["whisper_media_seconds"]:
+            rate = stats["whisper_seconds"] / stats["whisper_media_seconds"]
+        return stats["skipped_media_seconds"] * rate
+
+    def log_stats(self):
+        stats = self.stats
+        logger.info(f"Subtitles: {stats['tracks']} from existing tracks, {stats['whisper']} transcribed; "
+                    f"skipped ~{self.whisper_seconds_saved():.0f}s of Whisper "
+                    f"({stats['skipped_media_seconds']:.0f}s of audio)")
@@ -1,5 +1,8 @@
 import re
+import numpy as np
 from collections import Counter
+from src.segments import iter_subtitles, segments_text
+from src.text_utils import has_cjk, split_sentences, tokenize
 
 class SimpleSummarizer:
     """
@@ -75,26 +78,140 @@ class SimpleSummarizer:
         
         return "\n".join(summary)
 
+    def summarize_segments(self, segments, num_sentences=3):
+        """
+        Generate a summary straight from transcript segments.
+        """
+        return self.summarize(segments_text(segments), num_sentences=num_sentences)
+
     def extract_text_from_srt(self, srt_path):
         """
         Extract plain text from an SRT file.
         """
-        text_lines = []
         try:
-            with open(srt_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            is_time = False
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                if line.isdigit():
-                    continue
-                if '-->' in line:
-                    continue
-                text_lines.append(line)
-            
-            return " ".join(text_lines)
+            return segments_text(iter_subtitles(srt_path))
         except Exception as e:
             return ""
+
+
+class TfidfSummarizer:
+    """
+    Extractive summarizer backed by NumPy.
+
+    Each sentence is tokenized once into a sparse sentence-term matrix.
+    Terms are weighted by TF-IDF against a corpus-level IdfTable, which learns
+    from every transcript it sees. Sentences are then picked either by their
+    average term weight ("tfidf") or by TextRank centrality ("textrank").
+    Chinese text is segmented with jieba.
+    """
+
+    MODES = ("tfidf", "textrank")
+
+    def __init__(self, idf_table=None, mode="tfidf", damping=0.85, iterations=50):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown summary mode '{mode}', expected one of {self.MODES}")
+        self.idf_table = idf_table
+        self.mode = mode
+        self.damping = damping
+        self.iterations = iterations
+
+    def _preprocess(self, text):
+        """Split text into sentences, dropping fragments too short to summarize anything."""
+        min_length = 4 if has_cjk(text) else 10
+        return [s for s in split_sentences(text) if len(s) > min_length]
+
+    def _build_matrix(self, sentences):
+        """
+        Returns (rows, indices, counts, word_counts, vocabulary): the COO parts
+        (sorted by row, i.e. CSR order) of the sentence-term count matrix plus
+        each sentence's word count. Every sentence is tokenized exactly once.
+        """
+        cjk = has_cjk("".join(sentences[:20]))
+        tokens = []
+        lengths = []
+        for sentence in sentences:
+            sentence_tokens = tokenize(sentence)
+            tokens.extend(sentence_tokens)
+            lengths.append(len(sentence_tokens))
+        word_counts = np.asarray([len(s) if cjk else len(s.split()) for s in sentences], dtype=np.float32)
+
+        if not tokens:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float32), word_counts, []
+
+        vocabulary, term_ids = np.unique(np.asarray(tokens), return_inverse=True)
+        token_rows = np.repeat(np.arange(len(sentences), dtype=np.int64), lengths)
+        # One (sentence, term) key per token; unique keys with counts give the sparse entries
+        keys, counts = np.unique(token_rows * len(vocabulary) + term_ids.ravel(), return_counts=True)
+        rows, indices = np.divmod(keys, len(vocabulary))
+        return rows, indices, counts.astype(np.float32), word_counts, vocabulary.tolist()
+
+    def _textrank(self, rows, indices, weights, n):
+        """TextRank scores from cosine similarity between TF-IDF sentence vectors."""
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+        norms[norms == 0] = 1.0
+
+        # Terms found in a single sentence never contribute to similarity between
+        # two different sentences, so the dense product only needs the shared ones
+        shared = np.bincount(indices)[indices] >= 2
+        shared_terms, columns = np.unique(indices[shared], return_inverse=True)
+        dense = np.zeros((n, len(shared_terms)), dtype=np.float32)
+        dense[rows[shared], columns] = weights[shared]
+
+        similarity = dense @ dense.T
+        similarity /= np.outer(norms, norms)
+        np.fill_diagonal(similarity, 0.0)
+
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        # Sentences with no neighbours spread their rank evenly
+        transition = np.where(out_weight > 0, similarity / np.where(out_weight > 0, out_weight, 1), 1.0 / n)
+
+        rank = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(self.iterations):
+            updated = (1 - self.damping) / n + self.damping * (transition.T @ rank)
+            if np.abs(updated - rank).sum() < 1e-6:
+                rank = updated
+                break
+            rank = updated
+        return rank
+
+    def summarize(self, text, num_sentences=3):
+        """
+        Generate a summary from the text.
+        """
+        if not text:
+            return ""
+
+        sentences = self._preprocess(text)
+        if not sentences:
+            return text[:200] + "..."
+
+        rows, indices, counts, word_counts, vocabulary = self._build_matrix(sentences)
+        n = len(sentences)
+        if not vocabulary:
+            return "\n".join(sentences[:num_sentences])
+
+        if self.idf_table is not None:
+            self.idf_table.add_document(vocabulary)
+            idf = self.idf_table.idf_vector(vocabulary)
+        else:
+            idf = np.ones(len(vocabulary), dtype=np.float32)
+
+        weights = counts * idf[indices]
+
+        if self.mode == "textrank":
+            scores = self._textrank(rows, indices, weights, n)
+        else:
+            # Normalize by length to avoid favoring long sentences too much
+            scores = np.bincount(rows, weights=weights, minlength=n) / np.maximum(word_counts, 1)
+
+        k = min(num_sentences, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top.sort()  # Keep the original order so the summary reads naturally
+        return "\n".join(sentences[i] for i in top)
+
+    def summarize_segments(self, segments, num_sentences=3):
+        """
+        Generate a summary straight from transcript segments.
+        """
+        return self.summarize(segments_text(segments), num_sentences=num_sentences)
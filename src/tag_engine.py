@@ -0,0 +1,135 @@
+import logging
+from collections import Counter
+from src.idf_table import IdfTable
+from src.text_utils import tokenize, has_cjk
+
+logger = logging.getLogger("LRBAuto")
+
+# Appended to every video's tags after the extracted keywords
+DEFAULT_TAGS = ["science", "experiment", "diy", "lifehacks", "tutorial", "fun", "china", "video", "科学", "实验", "科普"]
+
+# YouTube accepts up to 500 characters of tags; 45 short tags stay well inside that
+MAX_TAGS = 45
+
+
+class TagEngine:
+    """
+    Picks video tags by TF-IDF instead of token order.
+
+    Terms are weighted by how often they occur in the title (counted
+    `title_weight` times) and description, times their IDF over every title
+    and description processed so far, so words that appear in every video
+    ("视频", "分享") lose to the ones specific to this video. English titles
+    are ranked against their own table, learned from the translated titles.
+
+    Args:
+        idf_table: IdfTable of the Chinese titles and descriptions (in-memory if None)
+        english_idf_table: IdfTable of the English titles (in-memory if None)
+        chinese_keywords / english_keywords: How many keywords to take from each language
+    """
+
+    def __init__(self, idf_table=None, english_idf_table=None, chinese_keywords=5, english_keywords=5,
+                 title_weight=2, max_tags=MAX_TAGS):
+        self.idf_table = idf_table or IdfTable()
+        self.english_idf_table = english_idf_table or IdfTable()
+        self.chinese_keywords = chinese_keywords
+        self.english_keywords = english_keywords
+        self.title_weight = title_weight
+        self.max_tags = max_tags
+
+    def seed(self, titles):
+        """
+        Bootstraps an empty IDF table from {video_id: title}, e.g. the processed
+        videos in history.json. The ids are recorded, so learning one of these
+        videos again later does not count it twice.
+        """
+        if self.idf_table.documents:
+            return
+        count = 0
+        for video_id, title in titles.items():
+            if title:
+                count += self.idf_table.add_document(tokenize(title, min_length=2), key=video_id)
+        if count:
+            logger.info(f"Seeded tag IDF table with {count} processed titles")
+
+    def learn(self, title, description="", english_title=None, video_id=None):
+        """
+        Counts one video's title and description (and its English title in the
+        English table) as a document of the corpus, once per video_id.
+        """
+        self.idf_table.add_document(tokenize(f"{title}\n{description or ''}", min_length=2), key=video_id)
+        if english_title:
+            self.english_idf_table.add_document(tokenize(english_title, min_length=2), key=video_id)
+
+    def save(self):
+        self.idf_table.save()
+        self.english_idf_table.save()
+
+    def keywords(self, title, description="", top_k=5, min_length=2, idf_table=None):
+        """
+        The `top_k` terms of title + description with the highest TF-IDF
+        against `idf_table` (the Chinese one by default), ties broken by first occurrence.
+        """
+        title_terms = tokenize(title or "", min_length=min_length)
+        counts = Counter()
+        for term in title_terms:
+            counts[term] += self.title_weight
+        counts.update(tokenize(description or "", min_length=min_length))
+        if not counts:
+            return []
+
+        order = {term: i for i, term in reversed(list(enumerate(title_terms)))}
+        idf = (idf_table or self.idf_table).idf
+        ranked = sorted(counts, key=lambda t: (-counts[t] * idf(t), order.get(t, len(order))))
+        return ranked[:top_k]
+
+    def generate(self, chinese_title, english_title, chinese_tags=None, description="", learn=True,
+                 video_id=None):
+        """
+        Tags for one video: Chinese keywords, English keywords, the source tags,
+        then DEFAULT_TAGS; lower-cased, deduplicated, at most `max_tags`.
+        """
+        if learn:
+            self.learn(chinese_title, description, english_title, video_id)
+
+        tags = []
+        chinese_terms = self.keywords(chinese_title, description, top_k=self.chinese_keywords * 3)
+        tags.extend([t for t in chinese_terms if has_cjk(t)][:self.chinese_keywords])
+        english_terms = self.keywords(english_title, top_k=self.english_keywords * 3, min_length=4,
+                                      idf_table=self.english_idf_table)
+        tags.extend([t for t in english_terms if t.isalpha() and not has_cjk(t)][:self.english_keywords])
+        if chinese_tags:
+            tags.extend(chinese_tags[:8])
+        return self.merge(tags)
+
+    def merge(self, tags):
+        """Appends DEFAULT_TAGS, lower-cases, deduplicates and caps at `max_tags`"""
+        seen = set()
+        unique_tags = []
+        for tag in list(tags) + DEFAULT_TAGS:
+            tag_clean = tag.lower().strip()
+            if len(tag_clean) > 1 and tag_clean not in seen:
+                seen.add(tag_clean)
+                unique_tags.append(tag_clean)
+        return unique_tags[:self.max_tags]
+
+    def generate_many(self, videos):
+        """
+        Tags for several videos at once. Every video is added to the corpus
+        before any is ranked, so the batch's own vocabulary counts towards IDF.
+
+        Args:
+            videos: Iterable of dicts with chinese_title, english_title and
+                optionally chinese_tags, description and id
+
+        Returns:
+            List of tag lists in input order
+        """
+        videos = list(videos)
+        for video in videos:
+            self.learn(video["chinese_title"], video.get("description", ""), video["english_title"], video.get("id"))
+        return [
+            self.generate(v["chinese_title"], v["english_title"], v.get("chinese_tags"),
+                          v.get("description", ""), learn=False)
+            for v in videos
+        ]
@@ -0,0 +1,93 @@
+import re
+import os
+import marshal
+import logging
+import threading
+from src.utils import state_path
+
+logger = logging.getLogger("LRBAuto")
+
+_jieba_lock = threading.Lock()
+
+# Common English stop words plus channel boilerplate
+STOP_WORDS = {
+    'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and', 'or', 'but',
+    'of', 'to', 'in', 'that', 'it', 'this', 'for', 'with', 'as', 'by',
+    'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do',
+    'does', 'did', 'not', 'so', 'can', 'could', 'should', 'would',
+    'will', 'may', 'might', 'must', 'my', 'your', 'his', 'her', 'its',
+    'our', 'their', 'i', 'you', 'he', 'she', 'we', 'they', 'me', 'him',
+    'us', 'them', 'video', 'watch', 'subscribe', 'channel', 'like',
+    # Chinese function words that jieba returns as separate tokens
+    '的', '了', '是', '在', '和', '也', '就', '都', '而', '及', '与', '着',
+    '或', '一个', '没有', '我们', '你们', '他们', '这个', '那个', '什么',
+}
+
+_CJK = re.compile(r'[一-鿿]')
+_WORD = re.compile(r'\w+')
+_SENTENCE_END = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|!)\s+|(?<=[。！？])')
+
+
+def has_cjk(text):
+    return bool(_CJK.search(text or ""))
+
+
+def split_sentences(text):
+    """Split English and Chinese text into sentences."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+def load_jieba(cache_path=None):
+    """
+    Returns the jieba module with its prefix dictionary loaded.
+
+    Building the dictionary from dict.txt takes about a second. It is built
+    once and serialized to `cache_path` (default: a per-version file in the
+    state dir, which CI keeps between runs), then loaded from there in one
+    read; jieba's own marshal.load() on the open file is several times slower.
+    Safe to call from several threads; call it early in the background to
+    pre-warm it.
+    """
+    import jieba
+    with _jieba_lock:
+        tokenizer = jieba.dt
+        if tokenizer.initialized:
+            return jieba
+        jieba.setLogLevel(logging.WARNING)
+        cache_path = os.path.abspath(cache_path or state_path(f"jieba-{jieba.__version__}.cache"))
+        if os.path.isfile(cache_path) and tokenizer.dictionary == jieba.DEFAULT_DICT:
+            try:
+                with open(cache_path, 'rb') as f:
+                    tokenizer.FREQ, tokenizer.total = marshal.loads(f.read())
+                tokenizer.initialized = True
+                return jieba
+            except (OSError, ValueError, EOFError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable jieba cache {cache_path}: {e}")
+        # Builds from dict.txt and writes the cache
+        tokenizer.cache_file = cache_path
+        tokenizer.initialize()
+    return jieba
+
+
+def tokenize(text, stop_words=STOP_WORDS, min_length=3):
+    """
+    Lower-cased content words of `text`.
+    Chinese runs are segmented with jieba (words of 2+ characters are kept),
+    everything else is split on word characters.
+    """
+    text = text.lower()
+    if not has_cjk(text):
+        return [w for w in _WORD.findall(text) if len(w) >= min_length and w not in stop_words]
+
+    jieba = load_jieba()
+    tokens = []
+    for word in jieba.cut(text):
+        word = word.strip()
+        if not word or word in stop_words or not _WORD.fullmatch(word):
+            continue
+        if has_cjk(word):
+            if len(word) >= 2:
+                tokens.append(word)
+        elif len(word) >= min_length:
+            tokens.append(word)
+    return tokens
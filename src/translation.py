@@ -0,0 +1,177 @@
+import random
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import load_json, save_json
+
+logger = logging.getLogger("LRBAuto")
+
+
+class TranslationCache:
+    """
+    Persistent (language pair, source text) -> translation map.
+    Only successful translations are stored, so failures are retried next run.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = load_json(path, {}) if path else {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def get(self, pair, text):
+        return self.entries.get(pair, {}).get(text)
+
+    def put(self, pair, text, translated):
+        with self._lock:
+            self.entries.setdefault(pair, {})[text] = translated
+            self._dirty = True
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            save_json(self.path, self.entries)
+            self._dirty = False
+
+
+class StubTranslator:
+    """
+    Offline stand-in with the GoogleTranslator interface, for tests and benchmarks.
+    Prefixes the text with the target language after an optional simulated delay.
+    """
+
+    def __init__(self, source='zh-CN', target='en', latency=0.0, fail_rate=0.0):
+        self.source = source
+        self.target = target
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.calls = 0
+
+    def translate(self, text):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise ConnectionError("Simulated translation failure")
+        return "\n".join(f"[{self.target}] {line}" if line else line for line in text.split("\n"))
+
+
+class CachedTranslator:
+    """
+    Translation layer in front of a deep_translator-style backend.
+
+    - Results are cached persistently per language pair (and per backend
+      when `backend_name` is given, so a stand-in never fills another
+      backend's cache)
+    - Single-line texts are packed into one request per ~`batch_chars`
+      characters, one text per line; the batch is split back by line
+    - Requests run on up to `max_workers` threads, each with its own backend
+      instance (deep_translator translators are not thread-safe)
+    - Failed requests are retried with exponential backoff and jitter
+    """
+
+    def __init__(self, backend_factory, source='zh-CN', target='en', cache=None,
+                 max_workers=4, retries=3, backoff=1.0, batch_chars=4500, backend_name=None):
+        self.backend_factory = backend_factory
+        self.pair = f"{backend_name}:{source}>{target}" if backend_name else f"{source}>{target}"
+        self.cache = cache or TranslationCache()
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_chars = batch_chars
+        self._local = threading.local()
+        self.stats = {"hits": 0, "requests": 0}
+
+    def _backend(self):
+        if not hasattr(self._local, "backend"):
+            self._local.backend = self.backend_factory()
+        return self._local.backend
+
+    def _request(self, text):
+        """One backend call with retries"""
+        for attempt in range(self.retries + 1):
+            try:
+                self.stats["requests"] += 1
+                return self._backend().translate(text)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"Translation failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _batches(self, texts):
+        """Groups texts into request-sized batches; multi-line texts travel alone"""
+        batch, size = [], 0
+        for text in texts:
+            if "\n" in text or len(text) > self.batch_chars:
+                yield [text]
+                continue
+            if batch and size + len(text) + 1 > self.batch_chars:
+                yield batch
+                batch, size = [], 0
+            batch.append(text)
+            size += len(text) + 1
+        if batch:
+            yield batch
+
+    def _translate_batch(self, batch):
+        """Returns {text: translation} for a batch, leaving out texts that failed"""
+        results = {}
+        if len(batch) > 1:
+            try:
+                lines = (self._request("\n".join(batch)) or "").split("\n")
+                if len(lines) == len(batch):
+                    return {text: line.strip() for text, line in zip(batch, lines)}
+                logger.debug(f"Batch of {len(batch)} came back as {len(lines)} lines; translating one by one")
+            except Exception as e:
+                logger.warning(f"Batch translation failed: {e}")
+        for text in batch:
+            try:
+                results[text] = self._request(text)
+            except Exception as e:
+                logger.error(f"Translation failed for '{text[:30]}': {e}")
+        return results
+
+    def translate_many(self, texts):
+        """
+        Translates a list of texts.
+
+        Returns:
+            List of translations in the same order; None where translation failed
+        """
+        results = {}
+        missing = []
+        for text in dict.fromkeys(t for t in texts if t and t.strip()):
+            cached = self.cache.get(self.pair, text)
+            if cached is not None:
+                results[text] = cached
+                self.stats["hits"] += 1
+            else:
+                missing.append(text)
+
+        if missing:
+            batches = list(self._batches(missing))
+            with ThreadPoolExecutor(max_workers=max(min(self.max_workers, len(batches)), 1)) as executor:
+                for translated in executor.map(self._translate_batch, batches):
+                    for text, result in translated.items():
+                        if result:
+                            self.cache.put(self.pair, text, result)
+                            results[text] = result
+
+        # Blank input translates to itself
+        return [results.get(t) if t and t.strip() else t for t in texts]
+
+    def translate(self, text):
+        """
+        Translates a single text.
+
+        Raises:
+            RuntimeError: If the translation failed after all retries
+        """
+        result = self.translate_many([text])[0]
+        if result is None:
+            raise RuntimeError(f"Could not translate '{text[:30]}'")
+        return result
@@ -0,0 +1,295 @@
+import os
+import time
+import shutil
+import logging
+import datetime
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.resumable_upload import QuotaExceededError
+from src.utils import load_json, save_json
+
+logger = logging.getLogger("LRBAuto")
+
+# YouTube Data API v3 units per call and the default daily allowance of a Cloud project.
+# Quota belongs to the project (the OAuth client), not to the channel uploading
+QUOTA_COSTS = {"videos.insert": 1600, "captions.insert": 400}
+DAILY_QUOTA = 10000
+
+# A video that keeps failing for reasons other than quota is given up after this many attempts
+MAX_UPLOAD_ATTEMPTS = 5
+
+try:
+    from zoneinfo import ZoneInfo
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:  # No tz database; PST is close enough to find the reset day
+    _QUOTA_TZ = datetime.timezone(datetime.timedelta(hours=-8))
+
+
+def quota_day(now=None):
+    """The quota day; YouTube resets quotas at midnight Pacific Time"""
+    return datetime.datetime.fromtimestamp(now if now is not None else time.time(), _QUOTA_TZ).strftime("%Y-%m-%d")
+
+
+class QuotaTracker:
+    """
+    API units used today per quota key (a Cloud project's OAuth client id),
+    persisted so consecutive runs on the same day share the budget. A key the
+    API reported as exhausted stays blocked until the next quota day, whatever
+    the local count says.
+    """
+
+    def __init__(self, path=None, daily_quota=DAILY_QUOTA, clock=time.time):
+        self.path = path
+        self.daily_quota = daily_quota
+        self.clock = clock
+        self.usage = load_json(path, {}) if path else {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key):
+        day = quota_day(self.clock())
+        entry = self.usage.get(key)
+        if not entry or entry.get("day") != day:
+            entry = self.usage[key] = {"day": day, "used": 0, "exhausted": False}
+        return entry
+
+    def remaining(self, key):
+        with self._lock:
+            entry = self._entry(key)
+            return 0 if entry["exhausted"] else max(self.daily_quota - entry["used"], 0)
+
+    def can_afford(self, key, cost):
+        return self.remaining(key) >= cost
+
+    def charge(self, key, cost):
+        with self._lock:
+            self._entry(key)["used"] += cost
+            self._save()
+
+    def mark_exhausted(self, key):
+        with self._lock:
+            self._entry(key)["exhausted"] = True
+            self._save()
+
+    def _save(self):
+        if self.path:
+            save_json(self.path, self.usage, indent=2)
+
+
+class UploadQueue:
+    """
+    Finished videos waiting for quota, persisted as JSON.
+
+    A job is a dict with at least "id", "video_path", "title" and "description"
+    (optionally "tags", "privacy_status", "captions_path", "metadata"). Queued
+    files are moved into `directory`, so cleaning up the download folder does
+    not throw away the encoded video. Keep `directory` out of anything that is
+    cached wholesale (the workflow's state/ cache): a job whose file is gone is
+    dropped by UploadScheduler.drain() and reported in its `lost` list.
+    """
+
+    def __init__(self, path=None, directory=None):
+        self.path = path
+        self.directory = directory
+        self.jobs = load_json(path, []) if path else []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def put(self, job):
+        job = dict(job)
+        if self.directory:
+            target = os.path.join(self.directory, job["id"])
+            os.makedirs(target, exist_ok=True)
+            for key in ("video_path", "captions_path"):
+                if job.get(key) and os.path.dirname(os.path.abspath(job[key])) != os.path.abspath(target):
+                    job[key] = shutil.move(job[key], os.path.join(target, os.path.basename(job[key])))
+        job.setdefault("queued_at", time.time())
+        job.setdefault("attempts", 0)
+        with self._lock:
+            self.jobs = [j for j in self.jobs if j["id"] != job["id"]] + [job]
+            self._save()
+        logger.info(f"Queued {job['id']} for a later upload ({len(self.jobs)} waiting)")
+        return job
+
+    def update(self, job):
+        with self._lock:
+            self.jobs = [job if j["id"] == job["id"] else j for j in self.jobs]
+            self._save()
+
+    def remove(self, job):
+        with self._lock:
+            self.jobs = [j for j in self.jobs if j["id"] != job["id"]]
+            self._save()
+        if self.directory:
+            shutil.rmtree(os.path.join(self.directory, job["id"]), ignore_errors=True)
+
+    def _save(self):
+        if self.path:
+            save_json(self.path, self.jobs, indent=2)
+
+
+class UploadScheduler:
+    """
+    Spreads uploads over one or more channels within the daily API quota of
+    their Cloud projects.
+
+    Each channel is a YouTubeUploader-like object (upload_video, upload_captions,
+    last_error). YouTube charges quota to the OAuth client's project, so
+    channels authorized through the same client share one budget: `projects`
+    maps each channel to its project key (default: every channel its own
+    project). Only channels with their own client add quota.
+
+    A video is uploaded right away when some channel can afford it
+    and queued when none can or the API reports the quota exhausted; queued
+    videos are retried by drain() on later runs, one worker thread per channel.
+    Other upload errors are not queued: the caller still owns the files and
+    decides whether to retry.
+    """
+
+    def __init__(self, uploaders, quota=None, queue=None, costs=QUOTA_COSTS, projects=None):
+        self.uploaders = dict(uploaders)
+        self.projects = {name: (projects or {}).get(name, name) for name in self.uploaders}
+        self.quota = quota if quota is not None else QuotaTracker()
+        self.queue = queue if queue is not None else UploadQueue()
+        self.costs = costs
+        # Jobs drain() dropped because their files were gone
+        self.lost = []
+        # Units of uploads in flight per project, so parallel drain workers don't overspend
+        self._reserved = {}
+        self._lock = threading.Lock()
+
+    def _job_cost(self, job):
+        return self.costs["videos.insert"] + (self.costs["captions.insert"] if job.get("captions_path") else 0)
+
+    def remaining(self, channel):
+        """Quota left for `channel`: its project's, minus uploads in flight there"""
+        project = self.projects[channel]
+        return self.quota.remaining(project) - self._reserved.get(project, 0)
+
+    def pick_channel(self, cost=None):
+        """Channel whose project has the most quota left and can afford `cost`, or None"""
+        cost = self.costs["videos.insert"] if cost is None else cost
+        affordable = [(self.remaining(name), name) for name in self.uploaders]
+        affordable = [(left, name) for left, name in affordable if left >= cost]
+        return max(affordable)[1] if affordable else None
+
+    def has_quota(self):
+        return self.pick_channel() is not None
+
+    def record(self, channel, error=None, cost=None):
+        """Accounts for an API call made on `channel` outside the scheduler (e.g. a streamed upload)"""
+        project = self.projects[channel]
+        self.quota.charge(project, self.costs["videos.insert"] if cost is None else cost)
+        if isinstance(error, QuotaExceededError):
+            logger.warning(f"YouTube quota exhausted for project '{project}' (channel '{channel}')")
+            self.quota.mark_exhausted(project)
+
+    def _upload_on(self, channel, job):
+        """Uploads one job on one channel; returns the video ID or None (see uploader.last_error)"""
+        uploader = self.uploaders[channel]
+        logger.info(f"Uploading {job['id']} on channel '{channel}'")
+        video_id = uploader.upload_video(
+            job["video_path"],
+            title=job["title"],
+            description=job["description"],
+            tags=job.get("tags"),
+            privacy_status=job.get("privacy_status", "private")
+        )
+        self.record(channel, None if video_id else uploader.last_error)
+        if video_id and job.get("captions_path"):
+            # A missing caption track is not worth losing the upload over
+            caption_id = uploader.upload_captions(video_id, job["captions_path"])
+            self.record(channel, None if caption_id else uploader.last_error, self.costs["captions.insert"])
+            if not caption_id:
+                logger.warning("Caption upload failed; video is online without captions.")
+        return video_id
+
+    def upload(self, job):
+        """
+        Uploads a finished video now, trying channels by remaining quota.
+        Queues it if no channel can take it; a failure other than
+        QuotaExceededError is not queued.
+
+        Returns:
+            (video_id, channel) on success, (None, None) when the job was queued,
+            (None, channel) when the upload on `channel` failed for another
+            reason (see that uploader's last_error)
+        """
+        tried = set()
+        while True:
+            channel = self.pick_channel(self._job_cost(job))
+            if channel is None or channel in tried:
+                break
+            tried.add(channel)
+            video_id = self._upload_on(channel, job)
+            if video_id:
+                return video_id, channel
+            if not isinstance(self.uploaders[channel].last_error, QuotaExceededError):
+                return None, channel
+
+        self.queue.put(job)
+        return None, None
+
+    def drain(self):
+        """
+        Uploads queued videos, one worker per channel, while quota lasts.
+
+        Jobs whose video file no longer exists (e.g. the queue file came back
+        from a cache without the pending directory) are removed from the queue
+        and collected in `self.lost`, so the caller can process them again.
+
+        Returns:
+            List of (job, video_id, channel) for every uploaded video
+        """
+        pending = deque()
+        for job in list(self.queue.jobs):
+            if os.path.exists(job["video_path"]):
+                pending.append(job)
+            else:
+                logger.warning(f"Queued video {job['id']} is missing {job['video_path']}; dropping it from the queue")
+                self.queue.remove(job)
+                self.lost.append(job)
+        if not pending:
+            return []
+        logger.info(f"Draining upload queue: {len(pending)} video(s) across {len(self.uploaders)} channel(s)")
+        uploaded = []
+
+        def worker(channel):
+            project = self.projects[channel]
+            while True:
+                with self._lock:
+                    if not pending:
+                        return
+                    cost = self._job_cost(pending[0])
+                    if self.remaining(channel) < cost:
+                        return
+                    job = pending.popleft()
+                    self._reserved[project] = self._reserved.get(project, 0) + cost
+                try:
+                    video_id = self._upload_on(channel, job)
+                finally:
+                    with self._lock:
+                        self._reserved[project] -= cost
+                if video_id:
+                    self.queue.remove(job)
+                    with self._lock:
+                        uploaded.append((job, video_id, channel))
+                elif isinstance(self.uploaders[channel].last_error, QuotaExceededError):
+                    with self._lock:
+                        pending.appendleft(job)
+                    return
+                else:
+                    job = dict(job, attempts=job.get("attempts", 0) + 1)
+                    if job["attempts"] >= MAX_UPLOAD_ATTEMPTS:
+                        logger.error(f"Giving up on {job['id']} after {job['attempts']} failed uploads")
+                        self.queue.remove(job)
+                    else:
+                        self.queue.update(job)
+
+        with ThreadPoolExecutor(max_workers=len(self.uploaders), thread_name_prefix="upload") as executor:
+            list(executor.map(worker, list(self.uploaders)))
+
+        logger.info(f"Uploaded {len(uploaded)} queued video(s); {len(self.queue)} still waiting")
+        return uploaded
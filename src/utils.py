@@ -1,7 +1,10 @@
 import json
 import os
+import time
+import asyncio
 import logging
 import difflib
+import threading
 from typing import Dict, List, Tuple, Optional
 
 # Configure logging
@@ -13,6 +16,32 @@ logger = logging.getLogger("LRBAuto")
 
 HISTORY_FILE = "history.json"
 
+# Caches and other state that should survive between runs (restored by the workflow's cache step)
+STATE_DIR = os.environ.get("LRBAUTO_STATE_DIR", "state")
+
+def state_path(name: str) -> str:
+    """Path of a file inside the state directory (created on demand)."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    return os.path.join(STATE_DIR, name)
+
+def load_json(path: str, default=None):
+    """Load a JSON file, returning `default` when it is missing or corrupted."""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Ignoring unreadable {path}: {e}")
+        return default
+
+def save_json(path: str, data, indent: Optional[int] = None):
+    """Write JSON atomically so a crash mid-write never leaves a truncated file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
 def load_history():
     if os.path.exists(HISTORY_FILE):
         try:
@@ -56,6 +85,24 @@ def mark_video_downloaded(video_id: str, history: Dict, metadata: Optional[Dict]
         
     save_history(history)
 
+def unmark_video_downloaded(video_id: str, history: Dict):
+    """
+    Forget that a video was processed (e.g. its queued upload was lost), so the next run picks it up again.
+    """
+    if video_id in history.get("downloaded_ids", []):
+        history["downloaded_ids"].remove(video_id)
+    history.get("processed_metadata", {}).pop(video_id, None)
+    save_history(history)
+
+def record_upload_failure(video_id: str, history: Dict) -> int:
+    """
+    Count a failed upload of a video across runs; returns the number of failures so far.
+    """
+    failures = history.setdefault("upload_failures", {})
+    failures[video_id] = failures.get(video_id, 0) + 1
+    save_history(history)
+    return failures[video_id]
+
 def clean_filename(title):
     keepcharacters = (' ','.','_')
     return "".join(c for c in title if c.isalnum() or c in keepcharacters).rstrip()
@@ -93,3 +140,41 @@ def check_similarity(new_title: str, history: Dict, threshold: float = 0.8) -> T
             }
             
     return False, None
+
+class TokenBucket:
+    """
+    Thread-safe rate limiter: acquire() blocks until a request may go out.
+    Allows `rate` requests per second on average and bursts of up to `burst`.
+    A rate of None or 0 disables limiting.
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: int) -> float:
+        """Takes `tokens` if available and returns 0, else returns how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: int = 1):
+        if not self.rate:
+            return
+        while wait := self._take(tokens):
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 1):
+        """acquire() for coroutines: waits with asyncio.sleep instead of blocking the event loop."""
+        if not self.rate:
+            return
+        while wait := self._take(tokens):
+            await asyncio.sleep(wait)
@@ -0,0 +1,373 @@
+import os
+import re
+import hashlib
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from src.bulk_download import STAGING_DIR
+from src.ffmpeg_runner import FFmpegRunner, FFmpegError
+from src.subtitle_source import SUBTITLE_EXTENSIONS
+from src.utils import load_json, save_json
+
+logger = logging.getLogger("LRBAuto")
+
+FOLDER_PATTERN = re.compile(r'^video_(\d+)$')
+DUPLICATES_DIR = "_duplicates"
+# Bytes read from each end of a file for its quick fingerprint
+FINGERPRINT_BYTES = 1024 * 1024
+PROBE_ENTRIES = ("format=duration:format_tags=title,comment,description,artist"
+                 ":stream=codec_type,codec_name,width,height")
+
+_BVID = re.compile(r'BV[0-9A-Za-z]{10}')
+# XHS note ids are 24 hex digits (the first 8 a timestamp)
+_XHS_NOTE_ID = re.compile(r'(?<![0-9a-f])[0-9a-f]{24}(?![0-9a-f])')
+# XHS-Downloader's default name: 发布时间_作者昵称_作品标题 (time as 2024-01-05_12.30.45)
+_XHS_NAME = re.compile(r'^(?P<date>\d{4}-\d{2}-\d{2})[_ ]\d{2}[.:_-]\d{2}[.:_-]\d{2}_(?P<author>[^_]+)_(?P<title>.+)$')
+# BBDown part files: [P01]Part title
+_BBDOWN_PART = re.compile(r'^\[P(\d+)\]\s*')
+# " (1)" suffixes that browsers and downloaders add to repeated names
+_COPY_SUFFIX = re.compile(r'\s*\(\d+\)$')
+# Names that say nothing about the video (video.mp4, 1.mp4, download (2).mp4)
+_GENERIC_NAME = re.compile(r'^(video|视频|download|untitled)?[\s_\-().\d]*$', re.IGNORECASE)
+
+
+def parse_filename(path, drop_dir):
+    """
+    Metadata implied by a downloaded file's name and location.
+
+    Understands bulk_download.py's yt-dlp names (BVxxx_title), BBDown
+    titles and multi-part folders (title/[P01]part), XHS-Downloader's
+    time_author_title names and XHS note ids.
+
+    Returns:
+        Dict with any of: title, author, bv_id, note_id, url, published, part
+    """
+    stem = _COPY_SUFFIX.sub('', Path(path).stem)
+    info = {}
+    bvid = _BVID.search(stem)
+    note_id = _XHS_NOTE_ID.search(stem)
+    if bvid:
+        info['bv_id'] = bvid.group(0)
+        info['url'] = f"https://www.bilibili.com/video/{info['bv_id']}"
+        stem = stem.replace(info['bv_id'], ' ')
+    elif note_id:
+        info['note_id'] = note_id.group(0)
+        info['url'] = f"https://www.xiaohongshu.com/explore/{info['note_id']}"
+        stem = stem.replace(info['note_id'], ' ')
+
+    xhs = _XHS_NAME.match(stem.strip(' _-'))
+    if xhs:
+        info['author'] = xhs.group('author')
+        info['published'] = xhs.group('date')
+        stem = xhs.group('title')
+
+    # Multi-part BBDown downloads: the folder carries the video title, the file the part
+    parent = os.path.dirname(os.path.relpath(path, drop_dir))
+    part = _BBDOWN_PART.match(stem)
+    if part:
+        info['part'] = int(part.group(1))
+        stem = stem[part.end():]
+    if parent and parent != os.curdir:
+        folder_title = os.path.basename(parent).strip()
+        if not _GENERIC_NAME.match(stem.strip()):
+            stem = f"{folder_title} {stem.strip()}"
+        else:
+            # [P02]02.mp4: only the part number tells the parts apart
+            stem = f"{folder_title} {part_label(info['part'])}" if part else folder_title
+
+    title = re.sub(r'[\s_]+', ' ', stem.strip(' _-[]【】')).strip()
+    if title and not _GENERIC_NAME.match(title):
+        info['title'] = title
+    return info
+
+
+def part_label(number):
+    """Part number as BBDown writes it: 2 -> 'P02'"""
+    return f"P{number:02d}"
+
+
+def probe_video(path, runner):
+    """Duration, codecs, size and embedded tags of a file (empty values if ffprobe fails)"""
+    info = {'duration': None, 'video_codec': None, 'audio_codec': None, 'width': None, 'height': None, 'tags': {}}
+    try:
+        result = runner.probe(path, entries=PROBE_ENTRIES)
+    except (FFmpegError, OSError, ValueError) as e:
+        logger.warning(f"ffprobe failed on {os.path.basename(path)}: {e}")
+        return info
+    fmt = result.get('format', {})
+    try:
+        info['duration'] = round(float(fmt.get('duration')), 2)
+    except (TypeError, ValueError):
+        pass
+    info['tags'] = {k.lower(): v for k, v in (fmt.get('tags') or {}).items() if isinstance(v, str) and v.strip()}
+    for stream in result.get('streams', []):
+        if stream.get('codec_type') == 'video' and not info['video_codec']:
+            info.update(video_codec=stream.get('codec_name'), width=stream.get('width'), height=stream.get('height'))
+        elif stream.get('codec_type') == 'audio' and not info['audio_codec']:
+            info['audio_codec'] = stream.get('codec_name')
+    return info
+
+
+def fingerprint(path, size=None):
+    """Quick identity of a file: its size plus a hash of its first and last FINGERPRINT_BYTES"""
+    size = os.path.getsize(path) if size is None else size
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if size > 2 * FINGERPRINT_BYTES:
+            f.seek(size - FINGERPRINT_BYTES)
+            digest.update(f.read(FINGERPRINT_BYTES))
+    return f"{size}:{digest.hexdigest()[:32]}"
+
+
+def sha256_file(path, block_size=4 * 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class VideoOrganizer:
+    """
+    Turns the MP4s dropped into a folder (BBDown, XHS-Downloader,
+    bulk_download.py) into the video_NNN/{video.mp4, metadata.json} folders
+    LocalVideoProcessor reads, with metadata filled in automatically.
+
+    - ffprobe and the fingerprint of every file run in a worker pool
+    - Duplicates are found by fingerprint (size + both ends of the file);
+      only files whose fingerprints collide are hashed in full to confirm,
+      so thousands of files cost a few MB of reads each at most. Those
+      hashes run in the pool too, and organized folders keep their
+      fingerprint and hash in metadata.json so they are computed once
+    - Files already organized (any folder with a metadata.json) count as
+      known, so re-running only picks up new downloads
+    - All folders are created in one pass after planning; moves are renames
+      on the same disk
+
+    Args:
+        drop_dir: Folder with the downloads (and the video_NNN folders)
+        workers: Parallel ffprobe / hashing workers
+        runner: FFmpegRunner used for ffprobe
+    """
+
+    def __init__(self, drop_dir, workers=None, runner=None):
+        self.drop_dir = drop_dir
+        # ffprobe runs are mostly process start-up and I/O waits, so more threads than cores pay off
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.runner = runner or FFmpegRunner()
+        self.stats = {"organized": 0, "duplicates": 0, "full_hashes": 0}
+        # Organized folders whose fingerprint or hash plan() computed, written back by apply()
+        self._folder_updates = {}
+
+    def find_new_videos(self):
+        """MP4 files under drop_dir that are not in an organized folder yet"""
+        videos = []
+        skip_dirs = {STAGING_DIR, DUPLICATES_DIR}
+        for root, dirs, files in os.walk(self.drop_dir):
+            dirs[:] = sorted(d for d in dirs if d not in skip_dirs and not d.startswith('.')
+                             and not os.path.exists(os.path.join(root, d, "metadata.json")))
+            videos += [os.path.join(root, name) for name in sorted(files)
+                       if name.lower().endswith(".mp4") and not name.startswith('.')]
+        return videos
+
+    def existing_folders(self):
+        """{folder name: metadata} of the organized folders"""
+        folders = {}
+        for name in os.listdir(self.drop_dir):
+            path = os.path.join(self.drop_dir, name, "metadata.json")
+            if os.path.isfile(path):
+                folders[name] = load_json(path, {}) or {}
+        return folders
+
+    def _inspect(self, path):
+        size = os.path.getsize(path)
+        return {
+            'path': path,
+            'size': size,
+            'fingerprint': fingerprint(path, size),
+            'probe': probe_video(path, self.runner),
+            'parsed': parse_filename(path, self.drop_dir),
+        }
+
+    def _hash_collisions(self, items, folders, executor):
+        """
+        Full hashes of every file whose fingerprint collides with another one,
+        computed on the executor. Folders keep theirs in their metadata.
+        """
+        groups = {}
+        for name, meta in folders.items():
+            if meta.get('fingerprint'):
+                groups.setdefault(meta['fingerprint'], []).append((name, meta))
+        for item in items:
+            item['sha256'] = None
+            groups.setdefault(item['fingerprint'], []).append((None, item))
+
+        to_hash = []
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            for name, entry in group:
+                path = os.path.join(self.drop_dir, name, "video.mp4") if name else entry['path']
+                if not entry.get('sha256') and os.path.isfile(path):
+                    to_hash.append((name, entry, path))
+
+        self.stats["full_hashes"] += len(to_hash)
+        digests = executor.map(sha256_file, [path for _, _, path in to_hash])
+        for (name, entry, _), digest in zip(to_hash, digests):
+            entry['sha256'] = digest
+            if name:
+                self._folder_updates[name] = entry
+
+    @staticmethod
+    def _find_duplicates(items, folders):
+        """Marks items whose content is already organized or appears earlier in the list"""
+        known = {}
+        for name, meta in folders.items():
+            if meta.get('fingerprint'):
+                known.setdefault(meta['fingerprint'], []).append((name, meta.get('sha256')))
+
+        for item in items:
+            for name, digest in known.get(item['fingerprint'], []):
+                if digest is not None and digest == item['sha256']:
+                    item['duplicate_of'] = name
+                    break
+            if 'duplicate_of' not in item:
+                known.setdefault(item['fingerprint'], []).append((item['path'], item['sha256']))
+
+    @staticmethod
+    def build_metadata(item):
+        """metadata.json contents for one inspected file"""
+        parsed, probe = item['parsed'], item['probe']
+        tags = probe['tags']
+        tag_title = tags.get('title', '').strip()
+        if tag_title and _GENERIC_NAME.match(tag_title):
+            tag_title = ''
+        title = parsed.get('title')
+        if not title:
+            # Nothing descriptive in the name: the embedded title, else the file's id or
+            # name with its length, plus the part number, so parts and copies differ
+            if tag_title:
+                title = tag_title
+            else:
+                title = parsed.get('bv_id') or parsed.get('note_id') or _COPY_SUFFIX.sub('', Path(item['path']).stem)
+                if probe['duration']:
+                    minutes, seconds = divmod(round(probe['duration']), 60)
+                    title += f" [{minutes}:{seconds:02d}]"
+            if parsed.get('part'):
+                title += f" {part_label(parsed['part'])}"
+        description = (tags.get('description') or tags.get('comment') or '').strip() or title
+        metadata = {
+            "title": title,
+            "description": description,
+            "url": parsed.get('url') or Path(os.path.abspath(item['path'])).as_uri(),
+            "tags": [],
+            "source_file": os.path.basename(item['path']),
+            "duration": probe['duration'],
+            "width": probe['width'],
+            "height": probe['height'],
+            "video_codec": probe['video_codec'],
+            "audio_codec": probe['audio_codec'],
+            "size": item['size'],
+            "fingerprint": item['fingerprint'],
+            "auto_metadata": True,
+        }
+        if item.get('sha256'):
+            metadata['sha256'] = item['sha256']
+        author = parsed.get('author') or tags.get('artist')
+        if author:
+            metadata['author'] = author
+        for field in ('bv_id', 'note_id', 'published', 'part'):
+            if parsed.get(field):
+                metadata[field] = parsed[field]
+        return metadata
+
+    def _sidecars(self, video_path):
+        """Subtitle files named after a video (name.srt, name.zh.srt)"""
+        folder, stem = os.path.split(video_path)
+        stem = os.path.splitext(stem)[0]
+        sidecars = []
+        for name in os.listdir(folder):
+            base, ext = os.path.splitext(name)
+            if ext.lower() in SUBTITLE_EXTENSIONS and (base == stem or base.startswith(stem + ".")):
+                sidecars.append((os.path.join(folder, name), "video" + name[len(stem):]))
+        return sidecars
+
+    def plan(self, videos=None):
+        """
+        Inspects the new videos in parallel and decides where each one goes.
+
+        Returns:
+            List of items with 'folder' (new folder name) or 'duplicate_of'
+        """
+        videos = self.find_new_videos() if videos is None else videos
+        folders = self.existing_folders()
+        # Folders organized by hand or by the old shell script have no fingerprint yet
+        unknown = [name for name, meta in folders.items() if not meta.get('fingerprint')
+                   and os.path.isfile(os.path.join(self.drop_dir, name, "video.mp4"))]
+        self._folder_updates = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="organize") as executor:
+            items = list(executor.map(self._inspect, videos))
+            fingerprints = executor.map(fingerprint, [os.path.join(self.drop_dir, n, "video.mp4") for n in unknown])
+            for name, value in zip(unknown, fingerprints):
+                folders[name]['fingerprint'] = value
+                self._folder_updates[name] = folders[name]
+            self._hash_collisions(items, folders, executor)
+        self._find_duplicates(items, folders)
+
+        numbers = [int(m.group(1)) for m in map(FOLDER_PATTERN.match, os.listdir(self.drop_dir)) if m]
+        next_number = max(numbers, default=0) + 1
+        # Titles are how the pipeline tells videos apart, so no two folders share one
+        titles = {meta.get('title') for meta in folders.values()}
+        for item in items:
+            if 'duplicate_of' in item:
+                continue
+            item['folder'] = f"video_{next_number:03d}"
+            item['metadata'] = self.build_metadata(item)
+            title, counter = item['metadata']['title'], 2
+            while item['metadata']['title'] in titles:
+                item['metadata']['title'] = f"{title} #{counter}"
+                counter += 1
+            titles.add(item['metadata']['title'])
+            next_number += 1
+        return items
+
+    def apply(self, items):
+        """Creates the planned folders, moves duplicates aside and saves what plan() learned about existing folders"""
+        for name, metadata in self._folder_updates.items():
+            save_json(os.path.join(self.drop_dir, name, "metadata.json"), metadata, indent=2)
+        self._folder_updates = {}
+        emptied = set()
+        for item in items:
+            source = item['path']
+            emptied.add(os.path.dirname(source))
+            if 'duplicate_of' in item:
+                target_dir = os.path.join(self.drop_dir, DUPLICATES_DIR)
+                os.makedirs(target_dir, exist_ok=True)
+                target = os.path.join(target_dir, os.path.basename(source))
+                if os.path.exists(target):
+                    target = os.path.join(target_dir, f"{item['fingerprint'].replace(':', '_')}_{os.path.basename(source)}")
+                os.replace(source, target)
+                self.stats["duplicates"] += 1
+                logger.info(f"Duplicate of {item['duplicate_of']}: {os.path.basename(source)}")
+                continue
+            folder = os.path.join(self.drop_dir, item['folder'])
+            os.makedirs(folder)
+            sidecars = self._sidecars(source)
+            os.replace(source, os.path.join(folder, "video.mp4"))
+            for sidecar, name in sidecars:
+                os.replace(sidecar, os.path.join(folder, name))
+            save_json(os.path.join(folder, "metadata.json"), item['metadata'], indent=2)
+            self.stats["organized"] += 1
+            logger.info(f"{item['folder']}: {item['metadata']['title']}")
+        # BBDown part folders left empty by the moves
+        for folder in sorted(emptied, key=len, reverse=True):
+            if os.path.abspath(folder) != os.path.abspath(self.drop_dir) and not os.listdir(folder):
+                os.rmdir(folder)
+
+    def run(self, dry_run=False):
+        items = self.plan()
+        if not dry_run:
+            self.apply(items)
+        return items
+
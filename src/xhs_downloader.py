@@ -1,9 +1,13 @@
-import requests
 import traceback
 from xhs import XhsClient
 import os
+import time
 import logging
-from src.utils import clean_filename
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import clean_filename, TokenBucket
+from src.http_download import HttpDownloader, DownloadError
 
 from xhshow import Xhshow
 import json
@@ -11,70 +15,108 @@ from urllib.parse import urlparse, parse_qs
 
 logger = logging.getLogger("LRBAuto")
 
+# Profile pages get_latest_videos reads at most (30 notes each) before giving up on `limit`
+LATEST_VIDEOS_MAX_PAGES = 5
+
+class XhsSigner:
+    """
+    Computes the x-s / x-t headers with one reusable xhshow client.
+
+    Usable as the `sign` callback of XhsClient. Signing is CPU-only and cheap;
+    headers are logged at DEBUG (header names only, never the values).
+    """
+
+    def __init__(self):
+        self.client = Xhshow()
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, uri, data=None, a1="", web_session=""):
+        return self.sign(uri, data, a1=a1, web_session=web_session)
+
+    def sign(self, uri, data=None, a1="", web_session=""):
+        try:
+            cookies = {"a1": a1, "web_session": web_session}
+            with self._lock:
+                self.count += 1
+                if data is None:
+                    # xhs passes the full relative URI with query params (e.g. /api/...?k=v);
+                    # xhshow signs path and params separately. keep_blank_values=True is
+                    # required because xhs sends empty params (e.g. cursor=) and the
+                    # signature must cover them.
+                    parsed = urlparse(uri)
+                    params = {k: v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+                    headers = self.client.sign_headers_get(uri=parsed.path, cookies=cookies, params=params)
+                else:
+                    payload = data
+                    if isinstance(data, str):
+                        try:
+                            payload = json.loads(data)
+                        except ValueError:
+                            pass
+                    headers = self.client.sign_headers_post(uri=uri, cookies=cookies, payload=payload)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Signed {'GET' if data is None else 'POST'} {uri}: {', '.join(headers)}")
+            return headers
+        except Exception as e:
+            logger.error(f"Error generating signature: {e}")
+            return {}
+
+
+_default_signer = None
+
+
 def sign(uri, data=None, a1="", web_session=""):
     """
-    Generates the necessary x-s and x-t headers using xhshow.
+    Generates the necessary x-s and x-t headers using xhshow
+    (through a shared XhsSigner).
     """
-    try:
-        # Construct cookies dict
-        cookies = {
-            "a1": a1,
-            "web_session": web_session
-        }
-        
-        # Instantiate Xhshow client
-        xs_client = Xhshow()
-        
-        # Check if it's a GET or POST based on 'data'
-        if data is None:
-             # GET request
-             # xhs passes the full relative URI with query params (e.g. /api/...?k=v)
-             # We need to separate them for xhshow to sign correctly
-             parsed = urlparse(uri)
-             path = parsed.path
-             # IMPORTANT: keep_blank_values=True is required because xhs sends empty params (e.g. cursor=)
-             # and if we drop them, the signature won't match what the server expects.
-             query_params = parse_qs(parsed.query, keep_blank_values=True)
-             
-             # Flatten params: parse_qs returns {'k': ['v']}, we need {'k': 'v'}
-             # We assume single value per key as per xhs library usage
-             clean_params = {k: v[0] for k, v in query_params.items()}
-             
-             logger.info(f"Signing GET: uri={uri} path={path} params={clean_params}")
-             headers = xs_client.sign_headers_get(uri=path, cookies=cookies, params=clean_params)
-        else:
-             # POST request
-             # Ensure data is a dict for xhshow
-             payload = data
-             if isinstance(data, str):
-                 try:
-                     payload = json.loads(data)
-                 except:
-                     pass
-             logger.info(f"Signing POST: uri={uri}")
-             headers = xs_client.sign_headers_post(uri=uri, cookies=cookies, payload=payload)
-             
-        logger.info(f"Generated Headers: {headers}")
-        return headers
-    except Exception as e:
-        logger.error(f"Error generating signature: {e}")
-        return {}
+    global _default_signer
+    if _default_signer is None:
+        _default_signer = XhsSigner()
+    return _default_signer.sign(uri, data, a1=a1, web_session=web_session)
 
 class XHSDownloader:
-    def __init__(self, cookie):
+    def __init__(self, cookie, max_workers=4, requests_per_second=2.0, host=None, signer=None, http=None):
+        """
+        Args:
+            cookie (str): Xiaohongshu web cookie (a1, web_session, ...)
+            max_workers (int): Concurrent requests in get_notes_many
+            requests_per_second (float): Rate limit for all API requests (None = unlimited)
+            host (str): API base URL (default: XhsClient's, edith.xiaohongshu.com)
+            signer (XhsSigner): Shared signer (one is created if None)
+            http (HttpDownloader): Downloader for the video files (one is created if None)
+        """
         self.cookie = cookie
-        self.client = XhsClient(cookie=cookie, sign=sign)
-        
-        # Monkeypatch: Inject missing Verifytype header to prevent library crash
-        try:
-            # Access private session with name mangling
-            session = self.client._XhsClient__session
-            # Ensure hooks are initialized
-            if not session.hooks.get('response'):
-                session.hooks['response'] = []
-            session.hooks['response'].append(self._inject_missing_headers)
-        except Exception as e:
-            logger.warning(f"Could not patch XhsClient session: {e}")
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(requests_per_second, burst=max_workers)
+        self.host = host
+        self.signer = signer or XhsSigner()
+        self.http = http or HttpDownloader()
+        # XhsClient keeps the signature headers on its session between signing and
+        # sending, so each thread gets its own client
+        self._local = threading.local()
+        self.client = self._client()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = XhsClient(cookie=self.cookie, sign=self.signer)
+            if self.host:
+                client._host = self.host.rstrip('/')
+
+            # Monkeypatch: Inject missing Verifytype header to prevent library crash
+            try:
+                # Access private session with name mangling
+                session = client._XhsClient__session
+                # Ensure hooks are initialized
+                if not session.hooks.get('response'):
+                    session.hooks['response'] = []
+                session.hooks['response'].append(self._inject_missing_headers)
+            except Exception as e:
+                logger.warning(f"Could not patch XhsClient session: {e}")
+            self._local.client = client
+        return client
 
     @staticmethod
     def _inject_missing_headers(response, *args, **kwargs):
@@ -84,38 +126,94 @@ class XHSDownloader:
              response.headers['Verifyuuid'] = '0'
         return response
 
-    def get_latest_videos(self, user_id, limit=10):
+    def iter_user_notes(self, user_id, max_pages=None):
         """
-        Fetches the latest video notes from a user.
+        Yields a user's notes page by page, newest first, following the cursor.
+        A page is only requested once the previous one has been consumed.
+
+        Args:
+            user_id (str): Xiaohongshu user ID
+            max_pages (int): Stop after this many pages (None = all)
+
+        Yields:
+            dict: Note summaries as returned by user_posted (note_id, type, display_title, cover, ...)
+        """
+        cursor = ""
+        for page in itertools.count(1):
+            self.rate_limiter.acquire()
+            result = self._client().get_user_notes(user_id, cursor=cursor)
+            if not result:
+                return
+            notes = result.get('notes', [])
+            logger.debug(f"User {user_id} page {page}: {len(notes)} notes")
+            yield from notes
+            cursor = result.get('cursor', '')
+            if not result.get('has_more') or not cursor or (max_pages and page >= max_pages):
+                return
+
+    def get_latest_videos(self, user_id, limit=10, max_pages=LATEST_VIDEOS_MAX_PAGES):
+        """
+        Fetches the latest video notes from a user, paging until `limit` videos
+        were found or `max_pages` pages were read (None = the whole profile).
         """
         try:
-            # Get user notes
-            notes = self.client.get_user_notes(user_id)
-            if not notes:
-                logger.warning(f"No notes found for user {user_id}")
-                return []
-            
             video_notes = []
-            for note in notes.get('notes', [])[:limit]:
+            for note in self.iter_user_notes(user_id, max_pages=max_pages):
                 if note.get('type') == 'video':
                     video_notes.append({
                         'id': note.get('note_id'),
                         'title': note.get('display_title'),
                         'cover': note.get('cover', {}).get('url')
                     })
+                    if len(video_notes) >= limit:
+                        break
+            if not video_notes:
+                logger.warning(f"No video notes found for user {user_id}")
             return video_notes
         except Exception as e:
             logger.error(f"Error fetching notes: {e}")
             return []
 
-    def download_video(self, note_id, output_dir="downloads"):
+    def get_note(self, note_id):
+        """Full note info (title, desc, video streams), or None on failure"""
+        try:
+            self.rate_limiter.acquire()
+            return self._client().get_note_by_id(note_id)
+        except Exception as e:
+            logger.error(f"Could not fetch details for note {note_id}: {e}")
+            return None
+
+    def get_notes_many(self, note_ids, max_workers=None):
+        """
+        Fetches many notes concurrently, within the rate limit.
+
+        Args:
+            note_ids (list): Note IDs
+            max_workers (int): Concurrent requests (default: the downloader's max_workers)
+
+        Returns:
+            dict: note_id -> note info, or None where fetching failed
+        """
+        note_ids = list(dict.fromkeys(note_ids))
+        if not note_ids:
+            return {}
+        workers = max(min(max_workers or self.max_workers, len(note_ids)), 1)
+        started = time.perf_counter()
+        signed = self.signer.count
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="xhs-note") as executor:
+            results = dict(zip(note_ids, executor.map(self.get_note, note_ids)))
+        logger.info(f"Fetched {len(note_ids)} notes in {time.perf_counter() - started:.1f}s with {workers} workers "
+                    f"({self.signer.count - signed} requests signed)")
+        return results
+
+    def download_video(self, note_id, output_dir="downloads", note_info=None):
         """
         Downloads a video note without watermark.
+        Pass `note_info` (e.g. from get_notes_many) to skip fetching it again.
         """
         try:
-            note_info = self.client.get_note_by_id(note_id)
+            note_info = note_info or self.get_note(note_id)
             if not note_info:
-                logger.error(f"Could not fetch details for note {note_id}")
                 return None
 
             video_url = note_info.get('video', {}).get('media', {}).get('stream', {}).get('h264', [{}])[0].get('master_url')
@@ -131,22 +229,19 @@ class XHSDownloader:
             
             output_path = os.path.join(output_dir, f"{title}.mp4")
             
-            # Simple download using requests since we have the direct URL
-            response = requests.get(video_url, stream=True)
-            if response.status_code == 200:
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=1024):
-                        f.write(chunk)
-                logger.info(f"Downloaded video: {output_path}")
-                return {
-                    'path': output_path,
-                    'title': note_info.get('title'),
-                    'desc': note_info.get('desc'),
-                    'id': note_id
-                }
-            else:
-                logger.error(f"Failed to download video stream. Status: {response.status_code}")
+            # Direct CDN URL: pooled, resumable, optionally ranged download
+            try:
+                self.http.download(video_url, output_path)
+            except DownloadError as e:
+                logger.error(f"Failed to download video stream: {e}")
                 return None
+            logger.info(f"Downloaded video: {output_path}")
+            return {
+                'path': output_path,
+                'title': note_info.get('title'),
+                'desc': note_info.get('desc'),
+                'id': note_id
+            }
 
         except Exception as e:
             logger.error(f"Error downloading video {note_id}: {e}")
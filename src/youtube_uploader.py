@@ -1,50 +1,165 @@
 import os
+import io
+import time
+import hashlib
+import datetime
 import google_auth_oauthlib.flow
 import googleapiclient.discovery
 import googleapiclient.errors
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import Request, AuthorizedSession
 import logging
+from src.segments import read_subtitles, to_srt
+from src.resumable_upload import (ResumableUploader, UploadSessionStore, QuotaExceededError,
+                                  UPLOAD_URL, DEFAULT_CHUNK_SIZE, QUOTA_REASONS)
+from src.utils import state_path, load_json, save_json
+from src.tag_engine import TagEngine
 
 logger = logging.getLogger("LRBAuto")
 
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
+# captions.insert is not covered by youtube.upload; the refresh token must have been granted this scope too
+CAPTION_SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
+
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+# Access tokens live outside the state dir on purpose: state/ is saved to the CI cache,
+# which must never contain credentials
+TOKEN_CACHE = os.environ.get("LRBAUTO_TOKEN_CACHE",
+                             os.path.join(os.path.expanduser("~"), ".cache", "lrbauto", "youtube_token.json"))
+# Refresh a cached token this long before it expires so it can't lapse mid-upload
+TOKEN_EXPIRY_MARGIN = 300
+
+
+def _api_error(error):
+    """Maps a quota HttpError from the API client to QuotaExceededError; other errors pass through"""
+    if isinstance(error, googleapiclient.errors.HttpError) and error.resp.status == 403:
+        details = getattr(error, "error_details", None) or []
+        reasons = {d.get("reason") for d in details if isinstance(d, dict)}
+        if reasons & QUOTA_REASONS:
+            return QuotaExceededError(str(error), 403, next(iter(reasons & QUOTA_REASONS)))
+    return error
+
+
+class TokenCache:
+    """
+    Access tokens cached on disk with their expiry, keyed by a hash of the
+    refresh token and scopes, so runs within the token's lifetime skip the
+    OAuth refresh round-trip. The file is only readable by its owner.
+    """
+
+    def __init__(self, path=TOKEN_CACHE):
+        self.path = path
+
+    @staticmethod
+    def key(refresh_token, scopes):
+        return hashlib.sha256("\n".join([refresh_token] + sorted(scopes)).encode()).hexdigest()
+
+    def get(self, key):
+        """Returns (token, expiry) when a cached token is valid for a while longer, else None"""
+        entry = load_json(self.path, {}).get(key) if self.path else None
+        if not entry or entry.get("expiry", 0) - TOKEN_EXPIRY_MARGIN < time.time():
+            return None
+        # google-auth compares expiry as a naive UTC datetime
+        expiry = datetime.datetime.fromtimestamp(entry["expiry"], datetime.timezone.utc).replace(tzinfo=None)
+        return entry["token"], expiry
+
+    def put(self, key, token, expiry):
+        if not self.path or not token or not expiry:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            entries = {k: v for k, v in load_json(self.path, {}).items() if v.get("expiry", 0) > time.time()}
+            # Credentials.expiry is a naive UTC datetime
+            entries[key] = {"token": token, "expiry": expiry.replace(tzinfo=datetime.timezone.utc).timestamp()}
+            save_json(self.path, entries)
+            os.chmod(self.path, 0o600)
+        except OSError as e:
+            logger.debug(f"Could not cache access token: {e}")
+
+
+def client_config(client_secrets):
+    """The OAuth client entry of a client_secrets.json dict (installed vs web, or top-level keys)"""
+    if "installed" in client_secrets:
+        return client_secrets["installed"]
+    if "web" in client_secrets:
+        return client_secrets["web"]
+    return client_secrets
 
-import jieba
 
 class YouTubeUploader:
-    def __init__(self, client_secrets, refresh_token):
+    def __init__(self, client_secrets, refresh_token, caption_upload=False,
+                 chunk_size=DEFAULT_CHUNK_SIZE, upload_url=UPLOAD_URL, session_store=None,
+                 token_cache=None, tag_engine=None):
         """
         Initializes the uploader with client secrets and a refresh token.
+        No network calls happen here; credentials and the API client are
+        set up on first use.
         client_secrets: Dict containing the client_secrets.json content.
         refresh_token: The refresh token string.
+        caption_upload: Also request the scope needed by upload_captions.
+        chunk_size: Bytes per resumable upload request (multiple of 256 KiB).
+        upload_url: Upload endpoint, overridable for a local fake server.
+        session_store: Where resumable session URIs are kept between runs.
+        token_cache: TokenCache for access tokens (default: ~/.cache/lrbauto).
+        tag_engine: TagEngine used by generate_tags (share one to share its IDF table).
         """
-        self.credentials = self._get_credentials(client_secrets, refresh_token)
-        self.youtube = googleapiclient.discovery.build("youtube", "v3", credentials=self.credentials)
+        self.scopes = SCOPES + CAPTION_SCOPES if caption_upload else SCOPES
+        self.chunk_size = chunk_size
+        self.upload_url = upload_url
+        self.session_store = session_store or UploadSessionStore(state_path("upload_sessions.json"))
+        self.token_cache = token_cache or TokenCache()
+        self.tag_engine = tag_engine or TagEngine()
+        self._client_secrets = client_secrets
+        self._refresh_token = refresh_token
+        self._credentials = None
+        self._youtube = None
+        # Exception behind the last None returned by an upload method (QuotaExceededError
+        # when the daily quota ran out), so callers can tell quota from other failures
+        self.last_error = None
+
+    @property
+    def client_id(self):
+        """OAuth client id; API quota is charged to this client's Cloud project"""
+        return client_config(self._client_secrets).get("client_id")
+
+    @property
+    def credentials(self):
+        if self._credentials is None:
+            self._credentials = self._get_credentials(self._client_secrets, self._refresh_token)
+        return self._credentials
+
+    @property
+    def youtube(self):
+        if self._youtube is None:
+            # The discovery document bundled with google-api-python-client, instead of fetching it
+            self._youtube = googleapiclient.discovery.build("youtube", "v3", credentials=self.credentials,
+                                                            static_discovery=True, cache_discovery=False)
+        return self._youtube
 
     def _get_credentials(self, client_secrets, refresh_token):
         try:
             # Construct credentials object directly from the provided refresh token and client config
-            # Determine the key for client secrets (installed vs web)
-            if "installed" in client_secrets:
-                cs = client_secrets["installed"]
-            elif "web" in client_secrets:
-                cs = client_secrets["web"]
-            else:
-                cs = client_secrets # Fallback if keys are top-level
-
-            creds = Credentials.from_authorized_user_info(
-                info={
-                    "refresh_token": refresh_token,
-                    "client_id": cs["client_id"],
-                    "client_secret": cs["client_secret"],
-                },
-                scopes=SCOPES
+            cs = client_config(client_secrets)
+
+            cache_key = TokenCache.key(refresh_token, self.scopes)
+            cached = self.token_cache.get(cache_key)
+            creds = Credentials(
+                token=cached[0] if cached else None,
+                expiry=cached[1] if cached else None,
+                refresh_token=refresh_token,
+                token_uri=cs.get("token_uri", TOKEN_URI),
+                client_id=cs["client_id"],
+                client_secret=cs["client_secret"],
+                scopes=self.scopes
             )
-            
-            if not creds.valid:
-                if creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
+
+            if cached:
+                logger.debug("Using cached YouTube access token")
+            elif creds.refresh_token:
+                creds.refresh(Request())
+                self.token_cache.put(cache_key, creds.token, creds.expiry)
             return creds
         except Exception as e:
             logger.error(f"Error authenticating with YouTube: {e}")
@@ -118,49 +233,60 @@ class YouTubeUploader:
         return description
     
     def generate_tags(self, chinese_title: str, english_title: str, 
-                     chinese_tags: list = None) -> list:
+                     chinese_tags: list = None, description: str = "", video_id: str = None) -> list:
         """
         Generate tags ensuring at least 6 relevant tags.
+        Keywords are ranked by TF-IDF over previously processed videos, see TagEngine;
+        video_id keeps a video that is processed again from being counted twice.
         """
-        tags = []
-        
-        # 1. Extract from Chinese title (using jieba)
         try:
-            # Cut title into words
-            seg_list = jieba.cut(chinese_title)
-            # Filter out short words and non-keywords (heuristically)
-            cn_words = [w for w in seg_list if len(w) > 1 and w.strip()]
-            tags.extend(cn_words[:5]) # Top 5 Chinese keywords
-        except Exception:
-            # Fallback if jieba fails
-            tags.append(chinese_title[:10]) 
-
-        # 2. Extract from English title
-        english_words = [w.strip().lower() for w in english_title.split() 
-                        if len(w.strip()) > 3 and w.isalpha()]
-        tags.extend(english_words[:5])
-        
-        # 3. Add provided Chinese tags if any
-        if chinese_tags:
-            tags.extend(chinese_tags[:8])
-            
-        # 4. Add default context tags
-        defaults = ["science", "experiment", "diy", "lifehacks", "tutorial", "fun", "china", "video", "科学", "实验", "科普"]
-        tags.extend(defaults)
-        
-        # 5. Filter duplicates
-        seen = set()
-        unique_tags = []
-        for tag in tags:
-            tag_clean = tag.lower().strip()
-            # Simple deduplication
-            if len(tag_clean) > 1 and tag_clean not in seen:
-                seen.add(tag_clean)
-                unique_tags.append(tag_clean)
-        
-        # Ensure we have at least 6 tags
-        return unique_tags[:45]
+            return self.tag_engine.generate(chinese_title, english_title, chinese_tags, description,
+                                            video_id=video_id)
+        except Exception as e:
+            # Fallback if segmentation fails
+            logger.warning(f"Tag extraction failed: {e}")
+            return self.tag_engine.merge([chinese_title[:10]] + list(chinese_tags or [])[:8])
     
+    def _video_body(self, title, description, category_id, privacy_status, tags):
+        # Use provided tags or default
+        if tags is None:
+            tags = ["xiaohongshu", "automation", "china", "chinese"]
+
+        return {
+            "snippet": {
+                "title": title[:100], # YouTube title limit
+                "description": description[:5000], # YouTube desc limit
+                "tags": tags,
+                "categoryId": category_id
+            },
+            "status": {
+                "privacyStatus": privacy_status,
+                "selfDeclaredMadeForKids": False
+            }
+        }
+
+    def _resumable_uploader(self):
+        return ResumableUploader(
+            AuthorizedSession(self.credentials),
+            upload_url=self.upload_url,
+            chunk_size=self.chunk_size,
+            store=self.session_store
+        )
+
+    @staticmethod
+    def _progress_logger():
+        """Progress callback that logs every 10%, or every 100 MB while the size is unknown"""
+        last_logged = [-1]
+        def report(sent, total):
+            if total:
+                step, message = int(sent * 100 / total) // 10, f"Uploaded {int(sent * 100 / total)}%"
+            else:
+                step, message = sent // (100 * 1024 * 1024), f"Uploaded {sent / 1024 / 1024:.0f} MB"
+            if step != last_logged[0]:
+                last_logged[0] = step
+                logger.info(message)
+        return report
+
     def upload_video(self, file_path, title, description, category_id="22", 
                     privacy_status="private", tags=None):
         """
@@ -174,49 +300,99 @@ class YouTubeUploader:
             privacy_status: Privacy status (default: private)
             tags: Optional list of tags
         """
+        self.last_error = None
+        try:
+            body = self._video_body(title, description, category_id, privacy_status, tags)
+
+            logger.info(f"Uploading {file_path} to YouTube...")
+
+            # Chunked resumable upload; an interrupted upload of the same file
+            # resumes from the committed offset on the next run
+            response = self._resumable_uploader().upload_file(file_path, body, progress=self._progress_logger())
+
+            logger.info(f"Upload complete! Video ID: {response['id']}")
+            return response['id']
+
+        except Exception as e:
+            logger.error(f"Error uploading video: {e}")
+            self.last_error = e
+            return None
+
+    def upload_stream(self, stream, title, description, category_id="22",
+                      privacy_status="private", tags=None, before_finish=None):
+        """
+        Uploads a video from a pipe while it is still being written
+        (see SubtitleGenerator.burn_subtitles_stream).
+
+        Args:
+            stream: Readable binary stream, read to EOF
+            before_finish: Called at EOF before the upload is completed; if it
+                raises, the upload is abandoned and no video is created
+            Other arguments as in upload_video
+
+        Returns:
+            YouTube video ID, or None on failure
+        """
+        self.last_error = None
+        try:
+            body = self._video_body(title, description, category_id, privacy_status, tags)
+            logger.info("Uploading stream to YouTube...")
+            response = self._resumable_uploader().upload_stream(stream, body, progress=self._progress_logger(),
+                                                                before_finish=before_finish)
+            logger.info(f"Upload complete! Video ID: {response['id']}")
+            return response['id']
+
+        except Exception as e:
+            logger.error(f"Error uploading video stream: {e}")
+            self.last_error = e
+            return None
+
+    def upload_captions(self, video_id, subtitles, language="en", name="English"):
+        """
+        Uploads subtitles as a caption track of an already uploaded video.
+
+        Args:
+            video_id: YouTube video ID returned by upload_video
+            subtitles: List of Segment, or path to an SRT file
+            language: BCP-47 language of the captions
+            name: Track name shown in the player
+
+        Returns:
+            Caption track ID, or None on failure
+        """
+        self.last_error = None
         try:
-            # Use provided tags or default
-            if tags is None:
-                tags = ["xiaohongshu", "automation", "china", "chinese"]
-            
             body = {
                 "snippet": {
-                    "title": title[:100], # YouTube title limit
-                    "description": description[:5000], # YouTube desc limit
-                    "tags": tags,
-                    "categoryId": category_id
-                },
-                "status": {
-                    "privacyStatus": privacy_status,
-                    "selfDeclaredMadeForKids": False
+                    "videoId": video_id,
+                    "language": language,
+                    "name": name,
+                    "isDraft": False
                 }
             }
 
-            logger.info(f"Uploading {file_path} to YouTube...")
-            
-            # MediaFileUpload handles the file upload
-            media_body = googleapiclient.http.MediaFileUpload(
-                file_path, 
-                chunksize=-1, 
-                resumable=True,
-                mimetype="video/mp4"
+            if isinstance(subtitles, str):
+                subtitles = read_subtitles(subtitles)
+
+            logger.info(f"Uploading {len(subtitles)} caption segments for video {video_id}...")
+
+            # Serialized in memory; no need for the SRT to exist on disk
+            media_body = googleapiclient.http.MediaIoBaseUpload(
+                io.BytesIO(to_srt(subtitles).encode("utf-8")),
+                mimetype="application/octet-stream",
+                resumable=False
             )
 
-            request = self.youtube.videos().insert(
-                part="snippet,status",
+            response = self.youtube.captions().insert(
+                part="snippet",
                 body=body,
                 media_body=media_body
-            )
-
-            response = None
-            while response is None:
-                status, response = request.next_chunk()
-                if status:
-                    logger.info(f"Uploaded {int(status.progress() * 100)}%")
+            ).execute()
 
-            logger.info(f"Upload complete! Video ID: {response['id']}")
+            logger.info(f"Caption upload complete! Caption ID: {response['id']}")
             return response['id']
 
         except Exception as e:
-            logger.error(f"Error uploading video: {e}")
+            logger.error(f"Error uploading captions: {e}")
+            self.last_error = _api_error(e)
             return None
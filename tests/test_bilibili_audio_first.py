@@ -0,0 +1,77 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from yt_dlp.extractor.bilibili import BiliBiliIE
+
+from src.bilibili_downloader import BilibiliDownloader
+from src.ffmpeg_runner import FFmpegError
+
+SRT = "1\n00:00:00,000 --> 00:00:02,000\n你好\n"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class FailingRunner:
+    """FFmpegRunner stand-in whose merge fails"""
+
+    def run(self, cmd, duration=None, label=None):
+        raise FFmpegError("merge failed")
+
+
+@pytest.fixture
+def media_server(tmp_path):
+    media = tmp_path / "media"
+    media.mkdir()
+    (media / "video.mp4").write_bytes(os.urandom(64 * 1024))
+    (media / "audio.m4a").write_bytes(os.urandom(16 * 1024))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(media)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def downloader(media_server, tmp_path, monkeypatch):
+    def fake_extract(self, url):
+        video_id = self._match_id(url)
+        return {"id": video_id, "title": "Video", "duration": 2, "formats": [
+            {"format_id": "100026", "url": f"{media_server}/video.mp4", "ext": "mp4", "vcodec": "avc1.640032",
+             "acodec": "none", "height": 1080, "width": 1920, "filesize": 64 * 1024},
+            {"format_id": "30280", "url": f"{media_server}/audio.m4a", "ext": "m4a", "vcodec": "none",
+             "acodec": "mp4a.40.2", "abr": 128, "filesize": 16 * 1024},
+        ], "subtitles": {"zh-CN": [{"ext": "srt", "data": SRT}]}}
+
+    monkeypatch.setattr(BiliBiliIE, "_real_extract", fake_extract)
+    monkeypatch.chdir(tmp_path)
+    with BilibiliDownloader("0", requests_per_second=None, fragment_concurrency=1,
+                            runner=FailingRunner()) as downloader:
+        yield downloader
+
+
+def test_subtitles_are_named_after_the_video_and_failed_merges_clean_up(downloader, tmp_path):
+    job = downloader.download_audio_first("BV1audiofirst", "clip")
+    assert job.audio_path and os.path.exists(job.audio_path)
+
+    assert job.video_path(timeout=60) is None
+
+    names = sorted(os.listdir(tmp_path / "downloads"))
+    assert names == ["BV1audiofirst_clip.zh-CN.srt"]
+
+
+def test_per_call_options_are_reset_on_pooled_instances(downloader):
+    with downloader._ydl("flat", playlistend=3) as ydl:
+        assert ydl.params["playlistend"] == 3
+    with downloader._ydl("flat") as again:
+        assert again is ydl
+        assert "playlistend" not in again.params
+
+    downloader.download_audio_first("BV1audiofirst", "clip")
+    with downloader._ydl("audio") as ydl:
+        assert "BV1audiofirst" not in str(ydl.params.get("outtmpl"))
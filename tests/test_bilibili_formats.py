@@ -0,0 +1,17 @@
+from benchmarks.bench_bilibili_formats import select, synthetic_info
+from src.bilibili_downloader import download_format, video_only_format
+
+
+def chosen_video_codec(format_spec):
+    video_format, format_sort = format_spec
+    result = select(synthetic_info(600), {'format': video_format, 'format_sort': format_sort})
+    return result['format_id'].split('+')[0]
+
+
+def test_smallest_codec_wins_by_default():
+    assert chosen_video_codec(download_format(1080)) == "1080p30-av01"
+
+
+def test_prefer_avc_keeps_h264_for_stream_copy_modes():
+    assert chosen_video_codec(download_format(1080, prefer_avc=True)) == "1080p30-avc1"
+    assert chosen_video_codec(video_only_format(720, prefer_avc=True)) == "720p30-avc1"
@@ -0,0 +1,28 @@
+from src.bilibili_page import bv_links, extract_initial_state, iter_bv_links
+
+
+def test_title_in_nested_markup():
+    html = ('<div class="card"><a href="//www.bilibili.com/video/BV1xx411c7mD/">'
+            '<span class="title">有趣的<em>实验</em> &amp; 更多</span></a></div>')
+    assert list(iter_bv_links(html)) == [("BV1xx411c7mD", "有趣的 实验 & 更多")]
+
+
+def test_cover_link_does_not_hide_the_title_link():
+    html = ('<a href="/video/BV1xx411c7mD"><img src="cover.jpg"></a>'
+            '<a href="/video/BV1xx411c7mD"><p>第一期</p></a>'
+            '<a href="/video/BV1yy411c7mE" title="属性标题"><img src="c.jpg"></a>')
+    assert list(iter_bv_links(html)) == [("BV1xx411c7mD", "第一期"), ("BV1yy411c7mE", "属性标题")]
+
+
+def test_unclosed_anchor_stops_at_the_next_link():
+    html = '<a href="/video/BV1xx411c7mD">一<a href="/video/BV1yy411c7mE">二</a><a href="/video/BV1zz411c7mF">三'
+    assert [title for _, title in iter_bv_links(html)] == ["一", "二", "三"]
+
+
+def test_links_without_text_are_untitled():
+    assert bv_links('<a href="/video/BV1xx411c7mD"><img src="c.jpg"></a>')[0]["title"] == "Untitled"
+
+
+def test_initial_state_with_braces_in_strings():
+    html = '<script>window.__INITIAL_STATE__ = {"title": "a};b", "n": {"x": 1}};(function(){})();</script>'
+    assert extract_initial_state(html) == {"title": "a};b", "n": {"x": 1}}
@@ -0,0 +1,46 @@
+import os
+
+from src.bulk_download import BulkDownloader, DownloadManifest
+
+URL = "https://www.bilibili.com/video/BV1xx411c7mD"
+
+
+class FlakyBackend:
+    """Leaves a partial stream behind and fails, then downloads the video"""
+
+    name = "flaky"
+
+    def __init__(self, resumable):
+        self.resumable = resumable
+        self.seen = []
+
+    def __call__(self, url, output_dir):
+        self.seen.append(sorted(os.listdir(output_dir)))
+        if len(self.seen) == 1:
+            with open(os.path.join(output_dir, "video.f100026.mp4.part"), "wb") as f:
+                f.write(b"partial")
+            raise RuntimeError("connection reset")
+        with open(os.path.join(output_dir, "BV1xx411c7mD_video.mp4"), "wb") as f:
+            f.write(b"mp4")
+
+
+def download(tmp_path, backend):
+    manifest = DownloadManifest(str(tmp_path / "manifest.jsonl"))
+    BulkDownloader(backend, str(tmp_path), manifest, retries=1, backoff=0).run([URL], progress=lambda message: None)
+    return manifest.entries["BV1xx411c7mD"]
+
+
+def test_failed_attempts_leave_nothing_behind(tmp_path):
+    backend = FlakyBackend(resumable=False)
+    entry = download(tmp_path, backend)
+
+    assert backend.seen == [[], []]
+    assert entry["status"] == "done"
+    assert entry["files"] == ["BV1xx411c7mD_video.mp4"]
+
+
+def test_resumable_backends_find_their_partial_files_again(tmp_path):
+    backend = FlakyBackend(resumable=True)
+    download(tmp_path, backend)
+
+    assert backend.seen == [[], ["video.f100026.mp4.part"]]
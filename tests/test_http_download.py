@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+from benchmarks.fake_cdn import FakeCDN
+from src.http_download import HttpDownloader, MIN_PART_SIZE
+
+
+@pytest.fixture
+def cdn_dir(tmp_path):
+    source = tmp_path / "cdn"
+    source.mkdir()
+    (source / "video.mp4").write_bytes(os.urandom(3 * MIN_PART_SIZE))
+    return source
+
+
+def test_parallel_leftovers_are_not_renamed_as_finished(cdn_dir, tmp_path):
+    """A killed parallel download leaves a full-size file of holes; it must not become the video"""
+    out = tmp_path / "out.mp4"
+    size = (cdn_dir / "video.mp4").stat().st_size
+    with open(f"{out}.ranges", 'wb') as f:
+        f.truncate(size)
+    # A full-size .part without a validator (e.g. from an older version) is not trusted either
+    with open(f"{out}.part", 'wb') as f:
+        f.truncate(size)
+
+    with FakeCDN(str(cdn_dir)) as cdn:
+        HttpDownloader(parallel_parts=4, backoff=0.01).download(cdn.url("video.mp4"), str(out))
+
+    assert out.read_bytes() == (cdn_dir / "video.mp4").read_bytes()
+    assert not os.path.exists(f"{out}.ranges")
+    assert not os.path.exists(f"{out}.part")
+
+
+def test_resume_appends_to_partial_download(cdn_dir, tmp_path):
+    out = tmp_path / "out.mp4"
+    source = (cdn_dir / "video.mp4").read_bytes()
+    with FakeCDN(str(cdn_dir), drop_after=len(source) // 2) as cdn:
+        downloader = HttpDownloader(backoff=0.01)
+        downloader.download(cdn.url("video.mp4"), str(out))
+        sent = cdn.bytes_sent
+
+    assert out.read_bytes() == source
+    assert downloader.stats["resumed"] == 1
+    assert sent < 1.2 * len(source)
+
+
+def test_changed_file_is_not_spliced_onto_old_prefix(cdn_dir, tmp_path):
+    out = tmp_path / "out.mp4"
+    with FakeCDN(str(cdn_dir), drop_after=MIN_PART_SIZE, drops=1) as cdn:
+        downloader = HttpDownloader(retries=0)
+        with pytest.raises(Exception):
+            downloader.download(cdn.url("video.mp4"), str(out))
+        assert os.path.exists(f"{out}.part")
+
+        # The file changes on the server before the next run
+        time.sleep(0.01)
+        new_content = os.urandom(3 * MIN_PART_SIZE)
+        (cdn_dir / "video.mp4").write_bytes(new_content)
+        HttpDownloader(retries=0).download(cdn.url("video.mp4"), str(out))
+
+    assert out.read_bytes() == new_content
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+import requests
+
+from benchmarks.fake_bilibili import FakeBilibili
+from scrape_all_bilibili import fetch_page, iter_new_videos, sync_new_videos
+from src.channel_cursor import ChannelCursor
+from src.page_crawler import PageCrawler
+
+UID = "42"
+
+
+def make_crawler(server, session, **kwargs):
+    kwargs = {"key": "bvid", "concurrency": 4, "rate": None, "backoff": 0.01, **kwargs}
+    return PageCrawler(lambda page: fetch_page(UID, page, session, server.space_url), **kwargs)
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+
+def test_crawls_every_page_in_order(session):
+    with FakeBilibili(videos=100) as server:
+        crawler = make_crawler(server, session)
+        videos = crawler.run(1, 4)
+
+    assert [v["bvid"] for v in videos] == [v["bvid"] for v in server.videos]
+    assert crawler.stats["fetched"] == crawler.stats["requests"] == 4
+
+
+def test_failed_and_captcha_pages_are_retried(session):
+    with FakeBilibili(videos=300, fail_every=4, captcha_every=5) as server:
+        crawler = make_crawler(server, session, retries=5)
+        videos = crawler.run(1, 10)
+
+    assert len(videos) == 300
+    assert crawler.stats["fetched"] == 10
+    assert crawler.stats["retries"] == server.failures > 0
+    assert crawler.stats["requests"] == crawler.stats["fetched"] + crawler.stats["retries"]
+
+
+def test_captcha_page_is_an_error_not_an_empty_page(session):
+    with FakeBilibili(videos=60, captcha_every=1) as server:
+        with pytest.raises(ValueError):
+            fetch_page(UID, 1, session, server.space_url)
+    with FakeBilibili(videos=60) as server:
+        assert fetch_page(UID, 3, session, server.space_url) == []
+
+
+def test_page_that_keeps_failing_is_left_for_the_next_run(session, tmp_path):
+    output = tmp_path / "crawl.jsonl"
+    with FakeBilibili(videos=90, captcha_every=1) as server:
+        crawler = make_crawler(server, session, output_path=str(output), retries=1)
+        assert crawler.run(1, 3) == []
+    assert crawler.stats["failed"] == 3
+    assert crawler.stats["fetched"] == 0
+    assert not output.read_text()
+
+
+def test_resumes_from_the_jsonl_file(session, tmp_path):
+    output = tmp_path / "crawl.jsonl"
+    with FakeBilibili(videos=150) as server:
+        make_crawler(server, session, output_path=str(output)).run(1, 3)
+        # An interruption cut the last record short
+        with open(output, "a", encoding="utf-8") as f:
+            f.write('{"page": 4, "items": [{"bvid"')
+
+        server.pages.clear()
+        crawler = make_crawler(server, session, output_path=str(output))
+        videos = crawler.run(1, 5)
+
+    assert crawler.stats["resumed"] == 3
+    assert sorted(server.pages) == [4, 5]
+    assert [v["bvid"] for v in videos] == [v["bvid"] for v in server.videos]
+    # The torn line was dropped, so every line is a whole record again
+    pages = [json.loads(line)["page"] for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(pages) == [1, 2, 3, 4, 5]
+
+
+def test_stops_once_pages_bring_nothing_new(session):
+    # Past the end the server keeps answering with the last page, as Bilibili does
+    with FakeBilibili(videos=75, repeat_last=True) as server:
+        crawler = make_crawler(server, session, concurrency=1, stale_pages=2)
+        videos = crawler.run(1, None)
+
+    assert len(videos) == 75
+    assert sorted(server.pages) == [1, 2, 3, 4, 5]
+
+
+def test_open_ended_crawl_needs_stale_pages(session):
+    crawler = PageCrawler(lambda page: [], stale_pages=0)
+    with pytest.raises(ValueError):
+        crawler.run(1, None)
+
+
+def test_incremental_sync_reports_a_failed_first_page():
+    cursor = ChannelCursor()
+    cursor.advance(UID, [{"id": "BV1fake00005"}])
+    status = {}
+    with FakeBilibili(videos=60, captcha_every=1) as server:
+        videos = list(iter_new_videos(UID, cursor, 3, status, server.space_url))
+
+    assert videos == []
+    assert status["error"].startswith("page 1:")
+    assert not status["caught_up"]
+
+
+def test_incremental_sync_stops_at_the_last_synced_video():
+    cursor = ChannelCursor()
+    cursor.advance(UID, [{"id": "BV1fake00005"}])
+    status = {}
+    with FakeBilibili(videos=60) as server:
+        videos = list(iter_new_videos(UID, cursor, 3, status, server.space_url))
+
+    assert [v["bvid"] for v in videos] == [f"BV1fake{i:05d}" for i in range(5)]
+    assert status == {"caught_up": True, "error": None}
+
+
+def test_first_sync_failing_mid_channel_keeps_the_cursor():
+    cursor = ChannelCursor()
+    # Page 1 comes through, page 2 is a verification page
+    with FakeBilibili(videos=90, captcha_every=2) as server:
+        videos, status = sync_new_videos(UID, cursor, 3, server.space_url)
+
+    assert len(videos) == 30
+    assert status["error"].startswith("page 2:")
+    assert not cursor.get(UID)
@@ -0,0 +1,109 @@
+import hashlib
+import io
+import os
+
+import pytest
+import requests
+
+from benchmarks.fake_youtube import FakeYouTube
+from src.resumable_upload import CHUNK_ALIGNMENT, ResumableUploader, UploadError, UploadSessionStore
+
+BODY = {"snippet": {"title": "t"}, "status": {"privacyStatus": "private"}}
+SIZE = 5 * CHUNK_ALIGNMENT + 1000
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(SIZE))
+    return path
+
+
+def make_uploader(server, session, **kwargs):
+    kwargs = {"chunk_size": CHUNK_ALIGNMENT, "backoff": 0, **kwargs}
+    return ResumableUploader(session, upload_url=server.upload_url, **kwargs)
+
+
+def uploaded(server, result):
+    return server.videos[result["id"]]
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_dropped_upload_resumes_its_session_in_the_next_run(session, video, tmp_path):
+    store_path = str(tmp_path / "sessions.json")
+    with FakeYouTube(drop_after=3 * CHUNK_ALIGNMENT + 10) as server:
+        with pytest.raises(UploadError):
+            make_uploader(server, session, store=UploadSessionStore(store_path), max_retries=0).upload_file(
+                str(video), BODY)
+        assert len(UploadSessionStore(store_path).sessions) == 1
+
+        store = UploadSessionStore(store_path)
+        result = make_uploader(server, session, store=store).upload_file(str(video), BODY)
+
+    assert len(server.sessions) == 1
+    # Nothing the server committed in the first run was sent again
+    assert server.bytes_received == SIZE
+    assert uploaded(server, result) == {"size": SIZE, "sha256": sha256(video.read_bytes()), "metadata": BODY}
+    assert store.sessions == {}
+
+
+def test_server_errors_are_retried(session, video):
+    with FakeYouTube(fail_every=3) as server:
+        result = make_uploader(server, session, max_retries=3).upload_file(str(video), BODY)
+
+    assert uploaded(server, result)["sha256"] == sha256(video.read_bytes())
+    assert server.bytes_received == SIZE
+
+
+def test_range_of_308_replies_is_the_committed_offset(session):
+    with FakeYouTube() as server:
+        uploader = make_uploader(server, session)
+        uri = uploader.start_session(BODY, SIZE)
+        assert uploader.query_offset(uri, SIZE) == (0, None)
+
+        assert uploader.put_chunk(uri, os.urandom(CHUNK_ALIGNMENT), 0, SIZE) == (CHUNK_ALIGNMENT, None)
+        assert uploader.query_offset(uri, SIZE) == (CHUNK_ALIGNMENT, None)
+        # A chunk sent from the wrong offset is answered with the server's own offset
+        assert uploader.put_chunk(uri, os.urandom(CHUNK_ALIGNMENT), 0, SIZE) == (CHUNK_ALIGNMENT, None)
+
+        assert uploader.query_offset(f"{server.base_url}/upload/session/gone", SIZE) == (None, None)
+
+
+def test_stream_upload(session):
+    data = os.urandom(SIZE)
+    with FakeYouTube(fail_every=3) as server:
+        sent = []
+        result = make_uploader(server, session, max_retries=3).upload_stream(
+            io.BytesIO(data), BODY, progress=lambda offset, total: sent.append((offset, total)))
+
+    assert uploaded(server, result)["sha256"] == sha256(data)
+    assert sent[-1] == (SIZE, SIZE)
+    assert all(total is None for _, total in sent[:-2])
+
+
+def test_empty_stream_upload(session):
+    with FakeYouTube() as server:
+        result = make_uploader(server, session).upload_stream(io.BytesIO(b""), BODY)
+
+    assert uploaded(server, result)["size"] == 0
+
+
+def test_failed_producer_leaves_the_stream_upload_unfinished(session):
+    def producer_failed():
+        raise RuntimeError("ffmpeg exited with 1")
+
+    with FakeYouTube() as server:
+        with pytest.raises(RuntimeError):
+            make_uploader(server, session).upload_stream(io.BytesIO(os.urandom(SIZE)), BODY,
+                                                         before_finish=producer_failed)
+
+    assert server.videos == {}
@@ -0,0 +1,30 @@
+from src.idf_table import IdfTable
+from src.tag_engine import TagEngine
+
+
+def test_a_video_is_learned_once(tmp_path):
+    path = str(tmp_path / "tag_idf.json")
+    engine = TagEngine(IdfTable(path))
+    engine.seed({"video_001": "有趣的化学实验"})
+    engine.generate("有趣的化学实验", "Fun chemistry experiment", video_id="video_001")
+    engine.generate("周末的物理实验", "Weekend physics experiment", video_id="video_002")
+    engine.save()
+
+    # The next run processes video_002 again
+    engine = TagEngine(IdfTable(path))
+    engine.generate("周末的物理实验", "Weekend physics experiment", video_id="video_002")
+
+    assert engine.idf_table.documents == 2
+    assert engine.english_idf_table.documents == 1
+
+
+def test_english_keywords_are_ranked_against_english_titles():
+    engine = TagEngine(english_keywords=1)
+    for i in range(5):
+        engine.learn(f"实验{i}", english_title=f"Amazing experiment number {i}", video_id=f"video_{i}")
+
+    tags = engine.generate("磁铁实验", "Amazing magnet experiment", learn=False)
+
+    # The Chinese table has never seen English words, so it would keep the first one
+    assert engine.keywords("Amazing magnet experiment", top_k=1, min_length=4) == ["amazing"]
+    assert "magnet" in tags and "amazing" not in tags
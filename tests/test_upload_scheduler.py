@@ -0,0 +1,80 @@
+from src.resumable_upload import QuotaExceededError
+from src.upload_scheduler import UploadScheduler, QuotaTracker, UploadQueue
+
+
+class Channel:
+    """YouTubeUploader stand-in that fails with `error` (or succeeds when None)"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.last_error = None
+        self.calls = 0
+
+    def upload_video(self, path, title, description, tags=None, privacy_status="private"):
+        self.calls += 1
+        self.last_error = self.error
+        return None if self.error else f"yt{self.calls}"
+
+
+def make_job(tmp_path, job_id="video_001"):
+    video = tmp_path / "downloads" / job_id / "video.mp4"
+    video.parent.mkdir(parents=True)
+    video.write_bytes(b"mp4")
+    return {"id": job_id, "video_path": str(video), "title": "t", "description": "d"}
+
+
+def make_scheduler(tmp_path, channels):
+    queue = UploadQueue(str(tmp_path / "queue.json"), str(tmp_path / "pending"))
+    return UploadScheduler(channels, QuotaTracker(), queue)
+
+
+def test_other_errors_are_not_queued(tmp_path):
+    scheduler = make_scheduler(tmp_path, {"a": Channel(RuntimeError("401 Unauthorized"))})
+    job = make_job(tmp_path)
+
+    assert scheduler.upload(job) == (None, "a")
+    assert len(scheduler.queue) == 0
+    assert (tmp_path / "downloads" / "video_001" / "video.mp4").exists()
+
+
+def test_quota_errors_queue_the_job(tmp_path):
+    channels = {"a": Channel(QuotaExceededError("quotaExceeded")), "b": Channel(QuotaExceededError("quotaExceeded"))}
+    scheduler = make_scheduler(tmp_path, channels)
+
+    assert scheduler.upload(make_job(tmp_path)) == (None, None)
+    assert [job["id"] for job in scheduler.queue.jobs] == ["video_001"]
+    assert (tmp_path / "pending" / "video_001" / "video.mp4").exists()
+    assert all(channel.calls == 1 for channel in channels.values())
+
+
+def test_drain_drops_jobs_whose_files_are_gone(tmp_path):
+    scheduler = make_scheduler(tmp_path, {"a": Channel(QuotaExceededError("quotaExceeded"))})
+    scheduler.upload(make_job(tmp_path, "video_001"))
+    scheduler.upload(make_job(tmp_path, "video_002"))
+    # The queue file came back from a cache, the pending directory did not
+    (tmp_path / "pending" / "video_001" / "video.mp4").unlink()
+
+    channel = Channel()
+    scheduler = make_scheduler(tmp_path, {"a": channel})
+    uploaded = scheduler.drain()
+
+    assert [job["id"] for job, _, _ in uploaded] == ["video_002"]
+    assert [job["id"] for job in scheduler.lost] == ["video_001"]
+    assert len(scheduler.queue) == 0
+    assert channel.calls == 1
+
+
+def test_channels_of_one_project_share_its_quota(tmp_path):
+    channels = {"a": Channel(), "b": Channel(), "c": Channel()}
+    queue = UploadQueue(str(tmp_path / "queue.json"), str(tmp_path / "pending"))
+    scheduler = UploadScheduler(channels, QuotaTracker(daily_quota=3200), queue,
+                                projects={"a": "client-1", "b": "client-1", "c": "client-2"})
+
+    results = [scheduler.upload(make_job(tmp_path, f"video_{i:03d}"))[1] for i in range(5)]
+
+    # Two uploads fit in each project's quota, whichever of its channels made them
+    assert sum(channel in ("a", "b") for channel in results[:4]) == 2
+    assert results[:4].count("c") == 2
+    assert results[4] is None
+    assert len(scheduler.queue) == 1
+    assert scheduler.quota.remaining("client-1") == scheduler.quota.remaining("client-2") == 0
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from src.utils import load_json
+from src.video_organizer import VideoOrganizer, parse_filename
+
+
+class FakeProbe:
+    """ffprobe stand-in: every file is 62 s long with the given embedded title"""
+
+    def __init__(self, title="video"):
+        self.title = title
+
+    def probe(self, path, entries="format=duration", stream=None, extra_args=()):
+        return {"format": {"duration": "61.5", "tags": {"title": self.title}},
+                "streams": [{"codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920}]}
+
+
+@pytest.fixture
+def drop_dir(tmp_path):
+    def add(name):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(4096))
+    add("有趣的实验/[P01]01.mp4")
+    add("有趣的实验/[P02]02.mp4")
+    add("有趣的实验/[P03]第三集 化学.mp4")
+    add("video.mp4")
+    add("video (2).mp4")
+    add("BV1xx411c7mD.mp4")
+    return tmp_path
+
+
+def titles(drop_dir, runner):
+    items = VideoOrganizer(str(drop_dir), workers=2, runner=runner).plan()
+    return {os.path.relpath(item['path'], drop_dir): item['metadata']['title'] for item in items}
+
+
+def test_bbdown_parts_get_their_part_number():
+    assert parse_filename("/drop/有趣的实验/[P02]02.mp4", "/drop") == {"title": "有趣的实验 P02", "part": 2}
+    assert parse_filename("/drop/有趣的实验/[P03]第三集 化学.mp4", "/drop")["title"] == "有趣的实验 第三集 化学"
+
+
+def test_generic_names_get_distinct_titles(drop_dir):
+    result = titles(drop_dir, FakeProbe())
+
+    assert result[os.path.join("有趣的实验", "[P01]01.mp4")] == "有趣的实验 P01"
+    assert result[os.path.join("有趣的实验", "[P02]02.mp4")] == "有趣的实验 P02"
+    assert result["BV1xx411c7mD.mp4"] == "BV1xx411c7mD [1:02]"
+    assert sorted([result["video.mp4"], result["video (2).mp4"]]) == ["video [1:02]", "video [1:02] #2"]
+    assert len(set(result.values())) == len(result)
+
+
+def test_embedded_titles_are_used_for_generic_names(drop_dir):
+    result = titles(drop_dir, FakeProbe("周末实验合集"))
+
+    assert result["BV1xx411c7mD.mp4"] == "周末实验合集"
+    assert sorted([result["video.mp4"], result["video (2).mp4"]]) == ["周末实验合集 #2", "周末实验合集 #3"]
+
+
+def test_titles_already_organized_are_not_reused(drop_dir):
+    organizer = VideoOrganizer(str(drop_dir), workers=2, runner=FakeProbe())
+    organizer.apply(organizer.plan())
+    (drop_dir / "video.mp4").write_bytes(os.urandom(4096))
+
+    assert list(titles(drop_dir, FakeProbe()).values()) == ["video [1:02] #3"]
+
+
+def test_organized_folders_are_hashed_once(tmp_path):
+    content = os.urandom(4096)
+    (tmp_path / "a.mp4").write_bytes(content)
+    organizer = VideoOrganizer(str(tmp_path), workers=2, runner=FakeProbe())
+    organizer.apply(organizer.plan())
+    assert organizer.stats["full_hashes"] == 0
+
+    for copy in ("b.mp4", "c.mp4"):
+        (tmp_path / copy).write_bytes(content)
+        organizer = VideoOrganizer(str(tmp_path), workers=2, runner=FakeProbe())
+        items = organizer.plan()
+        organizer.apply(items)
+        assert [item["duplicate_of"] for item in items] == ["video_001"]
+
+    # The folder's hash from the first collision was kept in its metadata.json
+    assert organizer.stats["full_hashes"] == 1
+    assert "sha256" in load_json(str(tmp_path / "video_001" / "metadata.json"))
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_xhs import FakeXHS, PAGE_SIZE
+from src.xhs_downloader import XHSDownloader
+
+COOKIE = "a1=test; web_session=test"
+
+
+@pytest.fixture
+def server():
+    with FakeXHS(notes=100) as server:
+        yield server
+
+
+def test_iter_user_notes_follows_the_cursor(server):
+    downloader = XHSDownloader(COOKIE, requests_per_second=None, host=server.base_url)
+
+    notes = list(downloader.iter_user_notes("user"))
+
+    assert [n["note_id"] for n in notes] == server.notes
+    assert server.requests["user_posted"] == 4  # 100 notes, 30 per page
+    assert server.unsigned == 0
+
+
+def test_iter_user_notes_is_lazy_and_honours_max_pages(server):
+    downloader = XHSDownloader(COOKIE, requests_per_second=None, host=server.base_url)
+
+    notes = downloader.iter_user_notes("user", max_pages=2)
+    first = next(notes)
+    assert first["note_id"] == "note00000"
+    assert server.requests["user_posted"] == 1
+
+    assert len([first, *notes]) == 2 * PAGE_SIZE
+    assert server.requests["user_posted"] == 2
+
+
+def test_get_latest_videos_stops_at_the_limit(server):
+    downloader = XHSDownloader(COOKIE, requests_per_second=None, host=server.base_url)
+
+    videos = downloader.get_latest_videos("user", limit=5)
+
+    assert [v["id"] for v in videos] == ["note00000", "note00001", "note00003", "note00004", "note00006"]
+    assert videos[0]["title"] == "标题 note00000"
+    assert server.requests["user_posted"] == 1
+
+
+def test_get_latest_videos_reads_at_most_max_pages(server):
+    downloader = XHSDownloader(COOKIE, requests_per_second=None, host=server.base_url)
+
+    videos = downloader.get_latest_videos("user", limit=1000, max_pages=2)
+
+    assert len(videos) == 40  # two pages, every third note is an image note
+    assert server.requests["user_posted"] == 2
+
+
+def test_get_notes_many_uses_one_client_per_thread(server, caplog):
+    downloader = XHSDownloader(COOKIE, max_workers=4, requests_per_second=None, host=server.base_url)
+    ids = [n for n in server.notes if server.note_type(n) == "video"][:12] + ["missing"]
+    downloader.get_notes_many(ids[:1])  # The signer count is per downloader; only each call's requests are logged
+    clients = {}
+    get_note = downloader.get_note
+
+    def recording_get_note(note_id):
+        clients.setdefault(threading.current_thread().name, set()).add(id(downloader._client()))
+        return get_note(note_id)
+
+    downloader.get_note = recording_get_note
+    with caplog.at_level("INFO", logger="LRBAuto"):
+        results = downloader.get_notes_many(ids)
+
+    assert results["missing"] is None
+    assert all(results[n]["note_id"] == n for n in ids[:-1])
+    assert server.unsigned == 0
+    assert server.max_active > 1
+    assert all(len(seen) == 1 for seen in clients.values())
+    assert len(set().union(*clients.values())) == len(clients) > 1
+    assert f"({len(ids)} requests signed)" in caplog.text
+
+
+def test_get_notes_many_respects_the_rate_limit(server):
+    downloader = XHSDownloader(COOKIE, max_workers=4, requests_per_second=20, host=server.base_url)
+    ids = server.notes[:14]
+
+    started = time.perf_counter()
+    downloader.get_notes_many(ids)
+    elapsed = time.perf_counter() - started
+
+    # A burst of 4, then 10 more requests at 20 per second
+    assert elapsed >= 0.45
+    assert server.requests["feed"] == len(ids)